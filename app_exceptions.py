@@ -3,3 +3,23 @@
 
 class IndexFileNotExistsError(Exception):
     """Пользовательское исключение для неправильных входных данных."""
+
+
+class JobSpecError(Exception):
+    """Ошибка в описании задания на обработку страниц."""
+
+
+class RetryableFetchError(Exception):
+    """Временная ошибка загрузки страницы, после которой запрос можно повторить."""
+
+    def __init__(self, url: str, reason: str, status: int | None = None, retry_after: float | None = None) -> None:
+        """Инициализация ошибки."""
+        super().__init__(f"{url}: {reason}")
+        self.url = url
+        self.reason = reason
+        self.status = status  # статус ответа, None - ошибка подключения
+        self.retry_after = retry_after  # задержка из заголовка Retry-After, секунд
+
+
+class SitemapError(Exception):
+    """Документ не является sitemap или лентой, повреждён или слишком велик."""
@@ -0,0 +1,218 @@
+"""Замеры производительности обхода на синтетическом сайте без доступа к сети.
+
+Сайт поднимается локально на 127.0.0.1. Замеряются скорость полного обхода через start_parser, пиковое
+потребление памяти и время этапов обработки одной страницы в Parser.process_page. Результаты сохраняются
+в benchmarks/results и сравниваются с эталоном benchmarks/baseline.json.
+
+Примеры:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --pages 1000 --latency-ms 20 --error-rate 0.01
+    python -m benchmarks.run_benchmarks --update-baseline
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+
+from pathlib import Path
+from datetime import UTC, datetime
+from dataclasses import asdict, replace
+
+import aiohttp
+
+from aiohttp import web
+
+from start_parser import start_parser, open_crawl_context
+from logger_config import configure_logging
+from parser.parser_class import Parser
+from utils.crawl_metrics import CrawlMetrics
+from parser.parser_config import CrawlSettings
+from benchmarks.synthetic_site import SiteSpec, page_path, render_page, create_site_app
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARKS_DIR = Path(__file__).parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+BASELINE_PATH = BENCHMARKS_DIR / "baseline.json"
+DEFAULT_THRESHOLD = 0.2  # допустимое ухудшение относительно эталона
+HOST = "127.0.0.1"
+
+
+def peak_rss_mb() -> float | None:
+    """Пиковое потребление памяти процессом и его дочерними процессами в МБ; None, если недоступно."""
+    if resource is None:
+        return None
+    # ru_maxrss в килобайтах в Linux и в байтах в macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak * unit / 2**20, 1)
+
+
+def count_markdown_files(directory: Path) -> int:
+    """Количество markdown файлов в директории."""
+    return sum(1 for _ in directory.glob("*.md"))
+
+
+async def run_crawl_benchmark(spec: SiteSpec, settings: CrawlSettings) -> dict:
+    """Полный обход синтетического сайта через start_parser."""
+    runner = web.AppRunner(create_site_app(spec), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, HOST, 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        with tempfile.TemporaryDirectory() as output_directory:
+            started = time.perf_counter()
+            async with open_crawl_context(settings) as context:
+                await start_parser(start_url=f"http://{HOST}:{port}{page_path(0)}",
+                                   output_directory=Path(output_directory),
+                                   allowed_domains=(),
+                                   context=context)
+            elapsed = time.perf_counter() - started
+            files_written = count_markdown_files(Path(output_directory))
+    finally:
+        await runner.cleanup()
+    summary = context.metrics.summary()
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "pages_processed": summary["pages_processed"],
+        "pages_per_second": round(summary["pages_processed"] / elapsed, 3) if elapsed > 0 else 0.0,
+        "bytes_per_second": summary["bytes_per_second"],
+        "files_written": files_written,
+        "fetch": summary["fetch"],
+        "stages": summary["stages"],
+    }
+
+
+async def run_process_page_benchmark(spec: SiteSpec, settings: CrawlSettings) -> dict:
+    """Время этапов Parser.process_page на заранее построенных страницах без сети и пула процессов."""
+    base_url = f"http://{HOST}"
+    pages = {f"{base_url}{page_path(number)}": render_page(spec, number) for number in range(spec.page_count)}
+
+    async def fetch_html(_: aiohttp.ClientSession, url: str) -> str | None:
+        return pages.get(url)
+
+    metrics = CrawlMetrics()
+    with tempfile.TemporaryDirectory() as output_directory:
+        parser = Parser(start_page_url=f"{base_url}{page_path(0)}",
+                        directory=Path(output_directory),
+                        session=None,
+                        fetch_html=fetch_html,
+                        allowed_domains=(),
+                        html_parser=settings.html_parser,
+                        link_extractor=settings.link_extractor,
+                        metrics=metrics)
+        for url in pages:
+            with metrics.measure("process_page"):
+                await parser.process_page(page_link=url, collect_links=True)
+    return {"pages": len(pages), "stages": metrics.summary()["stages"]}
+
+
+async def run_benchmarks(spec: SiteSpec, settings: CrawlSettings) -> dict:
+    """Выполняет все замеры и возвращает результат."""
+    crawl = await run_crawl_benchmark(spec, settings)
+    process_page = await run_process_page_benchmark(spec, settings)
+    return {
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "platform": {"python": platform.python_version(), "system": platform.platform()},
+        "site": asdict(spec),
+        "settings": {"conversion_workers": settings.conversion_workers,
+                     "max_concurrency": settings.max_concurrency,
+                     "per_host_concurrency": settings.per_host_concurrency,
+                     "html_parser": settings.html_parser,
+                     "fsync": settings.fsync},
+        "crawl": crawl,
+        "process_page": process_page,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare_results(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """Сравнивает результат с эталоном и возвращает описания ухудшений больше чем на threshold."""
+    regressions = []
+
+    def check(name: str, value: float | None, reference: float | None, higher_is_better: bool) -> None:
+        if not value or not reference:
+            return
+        change = (reference - value) / reference if higher_is_better else (value - reference) / reference
+        if change > threshold:
+            regressions.append(f"{name}: {value} против {reference} в эталоне ({change:+.0%})")
+
+    check("crawl.pages_per_second", current["crawl"]["pages_per_second"],
+          baseline["crawl"]["pages_per_second"], higher_is_better=True)
+    check("peak_rss_mb", current["peak_rss_mb"], baseline["peak_rss_mb"], higher_is_better=False)
+    baseline_stages = baseline["process_page"]["stages"]
+    for stage, stage_summary in current["process_page"]["stages"].items():
+        if stage in baseline_stages:
+            check(f"process_page.{stage}.mean", stage_summary["mean"], baseline_stages[stage]["mean"],
+                  higher_is_better=False)
+    return regressions
+
+
+def save_result(result: dict, directory: Path = RESULTS_DIR) -> Path:
+    """Сохраняет результат в отдельный файл с временем запуска в имени."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{datetime.now(UTC).strftime('%Y%m%dT%H%M%S')}.json"
+    path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Разбор аргументов командной строки."""
+    spec = SiteSpec()
+    arg_parser = argparse.ArgumentParser(description="Замеры производительности обхода на синтетическом сайте.")
+    arg_parser.add_argument("--pages", type=int, default=spec.page_count, help="количество страниц сайта")
+    arg_parser.add_argument("--page-size", type=int, default=spec.page_size_bytes, help="размер страницы в байтах")
+    arg_parser.add_argument("--fan-out", type=int, default=spec.fan_out, help="количество ссылок со страницы")
+    arg_parser.add_argument("--latency-ms", type=float, default=spec.latency_ms, help="задержка ответа в мс")
+    arg_parser.add_argument("--error-rate", type=float, default=spec.error_rate, help="доля ответов 503")
+    arg_parser.add_argument("--seed", type=int, default=spec.seed, help="зерно генерации страниц и ошибок")
+    arg_parser.add_argument("--workers", type=int, help="количество процессов конвертации")
+    arg_parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="файл эталонного результата")
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help="допустимое ухудшение относительно эталона, доля")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="сохранить результат как эталон")
+    arg_parser.add_argument("--log-level", default="WARNING", help="уровень логов обхода")
+    return arg_parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа: выполняет замеры, сохраняет результат и возвращает 1 при ухудшении относительно эталона."""
+    args = parse_args(argv)
+    configure_logging(mode="production", level=args.log_level, json_log_file=None)
+    spec = SiteSpec(page_count=args.pages, page_size_bytes=args.page_size, fan_out=args.fan_out,
+                    latency_ms=args.latency_ms, error_rate=args.error_rate, seed=args.seed)
+    # без ограничения частоты и robots.txt: замеряется сам обход, а не вежливые задержки
+    settings = CrawlSettings(max_depth=args.pages, max_pages=args.pages, requests_per_second=0,
+                             respect_robots=False, backoff_base=0.01, backoff_max=0.1)
+    if args.workers is not None:
+        settings = replace(settings, conversion_workers=args.workers)
+
+    result = asyncio.run(run_benchmarks(spec, settings))
+    path = save_result(result)
+    print(json.dumps(result, ensure_ascii=False, indent=2))  # noqa: T201
+    print(f"Результат сохранён в {path}", file=sys.stderr)  # noqa: T201
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Эталон обновлён: {args.baseline}", file=sys.stderr)  # noqa: T201
+        return 0
+    if not args.baseline.exists():
+        print("Эталон не найден, сравнение пропущено.", file=sys.stderr)  # noqa: T201
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare_results(result, baseline, args.threshold)
+    for regression in regressions:
+        print(f"Ухудшение {regression}", file=sys.stderr)  # noqa: T201
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
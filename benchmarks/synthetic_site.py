@@ -0,0 +1,69 @@
+"""Синтетический сайт для замеров производительности без доступа к сети."""
+import random
+import asyncio
+
+from dataclasses import dataclass
+
+from aiohttp import web
+
+WORDS = ("lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit", "sed", "do", "eiusmod",
+         "tempor", "incididunt", "labore", "dolore", "magna", "aliqua", "веб", "страница", "документация")
+
+
+@dataclass(frozen=True, slots=True)
+class SiteSpec:
+    """Параметры синтетического сайта."""
+
+    page_count: int = 200
+    page_size_bytes: int = 20 * 1024  # примерный размер HTML одной страницы
+    fan_out: int = 10  # количество ссылок на другие страницы с каждой страницы
+    latency_ms: float = 0.0  # задержка каждого ответа
+    error_rate: float = 0.0  # доля ответов 503
+    seed: int = 0
+
+
+def page_path(number: int) -> str:
+    """Путь страницы с номером number."""
+    return f"/page/{number}"
+
+
+def render_page(spec: SiteSpec, number: int) -> str:
+    """HTML страницы: заголовок, навигация, ссылки на следующие страницы и текст до нужного размера.
+
+    Ссылки образуют дерево от страницы 0, поэтому все страницы достижимы обходом в ширину.
+    """
+    rng = random.Random(spec.seed * 1_000_003 + number)  # noqa: S311
+    links = "".join(f'<li><a href="{page_path(child)}">Page {child}</a></li>'
+                    for child in range(number * spec.fan_out + 1, (number + 1) * spec.fan_out + 1)
+                    if child < spec.page_count)
+    head = (f"<html><head><title>Synthetic page {number}</title></head><body>"
+            f'<nav class="navbar"><a href="{page_path(0)}">Home</a></nav>'
+            f'<div class="sidebar"><ul>{links}</ul></div><main><h1>Synthetic page {number}</h1>')
+    tail = '</main><footer class="footer">Footer</footer></body></html>'
+    paragraphs = []
+    size = len(head) + len(tail)
+    while size < spec.page_size_bytes:
+        paragraph = f"<p>{' '.join(rng.choice(WORDS) for _ in range(40))}</p>"
+        paragraphs.append(paragraph)
+        size += len(paragraph.encode("utf-8"))
+    return f"{head}{''.join(paragraphs)}{tail}"
+
+
+def create_site_app(spec: SiteSpec) -> web.Application:
+    """Приложение aiohttp, отдающее страницы синтетического сайта."""
+    pages = [render_page(spec, number) for number in range(spec.page_count)]
+    error_rng = random.Random(spec.seed)  # noqa: S311
+
+    async def handle_page(request: web.Request) -> web.Response:
+        if spec.latency_ms:
+            await asyncio.sleep(spec.latency_ms / 1000)
+        number = int(request.match_info["number"])
+        if number >= spec.page_count:
+            raise web.HTTPNotFound
+        if spec.error_rate and error_rng.random() < spec.error_rate:
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        return web.Response(text=pages[number], content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/page/{number:\\d+}", handle_page)
+    return app
@@ -0,0 +1,116 @@
+"""Запуск обработки страниц из командной строки без интерфейса Streamlit.
+
+Примеры:
+    python cli.py --urls-file urls.txt --output-dir misc
+    python cli.py --job job.toml
+    python cli.py --offline-input site-mirror --base-url https://example.com/ --output-dir misc
+"""
+import sys
+import asyncio
+import argparse
+
+from pathlib import Path
+from dataclasses import replace
+
+from crawl_job import DEFAULT_OUTPUT_DIRECTORY, CrawlJob, run_job, load_job_spec, read_urls_file
+from logger_config import LOG_MODES, default_log_mode, configure_logging
+from app_exceptions import JobSpecError, IndexFileNotExistsError
+from offline_ingest import run_offline_ingest
+from parser.sitemap import DISCOVERY_MODES
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Разбор аргументов командной строки."""
+    arg_parser = argparse.ArgumentParser(description="Конвертация HTML страниц в markdown файлы.")
+    arg_parser.add_argument("urls", nargs="*", help="стартовые url")
+    arg_parser.add_argument("--job", type=Path, help="файл задания в формате JSON или TOML")
+    arg_parser.add_argument("--urls-file", type=Path, help="файл со стартовыми url, по одному на строку")
+    arg_parser.add_argument("--output-dir", type=Path, help="выходная директория")
+    arg_parser.add_argument("--allowed-domain", action="append", default=[], help="разрешённый домен (повторяемый)")
+    arg_parser.add_argument("--only-first-page", action="store_true", help="получить md только указанных страниц")
+    arg_parser.add_argument("--max-depth", type=int, help="глубина обхода ссылок")
+    arg_parser.add_argument("--max-pages", type=int, help="максимальное количество страниц для одного url")
+    arg_parser.add_argument("--discovery", choices=DISCOVERY_MODES,
+                            help="страницы первого уровня: links - ссылки стартовой страницы, "
+                                 "sitemap - sitemap или лента RSS и Atom")
+    arg_parser.add_argument("--offline-input", type=Path,
+                            help="директория с HTML файлами или архив WARC (.warc, .warc.gz) для конвертации без сети")
+    arg_parser.add_argument("--base-url", help="url, соответствующий корню директории --offline-input")
+    arg_parser.add_argument("--metrics-json", type=Path, help="файл для сводки метрик задания в формате JSON")
+    arg_parser.add_argument("--metrics-port", type=int, help="порт HTTP-сервера метрик Prometheus /metrics")
+    arg_parser.add_argument("--checkpoint", type=Path,
+                            help="база контрольных точек для продолжения прерванного обхода")
+    arg_parser.add_argument("--seen-urls-dir", type=Path,
+                            help="директория временной базы запланированных страниц для обходов с миллионами "
+                                 "страниц: в памяти остаётся только фильтр Блума")
+    arg_parser.add_argument("--log-mode", choices=LOG_MODES, default=default_log_mode,
+                            help="режим логов: debug - все сообщения, production - от INFO с фоновой записью")
+    arg_parser.add_argument("--log-level", help="минимальный уровень логов, по умолчанию зависит от режима")
+    arg_parser.add_argument("--log-every-pages", type=int, help="писать прогресс в лог раз в N страниц (0 - нет)")
+    return arg_parser.parse_args(argv)
+
+
+def build_job(args: argparse.Namespace) -> CrawlJob:
+    """Собирает задание из файла задания и аргументов командной строки."""
+    job = load_job_spec(args.job) if args.job else CrawlJob(start_urls=(), output_directory=DEFAULT_OUTPUT_DIRECTORY)
+    start_urls = job.start_urls + tuple(args.urls)
+    if args.urls_file:
+        try:
+            start_urls += read_urls_file(args.urls_file)
+        except OSError as e:
+            msg = f"Не удалось прочитать файл url {args.urls_file}: {e}"
+            raise JobSpecError(msg) from e
+
+    settings = job.settings
+    if args.max_depth is not None:
+        settings = replace(settings, max_depth=args.max_depth)
+    if args.max_pages is not None:
+        settings = replace(settings, max_pages=args.max_pages)
+    if args.discovery is not None:
+        settings = replace(settings, discovery=args.discovery)
+    if args.metrics_json is not None:
+        settings = replace(settings, metrics_path=args.metrics_json)
+    if args.metrics_port is not None:
+        settings = replace(settings, metrics_port=args.metrics_port)
+    if args.checkpoint is not None:
+        settings = replace(settings, checkpoint_path=args.checkpoint)
+    if args.seen_urls_dir is not None:
+        settings = replace(settings, seen_urls_directory=args.seen_urls_dir)
+    if args.log_every_pages is not None:
+        settings = replace(settings, log_every_pages=args.log_every_pages)
+    return replace(job,
+                   start_urls=start_urls,
+                   output_directory=args.output_dir or job.output_directory,
+                   allowed_domains=job.allowed_domains + tuple(args.allowed_domain),
+                   only_first_page=job.only_first_page or args.only_first_page,
+                   settings=settings)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа командной строки."""
+    args = parse_args(argv)
+    configure_logging(mode=args.log_mode, level=args.log_level)
+    try:
+        job = build_job(args)
+    except JobSpecError as e:
+        print(e, file=sys.stderr)  # noqa: T201
+        return 2
+    if args.offline_input is None and not job.start_urls:
+        print("Не указаны стартовые url.", file=sys.stderr)  # noqa: T201
+        return 2
+    try:
+        if args.offline_input is not None:
+            asyncio.run(run_offline_ingest(job, args.offline_input, args.base_url))
+        else:
+            asyncio.run(run_job(job))
+    except JobSpecError as e:
+        print(e, file=sys.stderr)  # noqa: T201
+        return 2
+    except IndexFileNotExistsError as e:
+        print(e, file=sys.stderr)  # noqa: T201
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
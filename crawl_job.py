@@ -0,0 +1,119 @@
+"""Задание на обработку нескольких стартовых страниц."""
+import json
+import asyncio
+import tomllib
+
+from pathlib import Path
+from dataclasses import field, fields, replace, dataclass
+from collections.abc import Callable
+
+from config import BASEDIR
+from start_parser import CrawlContext, start_parser, open_crawl_context
+from logger_config import log
+from app_exceptions import JobSpecError
+from utils.manifest import content_hash
+from utils.common_utils import create_index_md_file
+from parser.parser_config import CrawlSettings, default_strip_tags, default_strip_classes, default_excluded_domains
+
+DEFAULT_OUTPUT_DIRECTORY = BASEDIR / "misc"
+
+CHECKPOINT_KEY_LENGTH = 16  # символов хэша задания в имени базы контрольных точек
+
+# ключи описания задания, хранящие списки строк
+LIST_KEYS = ("start_urls", "allowed_domains", "excluded_domains", "css_classes", "tags_names", "css_selectors")
+
+
+@dataclass(frozen=True, slots=True)
+class CrawlJob:
+    """Задание: стартовые страницы и настройки их обработки."""
+
+    start_urls: tuple[str, ...]
+    output_directory: Path
+    allowed_domains: tuple[str, ...] = ()
+    excluded_domains: tuple[str, ...] = default_excluded_domains
+    css_classes: tuple[str, ...] = default_strip_classes
+    tags_names: tuple[str, ...] = default_strip_tags
+    css_selectors: tuple[str, ...] = ()
+    only_first_page: bool = False
+    settings: CrawlSettings = field(default_factory=CrawlSettings)
+
+
+def with_job_checkpoint(job: CrawlJob) -> CrawlJob:
+    """Задание с базой контрольных точек, имя которой зависит от стартовых страниц и настроек задания.
+
+    Прерванный обход продолжается только тем же заданием, а задание с другими страницами или настройками
+    начинается заново и не использует очередь прежнего.
+    """
+    path = job.settings.checkpoint_path
+    if path is None:
+        return job
+    job_key = content_hash(repr(replace(job, settings=replace(job.settings, checkpoint_path=None))))
+    path = path.with_name(f"{path.stem}-{job_key[:CHECKPOINT_KEY_LENGTH]}{path.suffix}")
+    return replace(job, settings=replace(job.settings, checkpoint_path=path))
+
+
+def read_urls_file(path: Path) -> tuple[str, ...]:
+    """Читает стартовые url из файла: по одному на строку, строки с # пропускаются."""
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return tuple(line.strip() for line in lines if line.strip() and not line.strip().startswith("#"))
+
+
+def load_job_spec(path: Path) -> CrawlJob:
+    """Загружает задание из JSON или TOML файла.
+
+    Настройки обхода задаются в разделе settings именами полей CrawlSettings.
+    """
+    try:
+        text = path.read_text(encoding="utf-8")
+        raw_job = tomllib.loads(text) if path.suffix.lower() == ".toml" else json.loads(text)
+    except (OSError, ValueError) as e:
+        msg = f"Не удалось прочитать задание {path}: {e}"
+        raise JobSpecError(msg) from e
+
+    if not isinstance(raw_job, dict) or not isinstance(raw_job.get("settings", {}), dict):
+        msg = f"Задание {path} должно быть объектом с необязательным разделом settings."
+        raise JobSpecError(msg)
+    raw_settings = raw_job.pop("settings", {})
+    known_settings = {settings_field.name for settings_field in fields(CrawlSettings)}
+    known_keys = {job_field.name for job_field in fields(CrawlJob)} - {"settings"}
+    unknown_keys = (set(raw_job) - known_keys) | {f"settings.{key}" for key in set(raw_settings) - known_settings}
+    if unknown_keys:
+        msg = f"Неизвестные параметры задания {path}: {', '.join(sorted(unknown_keys))}"
+        raise JobSpecError(msg)
+
+    for path_key in ("cache_path", "metrics_path", "checkpoint_path", "seen_urls_directory"):
+        if raw_settings.get(path_key) is not None:
+            raw_settings[path_key] = Path(raw_settings[path_key])
+    for key in LIST_KEYS:
+        if key in raw_job:
+            raw_job[key] = tuple(raw_job[key])
+    output_directory = Path(raw_job.pop("output_directory", DEFAULT_OUTPUT_DIRECTORY))
+    start_urls = raw_job.pop("start_urls", ())
+    return CrawlJob(start_urls=start_urls, output_directory=output_directory,
+                    settings=CrawlSettings(**raw_settings), **raw_job)
+
+
+async def run_job(job: CrawlJob, on_context: Callable[[CrawlContext], None] | None = None) -> None:
+    """Обрабатывает все стартовые страницы задания в одном event loop с общими сессией и пулом конвертации.
+
+    on_context получает открытые ресурсы задания до начала обработки, например для отслеживания метрик.
+    """
+    async with open_crawl_context(job.settings) as context:
+        if on_context is not None:
+            on_context(context)
+        results = await asyncio.gather(*(
+            start_parser(start_url=start_url,
+                         output_directory=job.output_directory,
+                         allowed_domains=job.allowed_domains,
+                         excluded_domains=job.excluded_domains,
+                         css_class=job.css_classes,
+                         tag_name=job.tags_names,
+                         css_selectors=job.css_selectors,
+                         only_first_page=job.only_first_page,
+                         context=context)
+            for start_url in job.start_urls
+        ), return_exceptions=True)
+    for start_url, result in zip(job.start_urls, results, strict=True):
+        if isinstance(result, Exception):
+            log.opt(exception=result).error("Ошибка при обработке {url}.", url=start_url)
+    create_index_md_file(job.output_directory, order=job.settings.index_order, shard=job.settings.index_shard)
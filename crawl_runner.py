@@ -0,0 +1,157 @@
+"""Выполнение задания в фоновом потоке со своим event loop.
+
+Позволяет интерфейсу Streamlit не блокироваться на время обхода: задание хранится в st.session_state,
+переживает перезапуски скрипта при взаимодействии с виджетами и может быть остановлено и продолжено.
+"""
+import time
+import asyncio
+import threading
+import contextlib
+
+from typing import TYPE_CHECKING
+from collections import deque
+from dataclasses import field, dataclass
+
+from crawl_job import CrawlJob, run_job
+from start_parser import CrawlContext
+from logger_config import log
+from utils.crawl_metrics import CrawlMetrics
+
+if TYPE_CHECKING:
+    from loguru import Message  # тип есть только в заглушках loguru
+
+MAX_ERRORS = 100  # количество последних предупреждений и ошибок для отображения
+
+PENDING = "pending"
+RUNNING = "running"
+FINISHED = "finished"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+@dataclass(frozen=True, slots=True)
+class JobProgress:
+    """Снимок состояния задания для отображения."""
+
+    status: str
+    pages_processed: int = 0
+    pages_per_second: float = 0.0
+    bytes_per_second: float = 0.0
+    near_duplicates: int = 0
+    elapsed_seconds: float = 0.0
+    recent_pages: tuple[str, ...] = ()  # url последних обработанных страниц, последняя - в конце
+    errors: tuple[str, ...] = ()  # последние предупреждения и ошибки задания
+    error: str | None = None  # причина аварийного завершения задания
+    resumable: bool = False  # задание сохраняет контрольные точки и может быть продолжено
+
+
+@dataclass
+class CrawlRunner:
+    """Задание, выполняемое в фоновом потоке со своим event loop.
+
+    Все стартовые страницы обрабатываются одновременно через run_job. Предупреждения и ошибки, записанные
+    в лог потоком задания, собираются для отображения. Остановка отменяет задание: записанные файлы
+    и манифесты сохраняются, а при заданном checkpoint_path новый CrawlRunner того же задания продолжает
+    обход с контрольной точки.
+    """
+
+    job: CrawlJob
+    status: str = PENDING
+    error: str | None = None
+    errors: deque[str] = field(default_factory=lambda: deque(maxlen=MAX_ERRORS))
+    _metrics: CrawlMetrics | None = None
+    _thread: threading.Thread | None = None
+    _loop: asyncio.AbstractEventLoop | None = None
+    _task: asyncio.Task[None] | None = None
+    _started_at: float = 0.0
+    _finished_at: float | None = None
+    _cancel_requested: bool = False
+
+    @property
+    def running(self) -> bool:
+        """Выполняется ли задание."""
+        return self.status in {PENDING, RUNNING} and self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Запускает задание в фоновом потоке."""
+        if self._thread is not None:
+            msg = "Задание уже запускалось, для продолжения создайте новый CrawlRunner."
+            raise RuntimeError(msg)
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="crawl-runner", daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Останавливает задание; файлы и контрольные точки сохраняются при завершении."""
+        self._cancel_requested = True
+        if self._loop is not None and self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def join(self, timeout: float | None = None) -> None:
+        """Ожидает завершения задания."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def resume(self) -> "CrawlRunner":
+        """Новый запуск того же задания, продолжающий обход с контрольной точки, если она задана."""
+        runner = CrawlRunner(self.job)
+        runner.start()
+        return runner
+
+    def progress(self) -> JobProgress:
+        """Текущее состояние задания."""
+        metrics = self._metrics
+        finished_at = self._finished_at or time.monotonic()
+        return JobProgress(
+            status=self.status,
+            pages_processed=metrics.pages_processed if metrics else 0,
+            pages_per_second=metrics.pages_per_second if metrics else 0.0,
+            bytes_per_second=metrics.bytes_per_second if metrics else 0.0,
+            near_duplicates=metrics.near_duplicates if metrics else 0,
+            elapsed_seconds=finished_at - self._started_at if self._started_at else 0.0,
+            recent_pages=tuple(metrics.recent_pages) if metrics else (),
+            errors=tuple(self.errors),
+            error=self.error,
+            resumable=self.job.settings.checkpoint_path is not None,
+        )
+
+    def _collect_error(self, message: "Message") -> None:
+        """Сохраняет предупреждение или ошибку, записанную в лог."""
+        record = message.record
+        self.errors.append(f"{record['time']:%H:%M:%S} {record['level'].name}: {record['message']}")
+
+    def _run(self) -> None:
+        """Тело фонового потока: выполняет задание в новом event loop."""
+        thread_id = threading.get_ident()
+        handler_id = log.add(self._collect_error, level="WARNING",
+                             filter=lambda record: record["thread"].id == thread_id)
+        self.status = RUNNING
+        try:
+            asyncio.run(self._run_job())
+        except asyncio.CancelledError:
+            self.status = CANCELLED
+            log.info("Задание остановлено.")
+        except Exception as e:
+            self.status = FAILED
+            self.error = str(e)
+            log.opt(exception=e).error("Задание завершилось с ошибкой.")
+        else:
+            self.status = FINISHED
+        finally:
+            self._finished_at = time.monotonic()
+            self._loop = self._task = None
+            # обработчик мог быть удалён повторной настройкой логов
+            with contextlib.suppress(ValueError):
+                log.remove(handler_id)
+
+    async def _run_job(self) -> None:
+        """Выполняет задание как задачу, которую можно отменить из другого потока."""
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        if self._cancel_requested:
+            raise asyncio.CancelledError
+        await run_job(self.job, on_context=self._on_context)
+
+    def _on_context(self, context: CrawlContext) -> None:
+        """Запоминает метрики открытого задания."""
+        self._metrics = context.metrics
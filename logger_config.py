@@ -1,4 +1,10 @@
-"""Настройки логера loguru."""
+"""Настройки логера loguru.
+
+Импорт модуля не добавляет обработчики и не создаёт файлы: приложение настраивает логи вызовом
+configure_logging при запуске, а при использовании модулей как библиотеки остаётся обработчик loguru
+по умолчанию.
+"""
+import sys
 
 from pathlib import Path
 
@@ -13,31 +19,61 @@ console_format = (
     "<level>{message}</level>"
     "<level>{exception}</level>"
 )
+production_console_format = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}"
 
 LOG_DIR = BASEDIR / "logs"
-if not Path.exists(LOG_DIR):
-    Path.mkdir(LOG_DIR, parents=True)
-
-logger.remove()  # Удаляем стандартный обработчик (иначе будет дублирование)
-
-# Вывод логов в консоль
-logger.add(
-    sink=lambda msg: print(msg, end=""),  # noqa T201
-    level="DEBUG",
-    colorize=True,
-    format=console_format,
-)
-
-# Вывод логов в JSON-файл с ротацией и сжатием
 JSON_LOG_FILE = LOG_DIR / "log.json"
 
-logger.add(
-    JSON_LOG_FILE,
-    rotation="10 MB",  # Ротация по размеру файла
-    compression="zip",  # Сжатие старых логов
-    level="DEBUG",  # Уровень логирования
-    serialize=True,  # Логи в формате JSON
-    enqueue=True,  # Асинхронная запись
+LOG_MODES = (
+    "debug",  # все сообщения, цветной вывод в консоль с местом вызова
+    "production",  # сообщения от INFO, запись в консоль и файл в фоновом потоке с буферизацией файла
 )
+default_log_mode = "debug"
+default_log_levels = {"debug": "DEBUG", "production": "INFO"}
+production_file_buffer_bytes = 64 * 1024
 
 log = logger
+
+
+def configure_logging(mode: str = default_log_mode,
+                      level: str | None = None,
+                      json_log_file: Path | None = JSON_LOG_FILE,
+                      console: bool = True,
+                      ) -> None:
+    """Настраивает обработчики логов, заменяя ранее добавленные.
+
+    level - минимальный уровень сообщений, по умолчанию зависит от mode. Сообщения ниже уровня отбрасываются
+    до форматирования, поэтому частые сообщения следует передавать с аргументами, а не f-строкой.
+    json_log_file - файл логов в формате JSON с ротацией и сжатием; None - без записи в файл.
+    """
+    if mode not in LOG_MODES:
+        msg = f"Неизвестный режим логов: {mode}"
+        raise ValueError(msg)
+    level = level or default_log_levels[mode]
+    production = mode == "production"
+
+    logger.remove()  # Удаляем стандартный обработчик (иначе будет дублирование)
+
+    # Вывод логов в консоль
+    if console:
+        logger.add(
+            sink=sys.stdout,
+            level=level,
+            colorize=not production,
+            format=production_console_format if production else console_format,
+            enqueue=production,  # в рабочем режиме вывод не блокирует event loop
+        )
+
+    # Вывод логов в JSON-файл с ротацией и сжатием
+    if json_log_file is not None:
+        json_log_file.parent.mkdir(parents=True, exist_ok=True)
+        file_options = {"buffering": production_file_buffer_bytes} if production else {}
+        logger.add(
+            json_log_file,
+            rotation="10 MB",  # Ротация по размеру файла
+            compression="zip",  # Сжатие старых логов
+            level=level,  # Уровень логирования
+            serialize=True,  # Логи в формате JSON
+            enqueue=True,  # Асинхронная запись
+            **file_options,
+        )
@@ -1,18 +1,184 @@
 """Запуск интерфейса Streamlit."""
-import asyncio
-
 from pathlib import Path
 
 import streamlit as st
 
 from config import BASEDIR
-from start_parser import start_parser
-from logger_config import log
-from app_exceptions import IndexFileNotExistsError
-from utils.common_utils import create_index_md_file
-from parser.parser_config import default_strip_tags, default_strip_classes, default_excluded_domains
+from crawl_job import CrawlJob, with_job_checkpoint
+from crawl_runner import FAILED, PENDING, RUNNING, FINISHED, CANCELLED, CrawlRunner
+from logger_config import log, configure_logging
+from parser.sitemap import DISCOVERY_MODES
+from utils.index_builder import INDEX_ORDERS, INDEX_SHARDS
+from parser.html_backends import available_html_parsers, available_link_extractors
+from parser.parser_config import (
+    CrawlSettings,
+    default_cache_ttl,
+    default_max_depth,
+    default_strip_tags,
+    default_max_retries,
+    default_read_timeout,
+    default_dns_cache_ttl,
+    default_request_burst,
+    default_strip_classes,
+    default_max_body_bytes,
+    default_connect_timeout,
+    default_max_concurrency,
+    default_connection_limit,
+    default_excluded_domains,
+    default_keepalive_timeout,
+    default_conversion_workers,
+    default_requests_per_second,
+    default_per_host_concurrency,
+    default_boilerplate_min_pages,
+    default_near_duplicate_distance,
+    default_connection_limit_per_host,
+)
 
 if __name__ == "__main__":
+    def crawl_settings_input() -> CrawlSettings:
+        """Поля настроек обхода страниц."""
+        with st.expander("Настройки обхода"):
+            max_concurrency = int(st.number_input("Максимальное количество одновременно обрабатываемых страниц",
+                                                  min_value=1, value=default_max_concurrency, step=1))
+            per_host_concurrency = int(st.number_input("Максимальное количество одновременных запросов к одному хосту",
+                                                       min_value=1, value=default_per_host_concurrency, step=1))
+            conversion_workers = int(st.number_input("Количество процессов для конвертации в markdown "
+                                                     "(0 - конвертация в основном процессе)",
+                                                     min_value=0, value=default_conversion_workers, step=1))
+            max_depth = int(st.number_input("Глубина обхода ссылок (1 - только ссылки указанных страниц)",
+                                            min_value=1, value=default_max_depth, step=1))
+            discovery = st.selectbox("Страницы первого уровня обхода", DISCOVERY_MODES,
+                                     format_func={"links": "ссылки указанных страниц",
+                                                  "sitemap": "sitemap или лента RSS/Atom указанных url"}.get)
+            max_pages = int(st.number_input("Максимальное количество страниц для одного URL (0 - без ограничения)",
+                                            min_value=0, value=0, step=1))
+
+            use_cache = st.checkbox("Кэшировать HTTP-ответы между запусками", value=True)
+            cache_ttl_hours = st.number_input("Время использования ответа из кэша без проверки на сервере, часов",
+                                              min_value=0.0, value=default_cache_ttl / 3600, step=1.0)
+            cache_path = BASEDIR / "cache" / "http_cache.sqlite" if use_cache else None
+
+            max_body_megabytes = st.number_input("Максимальный размер загружаемой страницы, МБ",
+                                                 min_value=0.1, value=default_max_body_bytes / 1024 / 1024, step=1.0)
+            connect_timeout = st.number_input("Таймаут установки соединения, секунд",
+                                              min_value=0.1, value=default_connect_timeout, step=1.0)
+            read_timeout = st.number_input("Таймаут чтения ответа, секунд",
+                                           min_value=0.1, value=default_read_timeout, step=1.0)
+
+            connection_limit = int(st.number_input("Размер пула HTTP-соединений",
+                                                   min_value=1, value=default_connection_limit, step=1))
+            connection_limit_per_host = int(st.number_input("Размер пула HTTP-соединений к одному хосту",
+                                                            min_value=1, value=default_connection_limit_per_host,
+                                                            step=1))
+            dns_cache_ttl = int(st.number_input("Время кэширования DNS, секунд",
+                                                min_value=0, value=default_dns_cache_ttl, step=60))
+            keepalive_timeout = st.number_input("Время удержания неиспользуемого соединения, секунд",
+                                                min_value=0.0, value=default_keepalive_timeout, step=5.0)
+
+            requests_per_second = st.number_input("Максимальное количество запросов к одному хосту в секунду "
+                                                  "(0 - без ограничения)",
+                                                  min_value=0.0, value=default_requests_per_second, step=1.0)
+            request_burst = int(st.number_input("Количество запросов к хосту, выполняемых без ожидания",
+                                                min_value=1, value=default_request_burst, step=1))
+            max_retries = int(st.number_input("Количество повторов при ответах 429, 5xx и ошибках подключения",
+                                              min_value=0, value=default_max_retries, step=1))
+            respect_robots = st.checkbox("Соблюдать robots.txt и Crawl-delay", value=True)
+
+            html_parser = st.selectbox("Парсер HTML для конвертации", available_html_parsers())
+            link_extractor = st.selectbox("Способ извлечения ссылок", available_link_extractors())
+
+            fsync = st.checkbox("Сбрасывать записанные файлы на диск (медленнее, но надёжнее при сбоях)", value=True)
+
+            index_order = st.selectbox("Порядок страниц в INDEX.md", INDEX_ORDERS,
+                                       format_func={"crawl": "в порядке обхода", "title": "по заголовку"}.get)
+            index_shard = st.selectbox("Разделение INDEX.md на дочерние индексы", INDEX_SHARDS,
+                                       format_func={"none": "без разделения", "domain": "по доменам",
+                                                    "alpha": "по первой букве заголовка"}.get)
+
+            incremental = st.checkbox("Пропускать неизменённые страницы при повторной синхронизации", value=True)
+            skip_near_duplicates = st.checkbox("Пропускать страницы, почти совпадающие с уже сохранёнными",
+                                               value=False)
+            boilerplate_min_pages = int(st.number_input("Удалять блоки, повторяющиеся на стольких страницах обхода "
+                                                        "(0 - не удалять)",
+                                                        min_value=0, value=default_boilerplate_min_pages, step=1))
+            use_checkpoint = st.checkbox("Сохранять прогресс обхода и продолжать прерванный обход", value=True)
+            checkpoint_path = BASEDIR / "cache" / "crawl_checkpoint.sqlite" if use_checkpoint else None
+
+        return CrawlSettings(
+            max_concurrency=max_concurrency,
+            per_host_concurrency=per_host_concurrency,
+            conversion_workers=conversion_workers,
+            max_depth=max_depth,
+            max_pages=max_pages or None,
+            discovery=discovery,
+            cache_path=cache_path,
+            cache_ttl=cache_ttl_hours * 3600,
+            incremental=incremental,
+            html_parser=html_parser,
+            link_extractor=link_extractor,
+            max_body_bytes=int(max_body_megabytes * 1024 * 1024),
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            connection_limit=connection_limit,
+            connection_limit_per_host=connection_limit_per_host,
+            dns_cache_ttl=dns_cache_ttl,
+            keepalive_timeout=keepalive_timeout,
+            requests_per_second=requests_per_second,
+            request_burst=request_burst,
+            max_retries=max_retries,
+            respect_robots=respect_robots,
+            fsync=fsync,
+            index_order=index_order,
+            index_shard=index_shard,
+            checkpoint_path=checkpoint_path,
+            near_duplicate_distance=default_near_duplicate_distance if skip_near_duplicates else None,
+            boilerplate_min_pages=boilerplate_min_pages,
+        )
+
+    @st.cache_resource
+    def setup_logging() -> None:
+        """Настраивает логи один раз на процесс.
+
+        Streamlit перезапускает скрипт при каждом взаимодействии с виджетами, а повторная настройка удалила бы
+        обработчики логов, добавленные выполняющимся заданием.
+        """
+        configure_logging()
+
+    @st.fragment(run_every=1)
+    def show_progress() -> None:
+        """Раз в секунду обновляет прогресс задания из st.session_state, не перезапуская остальную страницу."""
+        runner: CrawlRunner | None = st.session_state.get("crawl_runner")
+        if runner is None:
+            return
+        progress = runner.progress()
+        pages_column, pps_column, bps_column, duplicates_column = st.columns(4)
+        pages_column.metric("Обработано страниц", progress.pages_processed)
+        pps_column.metric("Страниц в секунду", f"{progress.pages_per_second:.1f}")
+        bps_column.metric("Загрузка, КБ/с", f"{progress.bytes_per_second / 1024:.1f}")
+        duplicates_column.metric("Пропущено повторов", progress.near_duplicates)
+
+        if progress.status in {PENDING, RUNNING}:
+            st.info(f"Обработка идёт {progress.elapsed_seconds:.0f} с...")
+            if st.button("Остановить"):
+                runner.cancel()
+        elif progress.status == FINISHED:
+            st.success(f"Парсинг завершен за {progress.elapsed_seconds:.0f} с. Список файлов создан.")
+        elif progress.status == CANCELLED:
+            st.warning("Парсинг остановлен.")
+        else:
+            st.error(f"Парсинг завершился с ошибкой: {progress.error}")
+
+        if progress.status in {CANCELLED, FAILED} and progress.resumable and st.button("Продолжить"):
+            st.session_state["crawl_runner"] = runner.resume()
+            st.rerun()
+
+        if progress.recent_pages:
+            with st.expander("Последние обработанные страницы"):
+                st.text("\n".join(reversed(progress.recent_pages)))
+        if progress.errors:
+            with st.expander(f"Предупреждения и ошибки ({len(progress.errors)})"):
+                st.text("\n".join(reversed(progress.errors)))
+
     def run_app() -> None:
         """Функция для запуска приложения через Streamlit."""
         st.title("Приложение для конвертации html данных страниц в markdown файлы")
@@ -24,6 +190,8 @@ if __name__ == "__main__":
 
         only_first_page = st.checkbox("Получить только md указанных страниц", value=False)
 
+        settings = crawl_settings_input()
+
         default_dir = BASEDIR / "misc"
         output_directory_input = st.text_input("Введите путь к выходной директории", value=str(default_dir))
         output_directory = Path(output_directory_input)
@@ -43,8 +211,14 @@ if __name__ == "__main__":
             tuple([str(tag_name).strip()
                    for tag_name in tags_names_to_exclude_input.split("\n") if tag_name.strip()]))
 
+        css_selectors_input = st.text_area("Введите CSS-селекторы элементов для исключения из результатов, "
+                                           "например div.sidebar > ul или #cookie-banner (по одному на строку)",
+                                           height=100)
+        css_selectors = tuple(selector.strip() for selector in css_selectors_input.split("\n") if selector.strip())
+
         allowed_domains_input = st.text_area(
-            "Введите разрешенные домены, например, example.com ",
+            "Введите разрешенные домены, например, example.com (с поддоменами), *.example.com (только поддомены), "
+            "=example.com (только сам домен), example.com/docs (с префиксом пути)",
             height=100,
         )
         allowed_domains = tuple([str(domain).strip() for domain in allowed_domains_input.split("\n") if domain.strip()])
@@ -81,30 +255,31 @@ if __name__ == "__main__":
                     st.error(f"Не удалось создать выходную директорию: {e}")
                     return
 
-            for url in start_urls:
-                msg = f"Обработка {url}..." if not only_first_page else \
-                    f"Обработка {url} (получение md только указанных страниц)..."
-                st.info(msg)
-                log.info(msg)
-                asyncio.run(start_parser(
-                    start_url=url,
+            previous_runner: CrawlRunner | None = st.session_state.get("crawl_runner")
+            if previous_runner is not None and previous_runner.running:
+                st.error("Предыдущее задание ещё выполняется, остановите его перед запуском нового.")
+            else:
+                # прерванный обход продолжается только тем же заданием, изменённое начинается заново
+                job = with_job_checkpoint(CrawlJob(
+                    start_urls=tuple(start_urls),
                     output_directory=output_directory,
-                    css_class=css_classes_to_exclude,
-                    tag_name=tags_names_to_exclude,
                     allowed_domains=allowed_domains,
-                    excluded_domains=excluded_domains,
+                    excluded_domains=tuple(excluded_domains),
+                    css_classes=css_classes_to_exclude,
+                    tags_names=tags_names_to_exclude,
+                    css_selectors=css_selectors,
                     only_first_page=only_first_page,
+                    settings=settings,
                 ))
+                log.info("Запуск обработки {count} url.", count=len(start_urls))
+                runner = CrawlRunner(job)
+                runner.start()
+                st.session_state["crawl_runner"] = runner
 
-            # Создание индексного файла
-            try:
-                create_index_md_file(output_directory)
-                st.success("Парсинг завершен. Список файлов создан..")
-            except IndexFileNotExistsError as e:
-                log.error("Ошибка при создании индексного файла.")
-                log.exception(e)
-                st.error("Произошла ошибка при создании индексного файла.")
+        # задание выполняется в фоновом потоке и переживает перезапуски скрипта при взаимодействии с виджетами
+        show_progress()
 
 
     if __name__ == "__main__":
+        setup_logging()
         run_app()
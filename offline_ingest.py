@@ -0,0 +1,88 @@
+"""Конвертация сохранённых страниц без сети: дерева HTML файлов или архива WARC."""
+import asyncio
+
+from pathlib import Path
+from collections.abc import Iterator
+
+import aiohttp
+
+from crawl_job import CrawlJob
+from start_parser import open_crawl_context
+from logger_config import log
+from app_exceptions import JobSpecError
+from utils.local_pages import file_url, is_warc_file, read_html_file, iter_warc_pages, iter_directory_pages
+from utils.common_utils import DEFAULT_MAX_BODY_BYTES, create_index_md_file
+
+QUEUE_SIZE_PER_WORKER = 2  # страниц в очереди на каждую задачу обработки
+
+
+def iter_local_pages(source: Path,
+                     base_url: str | None = None,
+                     max_bytes: int = DEFAULT_MAX_BODY_BYTES,
+                     ) -> Iterator[tuple[str, Path | str]]:
+    """Url и страницы источника: пути HTML файлов директории или HTML из записей архива WARC не больше max_bytes."""
+    if source.is_dir():
+        return iter_directory_pages(source, base_url)
+    if is_warc_file(source):
+        return iter_warc_pages(source, max_bytes)
+    msg = f"Источник {source} не является директорией или архивом WARC."
+    raise JobSpecError(msg)
+
+
+async def run_offline_ingest(job: CrawlJob, source: Path, base_url: str | None = None) -> int:
+    """Конвертирует сохранённые страницы source с настройками задания job и возвращает количество страниц.
+
+    Страницы обрабатываются тем же парсером, что и при обходе, с теми же правилами удаления элементов, манифестом
+    и пулом конвертации, но вместо загрузки по HTTP читаются с диска: файлы директории через отображение в память,
+    архив WARC потоково по записям. Чтение идёт в отдельном потоке и ограничено очередью, поэтому в памяти
+    находятся только страницы, ожидающие конвертации. base_url задаёт url страниц директории вместо file://.
+    """
+    settings = job.settings
+    workers = max(1, settings.max_concurrency)
+    pages = iter_local_pages(source, base_url, settings.max_body_bytes)
+    # url -> путь файла или HTML страницы, ещё не переданной парсеру
+    pending: dict[str, Path | str] = {}
+
+    async def read_page(_session: aiohttp.ClientSession, url: str) -> str | None:
+        """Заменяет загрузку страницы чтением сохранённой страницы."""
+        page = pending.pop(url, None)
+        if isinstance(page, Path):
+            return await asyncio.to_thread(read_html_file, page, settings.max_body_bytes)
+        return page
+
+    queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=workers * QUEUE_SIZE_PER_WORKER)
+    processed = 0
+
+    async def process_pages() -> None:
+        """Обрабатывает страницы из очереди до получения None."""
+        nonlocal processed
+        while (url := await queue.get()) is not None:
+            try:
+                if await parser.process_page(url) is not None:
+                    processed += 1
+            except Exception as e:
+                log.opt(exception=e).error("Ошибка при обработке страницы {url}.", url=url)
+
+    job.output_directory.mkdir(parents=True, exist_ok=True)
+    async with open_crawl_context(settings) as context:
+        parser = context.create_parser(file_url(source, source, base_url), job.output_directory,
+                                       job.allowed_domains, job.excluded_domains, job.css_classes, job.tags_names,
+                                       job.css_selectors, fetch_html=read_page)
+        tasks = [asyncio.create_task(process_pages()) for _ in range(workers)]
+        try:
+            while (item := await asyncio.to_thread(next, pages, None)) is not None:
+                url, page = item
+                if url in pending:
+                    log.debug("Страница {url} повторяется в источнике и пропущена.", url=url)
+                    continue
+                pending[url] = page
+                await queue.put(url)
+            for _ in tasks:
+                await queue.put(None)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+    create_index_md_file(job.output_directory, order=settings.index_order, shard=settings.index_shard)
+    log.info("Сохранённые страницы {source} обработаны: {count}.", source=source, count=processed)
+    return processed
@@ -0,0 +1,76 @@
+"""Обнаружение и удаление блоков, повторяющихся на многих страницах сайта: шапок, меню, баннеров."""
+import hashlib
+
+from bs4 import Tag, BeautifulSoup
+
+from logger_config import log
+
+BLOCK_MAX_DEPTH = 3  # глубина от <body>, до которой элементы рассматриваются как блоки страницы
+BLOCK_MIN_TEXT_LENGTH = 20  # блоки с более коротким текстом не учитываются
+PRUNE_EVERY_PAGES = 1000  # как часто забываются блоки, встретившиеся только на одной странице
+
+
+def block_hash(element: Tag) -> int:
+    """64-битный хэш блока по имени тега и тексту с нормализованными пробелами; 0 для блоков с коротким текстом."""
+    text = " ".join(element.get_text(" ").split())
+    if len(text) < BLOCK_MIN_TEXT_LENGTH:
+        return 0
+    digest = hashlib.blake2b(f"{element.name}\0{text}".encode("utf-8", errors="surrogatepass"), digest_size=8)
+    return int.from_bytes(digest.digest())
+
+
+def strip_boilerplate(page_soup: BeautifulSoup, boilerplate: frozenset[int]) -> tuple[int, ...]:
+    """Удаляет блоки с хэшами из boilerplate и возвращает хэши остальных блоков страницы.
+
+    Рассматриваются элементы до глубины BLOCK_MAX_DEPTH от <body>, поэтому стоимость не превышает нескольких
+    проходов по тексту страницы. Вложенные элементы удалённого блока не рассматриваются.
+    """
+    root = page_soup.body or page_soup
+    hashes = []
+    level = [child for child in root.children if isinstance(child, Tag)]
+    for _ in range(BLOCK_MAX_DEPTH):
+        next_level = []
+        for element in level:
+            element_hash = block_hash(element)
+            if element_hash in boilerplate:
+                element.decompose()
+                continue
+            if element_hash:
+                hashes.append(element_hash)
+            next_level.extend(child for child in element.children if isinstance(child, Tag))
+        level = next_level
+    return tuple(hashes)
+
+
+class BoilerplateDetector:
+    """Счётчик блоков страниц обхода: блок, встретившийся на min_pages страницах, считается повторяющимся.
+
+    Повторяющиеся блоки передаются в конвертацию следующих страниц и удаляются из них. Страницы, обработанные
+    до обнаружения блока, сохраняются с ним.
+    """
+
+    def __init__(self, min_pages: int) -> None:
+        """Инициализация счётчика."""
+        self.min_pages = min_pages
+        self.blocks: frozenset[int] = frozenset()  # хэши повторяющихся блоков
+        self._counts: dict[int, int] = {}  # хэш блока -> количество страниц с ним
+        self._pages = 0
+
+    def observe(self, block_hashes: tuple[int, ...]) -> None:
+        """Учитывает блоки очередной страницы."""
+        new_blocks = []
+        for element_hash in set(block_hashes) - self.blocks:
+            count = self._counts.get(element_hash, 0) + 1
+            if count >= self.min_pages:
+                new_blocks.append(element_hash)
+                self._counts.pop(element_hash, None)
+            else:
+                self._counts[element_hash] = count
+        if new_blocks:
+            self.blocks |= frozenset(new_blocks)
+            log.debug("Обнаружено повторяющихся блоков: {count}, всего {total}.", count=len(new_blocks),
+                      total=len(self.blocks))
+        self._pages += 1
+        # уникальные блоки страниц (основной текст) составляют большую часть счётчика и почти никогда не повторяются
+        if self._pages % PRUNE_EVERY_PAGES == 0:
+            self._counts = {element_hash: count for element_hash, count in self._counts.items() if count > 1}
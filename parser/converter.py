@@ -0,0 +1,103 @@
+"""Конвертация HTML в markdown.
+
+Функции модуля не используют состояние парсера и event loop, поэтому могут выполняться в пуле процессов.
+"""
+import re
+import time
+
+from dataclasses import dataclass
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from markdownify import MarkdownConverter
+
+from utils.simhash import text_fingerprint
+from parser.boilerplate import strip_boilerplate
+from parser.strip_rules import StripRules
+from utils.common_utils import sanitize_filename
+
+
+@dataclass(frozen=True, slots=True)
+class ConvertedPage:
+    """Результат конвертации страницы."""
+
+    name: str  # очищенное название страницы для имени файла
+    markdown: str | None  # None, если контент страницы пуст
+    links: tuple[tuple[str, str], ...] = ()  # ссылки страницы (url, текст), если они запрашивались
+    title: str = ""  # текст <title> страницы
+    timings: tuple[tuple[str, float], ...] = ()  # длительности этапов parse, strip, convert, fingerprint в секундах
+    block_hashes: tuple[int, ...] = ()  # хэши блоков страницы для обнаружения повторяющихся (см. parser.boilerplate)
+    simhash: int = 0  # SimHash markdown страницы, если он запрашивался; 0 - не вычислялся или текст слишком короткий
+
+
+class PageMarkdownConverter(MarkdownConverter):
+    """Конвертер уже разобранного дерева страницы в markdown с настройками приложения."""
+
+    class Options(MarkdownConverter.DefaultOptions):
+        """Настройки конвертации."""
+
+        code_language = "python"
+        default_title = False
+
+
+# конвертер не хранит состояния между страницами, поэтому создаётся один раз на процесс
+page_markdown_converter = PageMarkdownConverter()
+
+
+def extract_links(page_soup: BeautifulSoup, base_url: str) -> list[tuple[str, str]]:
+    """Извлекает все ссылки со страницы в виде абсолютных url и текста ссылки."""
+    links = []
+    for a_tag in page_soup.find_all("a", href=True):
+        href: str = a_tag["href"]
+        full_url: str = urljoin(base_url, href)
+        links.append((full_url, a_tag.get_text(strip=True)))
+    return links
+
+
+def convert_html_to_markdown(html: str,
+                             strip_rules: StripRules,
+                             base_url: str | None = None,
+                             html_parser: str = "html.parser",
+                             boilerplate: frozenset[int] | None = None,
+                             fingerprint: bool = False,
+                             ) -> ConvertedPage:
+    """Конвертирует HTML страницы в markdown, предварительно удаляя элементы по правилам strip_rules.
+
+    Если передан base_url, ссылки страницы извлекаются из того же дерева до удаления элементов.
+    html_parser - построитель дерева BeautifulSoup: "html.parser" или "lxml".
+    Если передан boilerplate, из страницы удаляются повторяющиеся блоки с этими хэшами, а хэши остальных
+    блоков возвращаются в block_hashes.
+    При fingerprint=True вычисляется SimHash markdown, то есть текста, оставшегося после удаления элементов:
+    общие для сайта меню и подвалы не делают похожими страницы с разным содержимым.
+    """
+    started = time.perf_counter()
+    page_soup = BeautifulSoup(html, html_parser)
+    links = tuple(extract_links(page_soup, base_url)) if base_url is not None else ()
+    parsed = time.perf_counter()
+
+    # удаление элементов по тегам, css классам и селекторам до сериализации, чтобы не конвертировать лишнее
+    strip_rules.strip(page_soup)
+    block_hashes = strip_boilerplate(page_soup, boilerplate) if boilerplate is not None else ()
+    stripped = time.perf_counter()
+
+    title_tag = page_soup.find("title")
+    a_tag_text = title_tag.get_text(strip=True) if title_tag else "Unnamed_Page"
+    unique_name = sanitize_filename(a_tag_text)
+
+    # дерево передаётся в конвертер напрямую, без сериализации в строку и повторного разбора
+    content = page_markdown_converter.convert_soup(page_soup)
+    timings = (("parse", parsed - started), ("strip", stripped - parsed), ("convert", time.perf_counter() - stripped))
+
+    if not content.strip():
+        return ConvertedPage(name=unique_name, markdown=None, links=links, title=a_tag_text, timings=timings,
+                             block_hashes=block_hashes)
+
+    cleaned_content = content.replace(unique_name, "")
+    cleaned_content = re.sub(r"\n{2,}", "\n", cleaned_content)
+    simhash = 0
+    if fingerprint:
+        converted = time.perf_counter()
+        simhash = text_fingerprint(cleaned_content)
+        timings += (("fingerprint", time.perf_counter() - converted),)
+    return ConvertedPage(name=unique_name, markdown=cleaned_content, links=links, title=a_tag_text,
+                         timings=timings, block_hashes=block_hashes, simhash=simhash)
@@ -0,0 +1,137 @@
+"""Многоуровневый обход страниц."""
+import asyncio
+
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from logger_config import log
+from parser.sitemap import SitemapDiscovery
+from utils.crawl_state import SeenUrls, HostTable, BloomSeenUrls
+from utils.common_utils import normalize_url
+from utils.host_limiter import HostLimiter
+from parser.parser_class import Parser
+from utils.crawl_checkpoint import CrawlProgress
+
+if TYPE_CHECKING:
+    from utils.crawl_state import FrontierLink
+
+CRAWLABLE_SCHEMES = ("http", "https")
+
+
+class Crawler:
+    """Обход страниц в ширину от стартовой страницы парсера.
+
+    Каждая страница загружается не более одного раза: ссылки приводятся к каноническому виду и проверяются
+    по множеству уже запланированных url. Страницы первого уровня берутся из ссылок стартовой страницы или,
+    если задан discovery, из sitemap и лент. Если задан progress, очередь обхода и результаты обработки страниц
+    сохраняются в контрольных точках, и прерванный обход продолжается с сохранённой очереди.
+    Запланированные страницы хранятся хэшами в seen (см. utils.crawl_state), ссылки очереди - без повторения
+    схемы и хоста.
+    """
+
+    def __init__(self,
+                 parser: Parser,
+                 limiter: HostLimiter,
+                 max_depth: int = 1,
+                 max_pages: int | None = None,
+                 progress: CrawlProgress | None = None,
+                 discovery: SitemapDiscovery | None = None,
+                 seen: SeenUrls | BloomSeenUrls | None = None,
+                 ) -> None:
+        """Инициализация обходчика."""
+        self.parser = parser
+        self.limiter = limiter
+        self.max_depth = max_depth  # глубина обхода, ссылки стартовой страницы имеют глубину 1
+        self.max_pages = max_pages  # None - без ограничения
+        self.seen = seen if seen is not None else SeenUrls()
+        self.hosts = HostTable()
+        self.scheduled_pages = 0
+        self.progress = progress
+        self.discovery = discovery
+        self._frontier: asyncio.Queue[FrontierLink] = asyncio.Queue()
+
+    def _enqueue(self, links: list[tuple[str, str]], depth: int) -> None:
+        """Добавляет в очередь обхода ещё не запланированные ссылки."""
+        for link, _ in links:
+            if self.max_pages is not None and self.scheduled_pages >= self.max_pages:
+                return
+            if urlsplit(link).scheme not in CRAWLABLE_SCHEMES:
+                continue
+            key = normalize_url(link)
+            if not self.seen.add(key):
+                continue
+            self.scheduled_pages += 1
+            self._frontier.put_nowait(self.hosts.link(link, depth))
+            if self.progress is not None:
+                self.progress.add_pending(key, link, depth)
+
+    async def _worker(self) -> None:
+        """Обрабатывает страницы из очереди обхода."""
+        while True:
+            frontier_link = await self._frontier.get()
+            link, depth = self.hosts.url(frontier_link), frontier_link.depth
+            try:
+                async with self.limiter.limit(link):
+                    links = await self.parser.process_page(page_link=link, collect_links=depth < self.max_depth)
+                self._enqueue(links or [], depth + 1)
+                await self._record_result(link, processed=links is not None)
+            except Exception as e:
+                log.opt(exception=e).error("Ошибка при обработке страницы {url}.", url=link)
+                await self._record_result(link, processed=False)
+            finally:
+                self._frontier.task_done()
+
+    async def _record_result(self, link: str, processed: bool) -> None:
+        """Сохраняет в контрольных точках результат обработки страницы."""
+        if self.progress is None:
+            return
+        if processed:
+            self.progress.mark_done(normalize_url(link))
+        else:
+            self.progress.mark_failed(normalize_url(link))
+        await self.progress.maybe_save()
+
+    async def _start_links(self) -> list[tuple[str, str]]:
+        """Ссылки первого уровня обхода: со стартовой страницы или из sitemap и лент."""
+        async with self.limiter.limit(self.parser.start_page_url):
+            if self.discovery is None:
+                return await self.parser.filter_links()
+            entries = await self.discovery.discover(self.parser.start_page_url)
+        return self.parser.filter_sitemap_entries(entries)
+
+    async def crawl(self) -> None:
+        """Обходит страницы по ссылкам стартовой страницы до глубины max_depth."""
+        try:
+            await self._crawl()
+        finally:
+            self.seen.close()
+        if self.progress is not None:
+            self.progress.finish()
+        log.info("Обход {url} завершён, страниц: {count}.", url=self.parser.start_page_url,
+                 count=self.scheduled_pages)
+
+    async def _crawl(self) -> None:
+        """Заполняет очередь обхода и обрабатывает её до опустошения."""
+        self.seen.add(normalize_url(self.parser.start_page_url))
+        state = self.progress.load() if self.progress is not None else None
+        if state is not None:
+            for key in state.seen:
+                self.seen.add(key)
+            self.scheduled_pages = len(state.seen)
+            for link, depth in state.frontier:
+                self._frontier.put_nowait(self.hosts.link(link, depth))
+            del state
+        else:
+            start_page_links = await self._start_links()
+            if self.progress is not None:
+                self.progress.start()
+            self._enqueue(start_page_links, depth=1)
+            if self.progress is not None:
+                self.progress.commit()
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.limiter.max_concurrency)]
+        try:
+            await self._frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
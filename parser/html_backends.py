@@ -0,0 +1,99 @@
+"""Бэкенды разбора HTML.
+
+Для конвертации используется BeautifulSoup с построителем дерева html.parser или lxml. Для извлечения ссылок,
+которым нужны только теги <a href>, дерево не строится: используется потоковый токенизатор или selectolax.
+"""
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+from parser.converter import extract_links
+
+HTML_PARSERS = ("html.parser", "lxml")
+
+LINK_EXTRACTORS = (
+    "tokenizer",  # потоковый токенизатор стандартной библиотеки
+    "selectolax",  # selectolax (lexbor), требует установки пакета selectolax
+    "soup",  # полное дерево BeautifulSoup
+)
+
+
+def available_html_parsers() -> tuple[str, ...]:
+    """Установленные построители дерева BeautifulSoup."""
+    return tuple(html_parser for html_parser in HTML_PARSERS if builder_registry.lookup(html_parser) is not None)
+
+
+def available_link_extractors() -> tuple[str, ...]:
+    """Доступные способы извлечения ссылок."""
+    try:
+        import selectolax.lexbor  # noqa: F401, PLC0415
+    except ImportError:
+        return tuple(extractor for extractor in LINK_EXTRACTORS if extractor != "selectolax")
+    return LINK_EXTRACTORS
+
+
+class LinkTokenizer(HTMLParser):
+    """Потоковый сборщик ссылок <a href> и их текста без построения дерева документа."""
+
+    def __init__(self, base_url: str) -> None:
+        """Инициализация сборщика."""
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.links: list[tuple[str, str]] = []
+        self._href: str | None = None
+        self._text_parts: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        """Начало ссылки."""
+        if tag != "a":
+            return
+        self._finish_link()  # незакрытая предыдущая ссылка
+        href = dict(attrs).get("href")
+        if href is not None:
+            self._href = href
+
+    def handle_endtag(self, tag: str) -> None:
+        """Конец ссылки."""
+        if tag == "a":
+            self._finish_link()
+
+    def handle_data(self, data: str) -> None:
+        """Текст внутри ссылки."""
+        if self._href is not None:
+            self._text_parts.append(data.strip())
+
+    def _finish_link(self) -> None:
+        """Сохраняет собранную ссылку."""
+        if self._href is not None:
+            self.links.append((urljoin(self.base_url, self._href), "".join(self._text_parts)))
+        self._href = None
+        self._text_parts = []
+
+    def close(self) -> None:
+        """Завершает разбор документа."""
+        super().close()
+        self._finish_link()
+
+
+def extract_html_links(html: str,
+                       base_url: str,
+                       link_extractor: str = "tokenizer",
+                       html_parser: str = "html.parser",
+                       ) -> list[tuple[str, str]]:
+    """Извлекает ссылки из HTML страницы выбранным способом без конвертации в markdown."""
+    if link_extractor == "tokenizer":
+        tokenizer = LinkTokenizer(base_url)
+        tokenizer.feed(html)
+        tokenizer.close()
+        return tokenizer.links
+    if link_extractor == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser  # noqa: PLC0415
+
+        return [(urljoin(base_url, node.attributes["href"] or ""), node.text(strip=True))
+                for node in LexborHTMLParser(html).css("a[href]")]
+    if link_extractor == "soup":
+        return extract_links(BeautifulSoup(html, html_parser), base_url)
+    msg = f"Неизвестный способ извлечения ссылок: {link_extractor}"
+    raise ValueError(msg)
@@ -1,25 +1,42 @@
 """Парсер."""
-import re
+import asyncio
 
 from pathlib import Path
-from urllib.parse import urljoin, urlparse
+from dataclasses import replace
+from urllib.parse import urlsplit
 from collections.abc import Callable, Awaitable
+from concurrent.futures import Executor
 
 import aiohttp
 
-from bs4 import BeautifulSoup
 from aiohttp import ClientSession
-from markdownify import markdownify
 
 from logger_config import log
-from utils.common_utils import sanitize_filename, save_markdown_file
-from parser.parser_config import default_strip_tags, default_strip_classes, default_excluded_domains
+from utils.simhash import SimHashIndex
+from parser.sitemap import SitemapEntry
+from utils.manifest import Manifest, ManifestEntry, content_hash
+from parser.converter import ConvertedPage, convert_html_to_markdown
+from parser.boilerplate import BoilerplateDetector
+from parser.strip_rules import StripRules
+from utils.common_utils import normalize_url, save_markdown_file
+from utils.crawl_metrics import CrawlMetrics
+from parser.html_backends import LINK_EXTRACTORS, extract_html_links
+from parser.parser_config import (
+    default_strip_tags,
+    default_html_parser,
+    default_strip_classes,
+    default_link_extractor,
+    default_excluded_domains,
+)
+from utils.domain_matcher import DomainMatcher
+from utils.markdown_writer import MarkdownWriter
+from utils.filename_allocator import FilenameAllocator
 
 
 class Parser:
     """Класс для парсинга HTML страниц."""
 
-    def __init__(self,
+    def __init__(self,  # noqa: PLR0913, PLR0917
                  start_page_url: str,
                  directory: Path,
                  session: aiohttp.ClientSession,
@@ -28,76 +45,300 @@ class Parser:
                  excluded_domains: tuple[str, ...] = default_excluded_domains,
                  css_classes: tuple[str, ...] | None = default_strip_classes,
                  tags_names: tuple[str, ...] | None = default_strip_tags,
+                 executor: Executor | None = None,
+                 manifest: Manifest | None = None,
+                 html_parser: str = default_html_parser,
+                 link_extractor: str = default_link_extractor,
+                 css_selectors: tuple[str, ...] | None = None,
+                 writer: MarkdownWriter | None = None,
+                 incremental: bool = True,
+                 filename_allocator: FilenameAllocator | None = None,
+                 metrics: CrawlMetrics | None = None,
+                 near_duplicates: SimHashIndex | None = None,
+                 boilerplate: BoilerplateDetector | None = None,
                  ) -> None:
         """Инициализация парсера."""
         self.start_page_url = start_page_url
         self.directory = directory
-        self.css_classes = css_classes
-        self.tags_names = tags_names
+        self._css_classes = css_classes
+        self._tags_names = tags_names
+        self._css_selectors = css_selectors
+        self._compile_strip_rules()
         self.session = session
         self.fetch_html = fetch_html
         self.allowed_domains = allowed_domains
         self.excluded_domains = excluded_domains
+        # пул для конвертации HTML в markdown; None - конвертация в event loop
+        self.executor = executor
+        # манифест выходной директории: сохранённые страницы для индекса и инкрементальной синхронизации
+        self.manifest = manifest
+        # пропуск конвертации и записи неизменённых по манифесту страниц
+        self.incremental = incremental
+        # имена файлов страниц; общий для всех парсеров, пишущих в одну директорию
+        self.filename_allocator = filename_allocator or FilenameAllocator(manifest)
+        # метрики задания: время этапов конвертации и записи, количество обработанных страниц
+        self.metrics = metrics
+        # стадия асинхронной записи файлов; None - файлы записываются сразу в event loop
+        self.writer = writer
+        # отпечатки сохранённых страниц директории; None - почти одинаковые страницы не пропускаются
+        self.near_duplicates = near_duplicates
+        # повторяющиеся блоки страниц обхода; None - удаляются только элементы по правилам strip_rules
+        self.boilerplate = boilerplate
+        # построитель дерева BeautifulSoup для конвертации и способ извлечения ссылок (см. parser.html_backends)
+        if link_extractor not in LINK_EXTRACTORS:
+            msg = f"Неизвестный способ извлечения ссылок: {link_extractor}"
+            raise ValueError(msg)
+        self.html_parser = html_parser
+        self.link_extractor = link_extractor
+        # даты изменения страниц из sitemap и лент до их обработки: ключ страницы -> lastmod
+        self.lastmods: dict[str, str] = {}
+
+    def _compile_strip_rules(self) -> None:
+        """Компилирует правила удаления элементов страниц из текущих настроек."""
+        self.strip_rules = StripRules.compile(self._css_classes, self._tags_names, self._css_selectors)
+
+    @property
+    def css_classes(self) -> tuple[str, ...] | None:
+        """Удаляемые css классы."""
+        return self._css_classes
+
+    @css_classes.setter
+    def css_classes(self, css_classes: tuple[str, ...] | None) -> None:
+        """Сохраняет удаляемые css классы и перекомпилирует правила удаления."""
+        self._css_classes = css_classes
+        self._compile_strip_rules()
+
+    @property
+    def tags_names(self) -> tuple[str, ...] | None:
+        """Удаляемые теги."""
+        return self._tags_names
+
+    @tags_names.setter
+    def tags_names(self, tags_names: tuple[str, ...] | None) -> None:
+        """Сохраняет удаляемые теги и перекомпилирует правила удаления."""
+        self._tags_names = tags_names
+        self._compile_strip_rules()
+
+    @property
+    def css_selectors(self) -> tuple[str, ...] | None:
+        """Css селекторы удаляемых элементов."""
+        return self._css_selectors
+
+    @css_selectors.setter
+    def css_selectors(self, css_selectors: tuple[str, ...] | None) -> None:
+        """Сохраняет css селекторы удаляемых элементов и перекомпилирует правила удаления."""
+        self._css_selectors = css_selectors
+        self._compile_strip_rules()
+
+    @property
+    def allowed_domains(self) -> tuple[str, ...] | None:
+        """Разрешённые домены."""
+        return self._allowed_domains
+
+    @allowed_domains.setter
+    def allowed_domains(self, allowed_domains: tuple[str, ...] | None) -> None:
+        """Сохраняет разрешённые домены и компилирует их правила."""
+        self._allowed_domains = allowed_domains
+        self._allowed_matcher = DomainMatcher(allowed_domains)
+
+    @property
+    def excluded_domains(self) -> tuple[str, ...] | None:
+        """Игнорируемые домены."""
+        return self._excluded_domains
+
+    @excluded_domains.setter
+    def excluded_domains(self, excluded_domains: tuple[str, ...] | None) -> None:
+        """Сохраняет игнорируемые домены и компилирует их правила."""
+        self._excluded_domains = excluded_domains
+        self._excluded_matcher = DomainMatcher(excluded_domains)
 
     async def get_start_page_html(self) -> str:
         """Получение HTML-кода стартовой страницы."""
         return await self.fetch_html(self.session, self.start_page_url)
 
     async def _extract_links(self) -> list[tuple[str, str]]:
-        """Извлекает все ссылки со страницы."""
-        self.start_page_html = await self.get_start_page_html()
-        start_page_soup = BeautifulSoup(self.start_page_html, "html.parser")
+        """Извлекает все ссылки со страницы; HTML стартовой страницы не сохраняется после извлечения."""
+        start_page_html = await self.get_start_page_html()
+        if not start_page_html:
+            log.warning("Стартовая страница не получена.", url=self.start_page_url)
+            return []
+        return await self.extract_links_from_html(start_page_html, self.start_page_url)
+
+    async def filter_links(self) -> list[tuple[str, str]]:
+        """Фильтрует ссылки стартовой страницы по спискам разрешённых и игнорируемых доменов."""
+        extracted_links = await self._extract_links()
+        return self.filter_extracted_links(extracted_links)
+
+    def filter_sitemap_entries(self, entries: list[SitemapEntry]) -> list[tuple[str, str]]:
+        """Фильтрует страницы из sitemap и лент по доменам и пропускает не изменившиеся по lastmod.
+
+        Страница пропускается, если её lastmod совпадает с сохранённым в манифесте при прошлой обработке
+        и файл страницы существует. Даты остальных страниц запоминаются до их обработки.
+        """
         links = []
-        for a_tag in start_page_soup.find_all("a", href=True):
-            href: str = a_tag["href"]
-            full_url: str = urljoin(self.start_page_url, href)
-            links.append((full_url, a_tag.get_text(strip=True)))
+        unchanged = 0
+        # вместо текста ссылки фильтруется дата изменения
+        for link, lastmod in self.filter_extracted_links([(entry.url, entry.lastmod) for entry in entries]):
+            if lastmod:
+                key = normalize_url(link)
+                manifest_entry = self.manifest.get(key) if self.manifest is not None and self.incremental else None
+                if (manifest_entry is not None and manifest_entry.lastmod == lastmod
+                        and (self.directory / f"{manifest_entry.filename}.md").exists()):
+                    unchanged += 1
+                    continue
+                self.lastmods[key] = lastmod
+            links.append((link, ""))
+        if unchanged:
+            log.info("Страниц без изменений по lastmod: {count}, они не загружаются.", count=unchanged)
         return links
 
-    async def filter_links(self) -> list[tuple[str, str]]:
-        """Фильтрует ссылки по спискам разрешённых и игнорируемых доменов."""
+    def filter_extracted_links(self, extracted_links: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """Фильтрует извлечённые ссылки по спискам разрешённых и игнорируемых доменов."""
         filtered_links = []
-        extracted_links = await self._extract_links()
         for link, link_text in extracted_links:
-            parsed_url = urlparse(link)
-            domain = parsed_url.netloc
-            if self.excluded_domains and any(excluded_domain in domain for excluded_domain in self.excluded_domains):
+            parsed_url = urlsplit(link)
+            host, path = parsed_url.hostname or "", parsed_url.path or "/"
+            if self._excluded_matcher and self._excluded_matcher.matches_host(host, path):
                 continue
-            if self.allowed_domains and not any(allowed_domain in domain for allowed_domain in self.allowed_domains):
+            if self._allowed_matcher and not self._allowed_matcher.matches_host(host, path):
                 continue
             filtered_links.append((link, link_text))
         return filtered_links
 
-    async def process_page(self, page_link: str) -> None:
-        """Обрабатывает одну страницу: сохраняет её содержимое и добавляет в ссылку на INDEX.md."""
+    async def extract_links_from_html(self, html: str, base_url: str) -> list[tuple[str, str]]:
+        """Извлекает ссылки из HTML в пуле executor."""
+        if self.executor is None:
+            return extract_html_links(html, base_url, self.link_extractor, self.html_parser)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, extract_html_links,
+                                          html, base_url, self.link_extractor, self.html_parser)
+
+    async def convert_html(self, html: str, base_url: str | None = None) -> ConvertedPage:
+        """Конвертирует HTML в markdown в пуле executor, не блокируя загрузку других страниц.
+
+        SimHash markdown вычисляется там же, если включён пропуск почти одинаковых страниц.
+        """
+        boilerplate = self.boilerplate.blocks if self.boilerplate is not None else None
+        fingerprint = self.near_duplicates is not None
+        if self.executor is None:
+            return convert_html_to_markdown(html, self.strip_rules, base_url, self.html_parser, boilerplate,
+                                            fingerprint)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, convert_html_to_markdown,
+                                          html, self.strip_rules, base_url, self.html_parser, boilerplate,
+                                          fingerprint)
+
+    def _check_near_duplicate(self, simhash: int, manifest_key: str) -> str | None:
+        """Ищет уже сохранённую страницу с почти таким же SimHash markdown.
+
+        Отпечаток новой страницы добавляется в индекс сразу после конвертации, без переключения event loop,
+        чтобы одновременно обрабатываемые копии не сохранились обе.
+        """
+        if self.near_duplicates is None or not simhash:
+            return None
+        duplicate_url = self.near_duplicates.find_duplicate(manifest_key, simhash)
+        if duplicate_url is None:
+            self.near_duplicates.add(manifest_key, simhash)
+        elif self.metrics is not None:
+            self.metrics.near_duplicates += 1
+        return duplicate_url
+
+    async def _links_without_conversion(self, html: str, page_link: str, collect_links: bool) -> list[tuple[str, str]]:
+        """Ссылки страницы, которая не конвертируется, если они запрошены."""
+        if not collect_links:
+            return []
+        return self.filter_extracted_links(await self.extract_links_from_html(html, page_link))
+
+    async def save_page(self, filename: str, content: str) -> None:
+        """Записывает markdown файл страницы через стадию записи или сразу."""
+        if self.writer is not None:
+            await self.writer.write(self.directory, filename, content)
+        elif self.metrics is not None:
+            with self.metrics.measure("write"):
+                save_markdown_file(self.directory, filename, content)
+        else:
+            save_markdown_file(self.directory, filename, content)
+
+    async def allocate_filename(self, manifest_key: str, title_name: str) -> str:
+        """Имя файла страницы по заголовку, при совпадении с другой страницей - с хэшем url.
+
+        Если имя изменилось вместе с заголовком, файл с прежним именем из манифеста удаляется, когда его
+        не заняла другая страница.
+        """
+        unique_name = self.filename_allocator.allocate(manifest_key, title_name)
+        previous_entry = self.manifest.get(manifest_key) if self.manifest is not None else None
+        if (previous_entry is not None and previous_entry.filename != unique_name
+                and self.filename_allocator.owner(previous_entry.filename) is None):
+            await self.remove_page(previous_entry.filename)
+        return unique_name
+
+    async def remove_page(self, filename: str) -> None:
+        """Удаляет markdown файл страницы через стадию записи, после поставленных раньше записей, или сразу."""
+        if self.writer is not None:
+            await self.writer.remove(self.directory, filename)
+        else:
+            (self.directory / f"{filename}.md").unlink(missing_ok=True)
+
+    async def process_page(self, page_link: str, collect_links: bool = False) -> list[tuple[str, str]] | None:
+        """Обрабатывает одну страницу: сохраняет её содержимое и добавляет в ссылку на INDEX.md.
+
+        При collect_links=True возвращает отфильтрованные ссылки страницы для дальнейшего обхода.
+        Возвращает None, если страница не получена.
+        """
         page_link_html = await self.fetch_html(self.session, page_link)
         if not page_link_html:
             log.warning("Url не получен.", url=page_link)
-            return
-
-        page_soup = BeautifulSoup(page_link_html, "html.parser")
+            return None
+        if self.metrics is not None:
+            self.metrics.page_processed(page_link)
 
-        # удаление тегов, указанных с css классами в css_classes
-        for element in page_soup.find_all(class_=lambda class_: class_ in self.css_classes):
-            element.decompose()
+        manifest_key = normalize_url(page_link)
+        manifest_entry = self.manifest.get(manifest_key) if self.manifest is not None and self.incremental else None
+        source_hash = content_hash(page_link_html, self.strip_rules.fingerprint, self.html_parser)
+        if (manifest_entry is not None and manifest_entry.source_hash == source_hash
+                and (self.directory / f"{manifest_entry.filename}.md").exists()):
+            log.debug("Страница {url} не изменилась, конвертация пропущена.", url=page_link)
+            lastmod = self.lastmods.pop(manifest_key, manifest_entry.lastmod)
+            if lastmod != manifest_entry.lastmod:
+                self.manifest.set(manifest_key, replace(manifest_entry, lastmod=lastmod))
+            return await self._links_without_conversion(page_link_html, page_link, collect_links)
 
-        title_tag = page_soup.find("title")
-        a_tag_text = title_tag.get_text(strip=True) if title_tag else "Unnamed_Page"
-        unique_name = sanitize_filename(a_tag_text)
+        converted_page = await self.convert_html(page_link_html, page_link if collect_links else None)
+        # HTML не нужен после конвертации и не должен занимать память, пока страница ждёт записи
+        del page_link_html
+        if self.metrics is not None:
+            for stage, seconds in converted_page.timings:
+                self.metrics.observe(stage, seconds)
+        links = self.filter_extracted_links(list(converted_page.links))
+        simhash = converted_page.simhash
+        duplicate_url = self._check_near_duplicate(simhash, manifest_key)
+        if duplicate_url is not None:
+            log.debug("Страница {url} почти совпадает с {duplicate_url}, файл не создан.",
+                      url=page_link, duplicate_url=duplicate_url)
+            return links
+        if self.boilerplate is not None:
+            self.boilerplate.observe(converted_page.block_hashes)
 
-        log.info(f"Обработка страницы: {unique_name} ({page_link})")
+        # строка на каждую страницу только в режиме отладки, прогресс пишет CrawlMetrics.page_processed
+        log.debug("Обработка страницы: {name} ({url})", name=converted_page.name, url=page_link)
 
-        content = markdownify(str(page_soup), code_language="python",
-                              default_title=False,
-                              strip=self.tags_names)
+        if converted_page.markdown is None:
+            log.warning("Контент страницы {url} пуст. Файл не создан.", url=page_link)
+            return links
 
-        cleaned_content = content.replace(unique_name, "")
-        cleaned_content = re.sub(r"\n{2,}", "\n", cleaned_content)
-
-        if not content.strip():
-            log.warning(f"Контент страницы {page_link} пуст. Файл не создан.")
-            return
+        unique_name = await self.allocate_filename(manifest_key, converted_page.name)
 
         # Создаем markdown файл для страницы
-        page_content = f"{cleaned_content}\n\n[[INDEX.md]]"
-        save_markdown_file(self.directory, unique_name, page_content)
+        page_content = f"{converted_page.markdown}\n\n[[INDEX.md]]"
+        markdown_hash = content_hash(page_content)
+        if (manifest_entry is not None and manifest_entry.markdown_hash == markdown_hash
+                and manifest_entry.filename == unique_name and (self.directory / f"{unique_name}.md").exists()):
+            log.debug("Markdown страницы {url} не изменился, файл не перезаписан.", url=page_link)
+        else:
+            await self.save_page(unique_name, page_content)
+        if self.manifest is not None:
+            self.manifest.set(manifest_key, ManifestEntry(source_hash=source_hash, markdown_hash=markdown_hash,
+                                                          filename=unique_name, title=converted_page.title,
+                                                          url=page_link, simhash=f"{simhash:016x}" if simhash else "",
+                                                          lastmod=self.lastmods.pop(manifest_key, "")))
+        return links
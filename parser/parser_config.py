@@ -1,4 +1,9 @@
 """Конфигурация парсера."""
+import os
+
+from pathlib import Path
+from dataclasses import dataclass
+
 # игнорируемые домены по умолчанию
 default_excluded_domains = (
     "google.com",
@@ -28,3 +33,143 @@ default_strip_classes = (
     "nav-link", "btn",
     "col-form-label",
 )
+
+# максимальное количество одновременно обрабатываемых страниц
+default_max_concurrency = 10
+
+# максимальное количество одновременных запросов к одному хосту
+default_per_host_concurrency = 4
+
+# количество процессов для конвертации HTML в markdown (0 - конвертация в основном процессе)
+default_conversion_workers = os.cpu_count() or 1
+
+# глубина обхода: 1 - только страницы по ссылкам стартовой страницы
+default_max_depth = 1
+
+# время в секундах, в течение которого ответ из кэша используется без запроса к серверу
+default_cache_ttl = 60 * 60
+
+# максимальный размер кэша HTTP-ответов в байтах
+default_cache_max_size_bytes = 1024 * 1024 * 1024
+
+# построитель дерева BeautifulSoup для конвертации страниц: "html.parser" или "lxml"
+default_html_parser = "html.parser"
+
+# способ извлечения ссылок: "tokenizer", "selectolax" или "soup"
+default_link_extractor = "tokenizer"
+
+# максимальный размер загружаемой страницы в байтах
+default_max_body_bytes = 10 * 1024 * 1024
+
+# таймауты установки соединения и чтения ответа в секундах
+default_connect_timeout = 10.0
+default_read_timeout = 30.0
+
+# пул соединений HTTP-сессии: общий лимит, лимит на хост, время кэширования DNS и удержания соединения в секундах
+default_connection_limit = 100
+default_connection_limit_per_host = 10
+default_dns_cache_ttl = 300
+default_keepalive_timeout = 30.0
+
+# User-Agent запросов, по нему же выбираются правила robots.txt
+default_user_agent = "alinktomarkdown/0.1"
+
+# ограничение частоты запросов к одному хосту: запросов в секунду (0 - без ограничения) и размер всплеска
+default_requests_per_second = 10.0
+default_request_burst = 5
+
+# повтор ответов 429 и 5xx и ошибок подключения: количество повторов, базовая и максимальная задержки в секундах
+default_max_retries = 3
+default_backoff_base = 0.5
+default_backoff_max = 60.0
+
+# время в секундах, в течение которого используется загруженный robots.txt
+default_robots_ttl = 24 * 60 * 60
+
+# запись markdown файлов: размер очереди, количество файлов в пакете и потоков записи
+default_writer_queue_size = 256
+default_writer_batch_size = 32
+default_writer_threads = 4
+
+# порядок страниц в INDEX.md: "crawl" или "title", и разделение на дочерние индексы: "none", "domain" или "alpha"
+default_index_order = "crawl"
+default_index_shard = "none"
+
+# адрес, на котором во время обхода доступны метрики в формате Prometheus, если задан порт
+default_metrics_host = "127.0.0.1"
+
+# контрольные точки обхода: минимальный интервал сохранения в секундах и количество неудачных попыток
+# обработки страницы, после которого она не повторяется при продолжении обхода
+default_checkpoint_interval = 5.0
+default_checkpoint_max_failures = 3
+
+# максимальное расстояние Хэмминга между SimHash markdown почти одинаковых страниц (из 64 бит),
+# если их пропуск включён
+default_near_duplicate_distance = 3
+# количество страниц обхода, на которых должен встретиться блок, чтобы удаляться как повторяющийся;
+# по умолчанию выключено: страницы, обработанные до обнаружения блока, сохраняются с ним, поэтому результат
+# зависит от порядка обхода
+default_boilerplate_min_pages = 0
+
+# способ получения страниц первого уровня обхода: "links" - ссылки стартовой страницы,
+# "sitemap" - sitemap или лента RSS и Atom по стартовому url, либо sitemap сайта
+default_discovery = "links"
+
+# количество страниц одного обхода, на которое рассчитан фильтр Блума запланированных страниц на диске
+default_seen_urls_capacity = 1_000_000
+
+# через сколько обработанных страниц писать в лог строку с прогрессом задания (0 - не писать)
+default_log_every_pages = 100
+
+
+@dataclass(frozen=True, slots=True)
+class CrawlSettings:
+    """Настройки обхода страниц."""
+
+    max_concurrency: int = default_max_concurrency
+    per_host_concurrency: int = default_per_host_concurrency
+    conversion_workers: int = default_conversion_workers
+    max_depth: int = default_max_depth
+    max_pages: int | None = None  # None - без ограничения количества страниц
+    cache_path: Path | None = None  # путь к базе кэша HTTP-ответов; None - без кэша
+    cache_ttl: float = default_cache_ttl
+    cache_max_size_bytes: int = default_cache_max_size_bytes
+    incremental: bool = True  # пропуск конвертации и записи неизменённых страниц по манифесту
+    html_parser: str = default_html_parser
+    link_extractor: str = default_link_extractor
+    max_body_bytes: int = default_max_body_bytes
+    connect_timeout: float = default_connect_timeout
+    read_timeout: float = default_read_timeout
+    connection_limit: int = default_connection_limit
+    connection_limit_per_host: int = default_connection_limit_per_host
+    dns_cache_ttl: int = default_dns_cache_ttl
+    keepalive_timeout: float = default_keepalive_timeout
+    user_agent: str = default_user_agent
+    requests_per_second: float = default_requests_per_second
+    request_burst: int = default_request_burst
+    max_retries: int = default_max_retries
+    backoff_base: float = default_backoff_base
+    backoff_max: float = default_backoff_max
+    respect_robots: bool = True  # соблюдение robots.txt, включая Crawl-delay
+    robots_ttl: float = default_robots_ttl
+    writer_queue_size: int = default_writer_queue_size
+    writer_batch_size: int = default_writer_batch_size
+    writer_threads: int = default_writer_threads
+    fsync: bool = True  # сброс записанных файлов на диск перед переименованием
+    index_order: str = default_index_order
+    index_shard: str = default_index_shard
+    metrics_path: Path | None = None  # путь к JSON файлу со сводкой метрик задания; None - только в лог
+    metrics_host: str = default_metrics_host
+    metrics_port: int | None = None  # порт HTTP-сервера метрик /metrics; None - сервер не запускается
+    log_every_pages: int = default_log_every_pages
+    checkpoint_path: Path | None = None  # путь к базе контрольных точек обхода; None - без продолжения обхода
+    checkpoint_interval: float = default_checkpoint_interval
+    checkpoint_max_failures: int = default_checkpoint_max_failures
+    # пропуск страниц, почти совпадающих с уже сохранёнными; None - сохраняются все страницы
+    near_duplicate_distance: int | None = None
+    boilerplate_min_pages: int = default_boilerplate_min_pages  # 0 - повторяющиеся блоки не удаляются
+    discovery: str = default_discovery
+    # директория временной базы запланированных страниц: в памяти остаётся только фильтр Блума фиксированного
+    # размера; None - страницы хранятся 64-битными хэшами в памяти
+    seen_urls_directory: Path | None = None
+    seen_urls_capacity: int = default_seen_urls_capacity
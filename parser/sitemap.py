@@ -0,0 +1,301 @@
+"""Получение страниц обхода из sitemap.xml, индексов sitemap и лент RSS и Atom.
+
+Документы разбираются потоково по мере загрузки: разобранные записи сразу удаляются из дерева, поэтому
+память не зависит от размера документа. Сжатые gzip документы распаковываются по частям.
+"""
+import zlib
+
+from dataclasses import dataclass
+from urllib.parse import urljoin, urlsplit
+from collections.abc import Callable, Iterator, Awaitable
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
+
+import aiohttp
+
+from aiohttp.web_exceptions import HTTPOk
+
+from logger_config import log
+from app_exceptions import SitemapError, RetryableFetchError
+from utils.common_utils import (
+    CHUNK_SIZE,
+    TRANSIENT_ERRORS,
+    FetchStats,
+    parse_retry_after,
+    is_retryable_status,
+    transient_error_reason,
+)
+from utils.robots_cache import RobotsCache
+
+DISCOVERY_MODES = (
+    "links",  # ссылки стартовой страницы
+    "sitemap",  # страницы из sitemap или ленты стартового url, либо из sitemap сайта
+)
+
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024  # ограничение протокола sitemap на размер распакованного документа
+MAX_SITEMAP_DOCUMENTS = 1000  # максимальное количество документов, загружаемых по индексам sitemap
+
+GZIP_MAGIC = b"\x1f\x8b"
+ABSOLUTE_URL_PREFIXES = ("http://", "https://")
+
+# корневые элементы поддерживаемых документов
+ROOT_TAGS = frozenset(("urlset", "sitemapindex", "rss", "RDF", "feed"))
+# элементы записей: страница sitemap, вложенный sitemap индекса, запись RSS и запись Atom
+PAGE_TAGS = frozenset(("url", "item", "entry"))
+SITEMAP_TAG = "sitemap"
+# элементы с датой изменения записи в порядке предпочтения
+LASTMOD_TAGS = ("lastmod", "updated", "date", "pubDate", "published")
+# ссылки записи Atom, не ведущие на саму страницу
+ATOM_SKIPPED_RELS = frozenset(("self", "edit", "enclosure", "replies", "via"))
+
+# типы содержимого, которые точно не являются sitemap или лентой
+NON_XML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+
+@dataclass(frozen=True, slots=True)
+class SitemapEntry:
+    """Запись sitemap или ленты."""
+
+    url: str
+    lastmod: str = ""  # дата изменения из документа как есть; пустая, если не указана
+    is_sitemap: bool = False  # вложенный sitemap индекса, а не страница
+
+
+def local_name(tag: str) -> str:
+    """Имя элемента без пространства имён."""
+    return tag.rpartition("}")[2]
+
+
+def parse_entry(element: Element, base_url: str) -> SitemapEntry | None:
+    """Запись из элемента url, sitemap, item или entry; None, если в ней нет адреса."""
+    url = ""
+    fields: dict[str, str] = {}
+    for child in element:
+        name = local_name(child.tag)
+        if name == "link" and "href" in child.attrib:
+            # Atom: адрес в атрибуте href, у записи может быть несколько ссылок разного назначения
+            if not url and child.get("rel", "alternate") not in ATOM_SKIPPED_RELS:
+                url = child.attrib["href"]
+        elif name in {"loc", "link"} and child.text:
+            url = url or child.text
+        elif name in LASTMOD_TAGS and child.text:
+            fields.setdefault(name, child.text.strip())
+    url = url.strip()
+    if not url:
+        return None
+    if not url.startswith(ABSOLUTE_URL_PREFIXES):
+        # в sitemap адреса абсолютные, поэтому urljoin, заметный на сотнях тысяч записей, нужен редко
+        url = urljoin(base_url, url)
+    lastmod = next((fields[name] for name in LASTMOD_TAGS if name in fields), "")
+    return SitemapEntry(url=url, lastmod=lastmod, is_sitemap=local_name(element.tag) == SITEMAP_TAG)
+
+
+class SitemapParser:
+    """Потоковый разбор sitemap, индекса sitemap, RSS или Atom по частям тела ответа.
+
+    Части передаются в feed по мере загрузки, каждый вызов возвращает разобранные к этому моменту записи.
+    Записи и элементы вне записей удаляются из дерева сразу после разбора. Документ с другим корневым
+    элементом, повреждённый или больше max_bytes после распаковки вызывает SitemapError.
+    """
+
+    def __init__(self, base_url: str, max_bytes: int = MAX_SITEMAP_BYTES) -> None:
+        """Инициализация разбора."""
+        self.base_url = base_url
+        self.max_bytes = max_bytes
+        self.size = 0  # размер распакованного документа
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._stack: list[Element] = []  # открытые элементы от корня
+        self._entry_depth = 0  # глубина элемента записи в стеке, 0 - вне записи
+        self._head = b""  # начало документа до определения сжатия
+        self._decompressor: zlib._Decompress | None = None
+        self._started = False
+
+    def feed(self, data: bytes) -> list[SitemapEntry]:
+        """Разбирает очередную часть тела ответа."""
+        if not self._started:
+            self._head += data
+            if len(self._head) < len(GZIP_MAGIC):
+                return []
+            data, self._head, self._started = self._head, b"", True
+            if data.startswith(GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        entries = []
+        for part in self._decompress(data):
+            self._feed_xml(part)
+            entries.extend(self._read_events())
+        return entries
+
+    def close(self) -> list[SitemapEntry]:
+        """Завершает разбор и возвращает оставшиеся записи."""
+        if not self._started:
+            # документ короче сигнатуры gzip
+            self._started = True
+            self._feed_xml(self._head)
+        if self._decompressor is not None:
+            self._feed_xml(self._decompressor.flush())
+        try:
+            self._parser.close()
+        except ParseError as e:
+            msg = f"Документ {self.base_url} повреждён: {e}"
+            raise SitemapError(msg) from e
+        return list(self._read_events())
+
+    def _decompress(self, data: bytes) -> Iterator[bytes]:
+        """Распаковывает часть gzip не больше CHUNK_SIZE байт за раз, чтобы не распаковывать бомбу целиком."""
+        if self._decompressor is None:
+            yield data
+            return
+        try:
+            yield self._decompressor.decompress(data, CHUNK_SIZE)
+            while self._decompressor.unconsumed_tail:
+                yield self._decompressor.decompress(self._decompressor.unconsumed_tail, CHUNK_SIZE)
+        except zlib.error as e:
+            msg = f"Документ {self.base_url} повреждён: {e}"
+            raise SitemapError(msg) from e
+
+    def _feed_xml(self, data: bytes) -> None:
+        """Передаёт распакованную часть документа XML парсеру."""
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            msg = f"Документ {self.base_url} больше {self.max_bytes} байт."
+            raise SitemapError(msg)
+        try:
+            self._parser.feed(data)
+        except ParseError as e:
+            msg = f"Документ {self.base_url} не является XML: {e}"
+            raise SitemapError(msg) from e
+
+    def _read_events(self) -> Iterator[SitemapEntry]:
+        """Разбирает события XML парсера и удаляет разобранные элементы из дерева."""
+        try:
+            events = list(self._parser.read_events())
+        except ParseError as e:
+            msg = f"Документ {self.base_url} повреждён: {e}"
+            raise SitemapError(msg) from e
+        for event, element in events:
+            name = local_name(element.tag)
+            if event == "start":
+                if not self._stack and name not in ROOT_TAGS:
+                    msg = f"Документ {self.base_url} не является sitemap или лентой (корневой элемент {name})."
+                    raise SitemapError(msg)
+                self._stack.append(element)
+                if not self._entry_depth and (name in PAGE_TAGS or name == SITEMAP_TAG):
+                    self._entry_depth = len(self._stack)
+                continue
+            depth = len(self._stack)
+            self._stack.pop()
+            if depth == self._entry_depth:
+                self._entry_depth = 0
+                entry = parse_entry(element, self.base_url)
+                if entry is not None:
+                    yield entry
+            # вложенные элементы записи удаляются вместе с ней
+            if not self._entry_depth and self._stack:
+                self._stack[-1].remove(element)
+
+
+async def fetch_sitemap(session: aiohttp.ClientSession,
+                        url: str,
+                        stats: FetchStats | None = None,
+                        max_body_bytes: int = MAX_SITEMAP_BYTES,
+                        client_timeout: aiohttp.ClientTimeout | None = None,
+                        throttle: Callable[[str], Awaitable[None]] | None = None,
+                        raise_retryable: bool = False,
+                        ) -> list[SitemapEntry] | None:
+    """Загружает и потоково разбирает sitemap или ленту; None, если документ не получен или не является ими.
+
+    Параметры throttle и raise_retryable работают как в fetch_html, поэтому загрузка может выполняться
+    через CrawlScheduler.fetch_with.
+    """
+    if throttle is not None:
+        await throttle(url)
+    sitemap_parser = SitemapParser(url, max_body_bytes)
+    entries: list[SitemapEntry] = []
+    body_size = 0
+    try:
+        async with session.get(url, timeout=client_timeout) as response:
+            if raise_retryable and is_retryable_status(response.status):
+                raise RetryableFetchError(url, f"статус {response.status}", status=response.status,
+                                          retry_after=parse_retry_after(response.headers.get("Retry-After")))
+            if response.status != HTTPOk.status_code:
+                log.warning("Sitemap {url} вернул статус {status}.", url=url, status=response.status)
+                return None
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type in NON_XML_CONTENT_TYPES:
+                log.debug("Документ {url} не является sitemap или лентой ({content_type}).",
+                          url=url, content_type=content_type)
+                return None
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                body_size += len(chunk)
+                entries.extend(sitemap_parser.feed(chunk))
+            entries.extend(sitemap_parser.close())
+    except TRANSIENT_ERRORS as e:
+        reason = transient_error_reason(e)
+        if raise_retryable:
+            raise RetryableFetchError(url, reason) from e
+        log.error("Не удалось загрузить {url} ({reason}).", url=url, reason=reason)
+        return None
+    except SitemapError as e:
+        log.warning("{error}", error=e)
+        return None
+    finally:
+        if stats is not None:
+            stats.bytes_downloaded += body_size
+    return entries
+
+
+class SitemapDiscovery:
+    """Страницы первого уровня обхода из sitemap и лент.
+
+    Стартовый url разбирается как sitemap, индекс sitemap или лента. Если он не является ими, используются
+    sitemap из robots.txt сайта, а если их там нет - /sitemap.xml. Вложенные sitemap индексов загружаются
+    по очереди, не больше max_documents документов.
+    """
+
+    def __init__(self,
+                 session: aiohttp.ClientSession,
+                 fetch: Callable[[aiohttp.ClientSession, str], Awaitable[list[SitemapEntry] | None]],
+                 robots: RobotsCache | None = None,
+                 max_documents: int = MAX_SITEMAP_DOCUMENTS,
+                 ) -> None:
+        """Инициализация по сессии и функции загрузки документов, см. fetch_sitemap."""
+        self.session = session
+        self.fetch = fetch
+        self.robots = robots  # None - sitemap из robots.txt не используются
+        self.max_documents = max_documents
+
+    async def site_sitemaps(self, url: str) -> list[str]:
+        """Sitemap сайта url из robots.txt или /sitemap.xml."""
+        if self.robots is not None:
+            sitemaps = (await self.robots.get(self.session, url)).site_maps()
+            if sitemaps:
+                return sitemaps
+        parts = urlsplit(url)
+        return [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+
+    async def discover(self, start_url: str) -> list[SitemapEntry]:
+        """Страницы из документов стартового url или sitemap его сайта, без повторов."""
+        pages: dict[str, SitemapEntry] = {}
+        queue = [start_url]
+        seen = {start_url}
+        documents = 0
+        while queue and documents < self.max_documents:
+            sitemap_url = queue.pop(0)
+            entries = await self.fetch(self.session, sitemap_url)
+            documents += 1
+            if entries is None:
+                if sitemap_url == start_url:
+                    log.info("{url} не является sitemap или лентой, используются sitemap сайта.", url=start_url)
+                    queue.extend(url for url in await self.site_sitemaps(start_url) if url not in seen)
+                    seen.update(queue)
+                continue
+            for entry in entries:
+                if not entry.is_sitemap:
+                    pages.setdefault(entry.url, entry)
+                elif entry.url not in seen:
+                    seen.add(entry.url)
+                    queue.append(entry.url)
+        if queue:
+            log.warning("Загружено {count} sitemap, остальные {skipped} пропущены.", count=documents,
+                        skipped=len(queue))
+        log.info("Из sitemap и лент {url} получено страниц: {count}.", url=start_url, count=len(pages))
+        return list(pages.values())
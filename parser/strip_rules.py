@@ -0,0 +1,68 @@
+"""Правила удаления элементов страницы перед конвертацией."""
+from dataclasses import dataclass
+
+import soupsieve
+
+from bs4 import Tag, BeautifulSoup
+from soupsieve import SoupSieve
+
+
+@dataclass(frozen=True, slots=True)
+class StripRules:
+    """Скомпилированные правила удаления элементов: по тегам, css классам и css селекторам."""
+
+    tags: frozenset[str] = frozenset()
+    class_tokens: frozenset[str] = frozenset()  # классы без пробелов, совпадающие с любым классом элемента
+    class_strings: frozenset[str] = frozenset()  # строки из нескольких классов, совпадающие с атрибутом class целиком
+    selector: SoupSieve | None = None  # объединение css селекторов
+
+    @classmethod
+    def compile(cls,
+                css_classes: tuple[str, ...] | None = None,
+                tags_names: tuple[str, ...] | None = None,
+                css_selectors: tuple[str, ...] | None = None,
+                ) -> "StripRules":
+        """Компилирует правила из пользовательских настроек."""
+        css_classes = tuple(css_class.strip() for css_class in css_classes or () if css_class.strip())
+        css_selectors = tuple(selector.strip() for selector in css_selectors or () if selector.strip())
+        return cls(
+            tags=frozenset(tag_name.strip().lower() for tag_name in tags_names or () if tag_name.strip()),
+            class_tokens=frozenset(css_class for css_class in css_classes if " " not in css_class),
+            class_strings=frozenset(" ".join(css_class.split()) for css_class in css_classes if " " in css_class),
+            selector=soupsieve.compile(", ".join(css_selectors)) if css_selectors else None,
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Стабильное между запусками представление правил для сравнения настроек конвертации."""
+        return repr((sorted(self.tags), sorted(self.class_tokens), sorted(self.class_strings),
+                     self.selector.pattern if self.selector is not None else None))
+
+    def matches(self, element: Tag) -> bool:
+        """Проверяет, подлежит ли элемент удалению."""
+        if element.name in self.tags:
+            return True
+        if self.class_tokens or self.class_strings:
+            classes = element.get("class")
+            if classes:
+                if isinstance(classes, str):
+                    classes = classes.split()
+                if not self.class_tokens.isdisjoint(classes) or " ".join(classes) in self.class_strings:
+                    return True
+        return self.selector is not None and self.selector.match(element)
+
+    def strip(self, page_soup: BeautifulSoup) -> None:
+        """Удаляет подходящие элементы за один обход дерева, не заходя в удаляемые поддеревья."""
+        stack: list[Tag] = [page_soup]
+        while stack:
+            node = stack.pop()
+            removed = []
+            for child in node.contents:
+                if not isinstance(child, Tag):
+                    continue
+                if self.matches(child):
+                    removed.append(child)
+                else:
+                    stack.append(child)
+            for child in removed:
+                child.decompose()
@@ -1,12 +1,246 @@
 """Запуск парсера."""
+import json
+
 from pathlib import Path
+from functools import partial
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import field, dataclass
+from collections.abc import Callable, Awaitable, AsyncIterator
+from concurrent.futures import Executor, ProcessPoolExecutor
 
 import aiohttp
 
-from utils.common_utils import fetch_html
+from logger_config import log
+from utils.simhash import SimHashIndex
 
 # from config import activate_link
+from parser.crawler import Crawler
+from parser.sitemap import DISCOVERY_MODES, SitemapEntry, SitemapDiscovery, fetch_sitemap
+from utils.manifest import Manifest
+from utils.http_cache import HttpCache
+from utils.crawl_state import create_seen_urls
+from parser.boilerplate import BoilerplateDetector
+from utils.common_utils import FetchStats, fetch_html
+from utils.host_limiter import HostLimiter
+from utils.http_session import create_client_session
+from utils.robots_cache import RobotsCache
 from parser.parser_class import Parser
+from utils.crawl_metrics import CrawlMetrics, create_trace_config, start_metrics_server
+from parser.parser_config import CrawlSettings
+from utils.crawl_scheduler import CrawlScheduler
+from utils.markdown_writer import MarkdownWriter
+from utils.crawl_checkpoint import CrawlCheckpoint
+from utils.filename_allocator import FilenameAllocator
+
+
+@dataclass
+class CrawlContext:
+    """Общие для всех стартовых страниц задания ресурсы: сессия, ограничитель запросов, пул конвертации, кэш.
+
+    Позволяет обрабатывать несколько стартовых url в одном event loop с переиспользованием соединений.
+    """
+
+    settings: CrawlSettings
+    session: aiohttp.ClientSession
+    limiter: HostLimiter
+    stats: FetchStats
+    metrics: CrawlMetrics = field(default_factory=CrawlMetrics)
+    scheduler: CrawlScheduler | None = None
+    writer: MarkdownWriter | None = None
+    executor: Executor | None = None
+    cache: HttpCache | None = None
+    checkpoint: CrawlCheckpoint | None = None
+    manifests: dict[Path, Manifest] = field(default_factory=dict)
+    filename_allocators: dict[Path, FilenameAllocator] = field(default_factory=dict)
+    near_duplicate_indexes: dict[Path, SimHashIndex] = field(default_factory=dict)
+
+    def manifest(self, directory: Path) -> Manifest:
+        """Манифест выходной директории, общий для всех стартовых страниц с этой директорией."""
+        directory = directory.resolve()
+        if directory not in self.manifests:
+            self.manifests[directory] = Manifest(directory)
+        return self.manifests[directory]
+
+    def filename_allocator(self, directory: Path) -> FilenameAllocator:
+        """Выбор имён файлов выходной директории, общий для всех стартовых страниц с этой директорией."""
+        directory = directory.resolve()
+        if directory not in self.filename_allocators:
+            self.filename_allocators[directory] = FilenameAllocator(self.manifest(directory))
+        return self.filename_allocators[directory]
+
+    def near_duplicate_index(self, directory: Path) -> SimHashIndex | None:
+        """Отпечатки страниц выходной директории, общие для всех стартовых страниц с этой директорией."""
+        if self.settings.near_duplicate_distance is None:
+            return None
+        directory = directory.resolve()
+        if directory not in self.near_duplicate_indexes:
+            self.near_duplicate_indexes[directory] = SimHashIndex(self.manifest(directory),
+                                                                  self.settings.near_duplicate_distance)
+        return self.near_duplicate_indexes[directory]
+
+    @property
+    def fetch_html(self) -> Callable[[aiohttp.ClientSession, str], Awaitable[str | None]]:
+        """Функция загрузки страниц с настройками задания, через планировщик запросов, если он задан."""
+        if self.scheduler is not None:
+            return self.scheduler.fetch_html
+        return self.direct_fetch_html
+
+    @property
+    def direct_fetch_html(self) -> Callable[..., Awaitable[str | None]]:
+        """Функция загрузки страниц с настройками задания без планировщика запросов."""
+        return partial(fetch_html,
+                       cache=self.cache,
+                       stats=self.stats,
+                       observe=self.metrics.observe,
+                       max_body_bytes=self.settings.max_body_bytes,
+                       client_timeout=aiohttp.ClientTimeout(sock_connect=self.settings.connect_timeout,
+                                                            sock_read=self.settings.read_timeout))
+
+    @property
+    def fetch_sitemap(self) -> Callable[[aiohttp.ClientSession, str], Awaitable[list[SitemapEntry] | None]]:
+        """Функция загрузки sitemap и лент с настройками задания, через планировщик запросов, если он задан."""
+        fetch = partial(fetch_sitemap,
+                        stats=self.stats,
+                        client_timeout=aiohttp.ClientTimeout(sock_connect=self.settings.connect_timeout,
+                                                             sock_read=self.settings.read_timeout))
+        if self.scheduler is not None:
+            return partial(self.scheduler.fetch_with, fetch)
+        return fetch
+
+    def create_parser(self,
+                      start_url: str,
+                      output_directory: Path,
+                      allowed_domains: tuple[str, ...],
+                      excluded_domains: tuple[str, ...] | None = None,
+                      css_class: tuple[str, ...] | None = None,
+                      tag_name: tuple[str, ...] | None = None,
+                      css_selectors: tuple[str, ...] | None = None,
+                      fetch_html: Callable[[aiohttp.ClientSession, str], Awaitable[str | None]] | None = None,
+                      ) -> Parser:
+        """Парсер страниц с общими ресурсами и настройками задания.
+
+        fetch_html заменяет загрузку страниц по HTTP, например чтением сохранённых страниц с диска.
+        """
+        settings = self.settings
+        return Parser(start_page_url=start_url,
+                      directory=output_directory,
+                      fetch_html=fetch_html or self.fetch_html,
+                      session=self.session,
+                      allowed_domains=allowed_domains,
+                      excluded_domains=excluded_domains,
+                      css_classes=css_class,
+                      tags_names=tag_name,
+                      css_selectors=css_selectors,
+                      executor=self.executor,
+                      manifest=self.manifest(output_directory),
+                      html_parser=settings.html_parser,
+                      link_extractor=settings.link_extractor,
+                      writer=self.writer,
+                      incremental=settings.incremental,
+                      filename_allocator=self.filename_allocator(output_directory),
+                      metrics=self.metrics,
+                      near_duplicates=self.near_duplicate_index(output_directory),
+                      boilerplate=(BoilerplateDetector(settings.boilerplate_min_pages)
+                                   if settings.boilerplate_min_pages > 0 else None),
+                      )
+
+    async def save_outputs(self) -> None:
+        """Дожидается записи поставленных в очередь файлов и сохраняет манифесты.
+
+        Вызывается перед фиксацией контрольной точки, чтобы обработанными в ней считались только страницы
+        с записанными файлами и записями в манифесте.
+        """
+        if self.writer is not None:
+            await self.writer.flush()
+        for manifest in self.manifests.values():
+            manifest.save()
+
+    def sitemap_discovery(self) -> SitemapDiscovery | None:
+        """Получение страниц из sitemap и лент, если оно включено настройками задания."""
+        if self.settings.discovery not in DISCOVERY_MODES:
+            msg = f"Неизвестный способ получения страниц: {self.settings.discovery}"
+            raise ValueError(msg)
+        if self.settings.discovery != "sitemap":
+            return None
+        return SitemapDiscovery(self.session, self.fetch_sitemap,
+                                robots=self.scheduler.robots if self.scheduler is not None else None)
+
+
+@asynccontextmanager
+async def open_crawl_context(settings: CrawlSettings | None = None,
+                             session: aiohttp.ClientSession | None = None,
+                             ) -> AsyncIterator[CrawlContext]:
+    """Открывает общие ресурсы задания и закрывает их, сохраняя манифесты, по завершении.
+
+    Переданная session используется как есть и не закрывается, иначе создаётся своя сессия с пулом соединений
+    по настройкам settings.
+    """
+    settings = settings or CrawlSettings()
+    stats = FetchStats()
+    metrics = CrawlMetrics(stats, log_every_pages=settings.log_every_pages)
+    async with AsyncExitStack() as stack:
+        cache = None
+        if settings.cache_path is not None:
+            cache = HttpCache(settings.cache_path, ttl=settings.cache_ttl,
+                              max_size_bytes=settings.cache_max_size_bytes)
+            stack.callback(cache.close)
+        checkpoint = None
+        if settings.checkpoint_path is not None:
+            checkpoint = CrawlCheckpoint(settings.checkpoint_path, interval=settings.checkpoint_interval,
+                                         max_failures=settings.checkpoint_max_failures)
+            stack.callback(checkpoint.close)
+        # процессы пула запускаются по мере поступления задач, поэтому пул можно создавать заранее
+        executor = None
+        if settings.conversion_workers > 0:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=settings.conversion_workers))
+        if session is None:
+            session = await stack.enter_async_context(create_client_session(
+                connection_limit=settings.connection_limit,
+                connection_limit_per_host=settings.connection_limit_per_host,
+                dns_cache_ttl=settings.dns_cache_ttl,
+                keepalive_timeout=settings.keepalive_timeout,
+                user_agent=settings.user_agent,
+                trace_configs=[create_trace_config(metrics)],
+            ))
+        if settings.metrics_port is not None:
+            metrics_runner = await start_metrics_server(metrics, settings.metrics_host, settings.metrics_port)
+            stack.push_async_callback(metrics_runner.cleanup)
+        context = CrawlContext(
+            settings=settings,
+            session=session,
+            limiter=HostLimiter(max_concurrency=settings.max_concurrency,
+                                per_host_concurrency=settings.per_host_concurrency),
+            stats=stats,
+            metrics=metrics,
+            executor=executor,
+            cache=cache,
+            checkpoint=checkpoint,
+            writer=MarkdownWriter(queue_size=settings.writer_queue_size, batch_size=settings.writer_batch_size,
+                                  threads=settings.writer_threads, fsync=settings.fsync, observe=metrics.observe),
+        )
+        if checkpoint is not None:
+            checkpoint.before_commit = context.save_outputs
+        context.scheduler = CrawlScheduler(
+            fetch=context.direct_fetch_html,
+            requests_per_second=settings.requests_per_second,
+            burst=settings.request_burst,
+            max_retries=settings.max_retries,
+            backoff_base=settings.backoff_base,
+            backoff_max=settings.backoff_max,
+            robots=RobotsCache(settings.user_agent, settings.robots_ttl) if settings.respect_robots else None,
+            stats=context.stats,
+        )
+        try:
+            yield context
+        finally:
+            # манифесты сохраняются только после записи всех файлов, на которые они ссылаются
+            await context.writer.close()
+            for manifest in context.manifests.values():
+                manifest.save()
+            log.info("Статистика загрузки: {stats}", stats=context.stats)
+            log.info("Метрики задания: {summary}", summary=json.dumps(metrics.summary(), ensure_ascii=False))
+            if settings.metrics_path is not None:
+                metrics.write_summary(settings.metrics_path)
 
 
 async def start_parser(start_url: str,
@@ -15,25 +249,31 @@ async def start_parser(start_url: str,
                        excluded_domains: tuple[str, ...] | None = None,
                        css_class: str | None = None,
                        tag_name: str | None = None,
+                       css_selectors: tuple[str, ...] | None = None,
                        only_first_page: bool = False,  # получение markdown только указанных страниц
+                       settings: CrawlSettings | None = None,
+                       context: CrawlContext | None = None,  # общие ресурсы задания; None - свои для этого url
                        ) -> None:
     """Запуск парсера."""
-    output_directory.mkdir(parents=True, exist_ok=True)
+    if context is None:
+        async with open_crawl_context(settings) as own_context:
+            await start_parser(start_url, output_directory, allowed_domains, excluded_domains, css_class, tag_name,
+                               css_selectors, only_first_page, context=own_context)
+        return
 
-    async with aiohttp.ClientSession() as session:
-        parser = Parser(start_page_url=start_url,
-                        directory=output_directory,
-                        fetch_html=fetch_html,
-                        session=session,
-                        allowed_domains=allowed_domains,
-                        excluded_domains=excluded_domains,
-                        css_classes=css_class,
-                        tags_names=tag_name,
-                        )
-        if only_first_page is True:
+    settings = context.settings
+    output_directory.mkdir(parents=True, exist_ok=True)
+    parser = context.create_parser(start_url, output_directory, allowed_domains, excluded_domains, css_class,
+                                   tag_name, css_selectors)
+    if only_first_page is True:
+        async with context.limiter.limit(start_url):
             await parser.process_page(page_link=start_url)
-            return
+        return
 
-        links = await parser.filter_links()
-        for link, _ in links:
-            await parser.process_page(page_link=link)
+    progress = None
+    if context.checkpoint is not None:
+        progress = context.checkpoint.for_crawl(start_url, output_directory)
+    crawler = Crawler(parser=parser, limiter=context.limiter, max_depth=settings.max_depth,
+                      max_pages=settings.max_pages, progress=progress, discovery=context.sitemap_discovery(),
+                      seen=create_seen_urls(settings.seen_urls_directory, settings.seen_urls_capacity))
+    await crawler.crawl()
@@ -0,0 +1,39 @@
+"""Общие фикстуры тестов."""
+from unittest.mock import Mock, AsyncMock
+from collections.abc import Callable, AsyncIterator
+
+import pytest
+
+
+class MockStreamReader:
+    """Заглушка потока тела ответа aiohttp."""
+
+    def __init__(self, body: bytes) -> None:
+        """Инициализация заглушки."""
+        self.body = body
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        """Отдаёт тело ответа частями."""
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+
+@pytest.fixture
+def response_context() -> Callable[..., AsyncMock]:
+    """Фабрика mock контекстного менеджера ответа session.get."""
+    def make_response_context(status: int,
+                              body: bytes = b"",
+                              headers: dict[str, str] | None = None,
+                              charset: str | None = "utf-8",
+                              ) -> AsyncMock:
+        mock_response = Mock()
+        mock_response.status = status
+        mock_response.headers = {"Content-Type": "text/html"} if headers is None else headers
+        mock_response.charset = charset
+        mock_response.content = MockStreamReader(body)
+        mock_context = AsyncMock()
+        mock_context.__aenter__.return_value = mock_response
+        mock_context.__aexit__.return_value = None
+        return mock_context
+
+    return make_response_context
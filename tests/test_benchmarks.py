@@ -0,0 +1,52 @@
+"""Тесты замеров производительности."""
+from pathlib import Path
+
+import pytest
+
+from parser.parser_config import CrawlSettings
+from benchmarks.run_benchmarks import save_result, run_benchmarks, compare_results
+from benchmarks.synthetic_site import SiteSpec, render_page
+
+
+def test_render_page_size_and_links() -> None:
+    """Тестирование размера и ссылок синтетической страницы."""
+    spec = SiteSpec(page_count=10, page_size_bytes=4096, fan_out=3)
+
+    html = render_page(spec, 1)
+
+    assert len(html.encode("utf-8")) >= spec.page_size_bytes
+    assert all(f'href="/page/{child}"' in html for child in (4, 5, 6))
+    assert 'href="/page/7"' not in html
+    assert render_page(spec, 1) == html
+
+
+@pytest.mark.asyncio
+async def test_run_benchmarks_offline(tmp_path: Path) -> None:
+    """Тестирование полного замера на локальном сайте с ошибками 503 и сохранения результата."""
+    page_count = 12
+    spec = SiteSpec(page_count=page_count, page_size_bytes=2048, fan_out=3, error_rate=0.2, seed=1)
+    settings = CrawlSettings(conversion_workers=0, max_depth=page_count, max_pages=page_count,
+                             requests_per_second=0, respect_robots=False, backoff_base=0.001, backoff_max=0.01,
+                             max_retries=10)
+
+    result = await run_benchmarks(spec, settings)
+
+    assert result["crawl"]["files_written"] == page_count - 1  # стартовая страница не сохраняется
+    assert result["crawl"]["fetch"]["retries"] > 0
+    assert result["crawl"]["pages_per_second"] > 0
+    assert {"parse", "convert", "write", "process_page"} <= result["process_page"]["stages"].keys()
+    assert compare_results(result, result) == []
+    assert save_result(result, tmp_path).exists()
+
+
+def test_compare_results_detects_regressions() -> None:
+    """Тестирование обнаружения ухудшений относительно эталона."""
+    baseline = {"crawl": {"pages_per_second": 100.0}, "peak_rss_mb": 100.0,
+                "process_page": {"stages": {"convert": {"mean": 0.01}}}}
+    current = {"crawl": {"pages_per_second": 70.0}, "peak_rss_mb": 110.0,
+               "process_page": {"stages": {"convert": {"mean": 0.02}, "parse": {"mean": 0.01}}}}
+
+    regressions = compare_results(current, baseline, threshold=0.2)
+
+    assert [regression.split(":")[0] for regression in regressions] == [
+        "crawl.pages_per_second", "process_page.convert.mean"]
@@ -0,0 +1,38 @@
+"""Тесты boilerplate.py."""
+from bs4 import BeautifulSoup
+
+from parser.boilerplate import BoilerplateDetector, strip_boilerplate
+
+NAVIGATION = ('<nav class="site-menu"><a href="/">Home</a> <a href="/docs">Documentation</a> '
+              '<a href="/blog">Blog</a></nav>')
+
+
+def page(number: int) -> BeautifulSoup:
+    """Страница с общим меню и уникальным текстом."""
+    return BeautifulSoup(f"<html><body>{NAVIGATION}<main><p>Unique article text number {number} "
+                         f"with enough words.</p></main></body></html>", "html.parser")
+
+
+def test_repeated_block_is_detected_and_stripped() -> None:
+    """Тестирование обнаружения блока, повторяющегося на min_pages страницах, и его удаления."""
+    detector = BoilerplateDetector(min_pages=3)
+    for number in range(3):
+        assert "Documentation" in page(number).get_text()
+        detector.observe(strip_boilerplate(page(number), detector.blocks))
+
+    assert len(detector.blocks) == 1
+    page_soup = page(4)
+    strip_boilerplate(page_soup, detector.blocks)
+    assert page_soup.find("nav") is None
+    assert "Unique article text number 4" in page_soup.get_text()
+
+
+def test_short_and_unique_blocks_are_kept() -> None:
+    """Тестирование того, что короткие и уникальные блоки не считаются повторяющимися."""
+    detector = BoilerplateDetector(min_pages=2)
+    for number in range(5):
+        page_soup = BeautifulSoup(f"<body><footer>Footer</footer><p>Article text number {number} here.</p></body>",
+                                  "html.parser")
+        detector.observe(strip_boilerplate(page_soup, detector.blocks))
+
+    assert detector.blocks == frozenset()
@@ -1,14 +1,24 @@
 """Тесты common_utils.py."""
 from pathlib import Path
 from unittest.mock import Mock, AsyncMock, patch
+from collections.abc import Callable
 
 import pytest
 import aiohttp
 
 from aiohttp.web_exceptions import HTTPOk
 
-from app_exceptions import IndexFileNotExistsError
-from utils.common_utils import fetch_html, sanitize_filename, save_markdown_file, create_index_md_file
+from app_exceptions import RetryableFetchError, IndexFileNotExistsError
+from utils.common_utils import (
+    CHUNK_SIZE,
+    FetchStats,
+    fetch_html,
+    normalize_url,
+    parse_retry_after,
+    sanitize_filename,
+    save_markdown_file,
+    create_index_md_file,
+)
 
 
 @pytest.mark.parametrize(("input_text", "expected_output"),
@@ -25,22 +35,69 @@ def test_sanitize_filename(input_text: str, expected_output: list[tuple[str, str
     assert result == expected_output
 
 
+@pytest.mark.parametrize(("url", "expected_url"),
+                         [
+                             ("HTTPS://Example.COM:443/docs/?b=2&a=1#intro", "https://example.com/docs?a=1&b=2"),
+                             ("http://example.com", "http://example.com/"),
+                             ("http://example.com:8080/page/", "http://example.com:8080/page"),
+                         ])
+def test_normalize_url(url: str, expected_url: str) -> None:
+    """Тестирование приведения url к каноническому виду."""
+    assert normalize_url(url) == expected_url
+
+
 @pytest.mark.asyncio
-async def test_fetch_html_success() -> None:
+async def test_fetch_html_success(response_context: Callable[..., AsyncMock]) -> None:
     """Тестирование успешного получения HTML-контента."""
-    mock_response = AsyncMock()
-    mock_response.status = HTTPOk.status_code
-    mock_response.text = AsyncMock(return_value="<html>Test</html>")
+    stats = FetchStats()
+    with patch("aiohttp.ClientSession.get", return_value=response_context(HTTPOk.status_code, b"<html>Test</html>")):
+        async with aiohttp.ClientSession() as session:
+            result = await fetch_html(session, "http://test.com", stats=stats)
 
-    mock_context = AsyncMock()
-    mock_context.__aenter__.return_value = mock_response
-    mock_context.__aexit__.return_value = None
+    assert result == "<html>Test</html>"
+    assert stats.pages_fetched == 1
+    assert stats.bytes_downloaded == len(b"<html>Test</html>")
 
-    with patch("aiohttp.ClientSession.get", return_value=mock_context):
+
+@pytest.mark.asyncio
+async def test_fetch_html_detects_encoding(response_context: Callable[..., AsyncMock]) -> None:
+    """Тестирование определения кодировки ответа без charset в заголовках."""
+    body = '<html><head><meta charset="windows-1251"></head>Тест</html>'.encode("windows-1251")
+    with patch("aiohttp.ClientSession.get", return_value=response_context(HTTPOk.status_code, body, charset=None)):
         async with aiohttp.ClientSession() as session:
             result = await fetch_html(session, "http://test.com")
 
-    assert result == "<html>Test</html>"
+    assert "Тест" in result
+
+
+@pytest.mark.asyncio
+async def test_fetch_html_not_html(response_context: Callable[..., AsyncMock]) -> None:
+    """Тестирование пропуска ответа с содержимым не HTML."""
+    stats = FetchStats()
+    context = response_context(HTTPOk.status_code, b"%PDF", headers={"Content-Type": "application/pdf"})
+    with patch("aiohttp.ClientSession.get", return_value=context):
+        async with aiohttp.ClientSession() as session:
+            result = await fetch_html(session, "http://test.com/file.pdf", stats=stats)
+
+    assert result is None
+    assert stats.skipped_content_type == 1
+    assert stats.bytes_downloaded == 0
+
+
+@pytest.mark.parametrize("headers", [{"Content-Type": "text/html"},
+                                     {"Content-Type": "text/html", "Content-Length": "2000000"}])
+@pytest.mark.asyncio
+async def test_fetch_html_too_large(response_context: Callable[..., AsyncMock], headers: dict[str, str]) -> None:
+    """Тестирование прерывания загрузки ответа больше ограничения."""
+    max_body_bytes = 100 * 1024
+    stats = FetchStats()
+    with patch("aiohttp.ClientSession.get", return_value=response_context(200, b"x" * 2_000_000, headers)):
+        async with aiohttp.ClientSession() as session:
+            result = await fetch_html(session, "http://test.com", stats=stats, max_body_bytes=max_body_bytes)
+
+    assert result is None
+    assert stats.aborted_too_large == 1
+    assert stats.bytes_downloaded <= max_body_bytes + CHUNK_SIZE
 
 
 @pytest.mark.asyncio
@@ -74,6 +131,47 @@ async def test_fetch_html_connection_error() -> None:
         assert result is None
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [TimeoutError(), aiohttp.ServerDisconnectedError()])
+async def test_fetch_html_transient_errors_are_retryable(error: Exception) -> None:
+    """Тестирование выброса временной ошибки при таймауте и разрыве соединения сервером."""
+    mock_context = AsyncMock()
+    mock_context.__aenter__.side_effect = error
+    mock_context.__aexit__.return_value = None
+
+    with patch("aiohttp.ClientSession.get", return_value=mock_context):
+        async with aiohttp.ClientSession() as session:
+            assert await fetch_html(session, "http://test.com") is None
+            with pytest.raises(RetryableFetchError):
+                await fetch_html(session, "http://test.com", raise_retryable=True)
+
+
+@pytest.mark.parametrize(("value", "expected"), [
+    ("120", 120.0),
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+    ("soon", None),
+    (None, None),
+])
+def test_parse_retry_after(value: str | None, expected: float | None) -> None:
+    """Тестирование разбора заголовка Retry-After."""
+    assert parse_retry_after(value) == expected
+
+
+@pytest.mark.asyncio
+async def test_fetch_html_raise_retryable(response_context: Callable[..., AsyncMock]) -> None:
+    """Тестирование выброса временной ошибки и ожидания throttle перед запросом."""
+    throttle = AsyncMock()
+    headers = {"Retry-After": "5"}
+    with patch("aiohttp.ClientSession.get", return_value=response_context(429, headers=headers)):
+        async with aiohttp.ClientSession() as session:
+            with pytest.raises(RetryableFetchError) as exc_info:
+                await fetch_html(session, "http://test.com", throttle=throttle, raise_retryable=True)
+
+    throttle.assert_awaited_once_with("http://test.com")
+    assert exc_info.value.status == 429  # noqa: PLR2004
+    assert exc_info.value.retry_after == 5  # noqa: PLR2004
+
+
 def test_save_markdown_file(tmp_path: Path) -> None:
     """Тестирование сохранения markdown файла."""
     content = "# Test Content"
@@ -0,0 +1,33 @@
+"""Тесты converter.py."""
+import re
+
+from markdownify import markdownify
+
+from parser.converter import convert_html_to_markdown
+from parser.strip_rules import StripRules
+
+HTML_CONTENT = """
+<html>
+    <head><title>Converter Page</title></head>
+    <body>
+        <h1>Header</h1>
+        <p>Text with <b>bold</b>, <a href="/link">link</a> and <code>code</code>.</p>
+        <pre><code>print("hello")</code></pre>
+        <ul><li>first</li><li>second</li></ul>
+        <table><tr><th>Name</th></tr><tr><td>Value</td></tr></table>
+    </body>
+</html>
+"""
+
+
+def test_convert_without_serialization() -> None:
+    """Тестирование совпадения конвертации дерева с конвертацией сериализованного HTML."""
+    expected_content = markdownify(HTML_CONTENT, code_language="python", default_title=False)
+    expected_content = re.sub(r"\n{2,}", "\n", expected_content.replace("Converter Page", ""))
+
+    converted_page = convert_html_to_markdown(HTML_CONTENT, StripRules())
+
+    assert converted_page.name == "Converter Page"
+    assert converted_page.markdown == expected_content
+    assert converted_page.title == "Converter Page"
+    assert [stage for stage, _ in converted_page.timings] == ["parse", "strip", "convert"]
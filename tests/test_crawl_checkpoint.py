@@ -0,0 +1,112 @@
+"""Тесты crawl_checkpoint.py."""
+import asyncio
+import sqlite3
+
+from pathlib import Path
+
+import pytest
+
+from parser.crawler import Crawler
+from tests.test_crawler import FakeParser
+from utils.host_limiter import HostLimiter
+from utils.crawl_checkpoint import CrawlCheckpoint
+
+
+def test_checkpoint_state_and_failures(tmp_path: Path) -> None:
+    """Тестирование сохранения очереди, обработанных и неудавшихся страниц между открытиями базы."""
+    path = tmp_path / "checkpoint.sqlite"
+    checkpoint = CrawlCheckpoint(path, interval=60, max_failures=2)
+    progress = checkpoint.for_crawl("https://a.com/", tmp_path)
+    progress.start()
+    for number in range(4):
+        progress.add_pending(f"a.com/{number}", f"https://a.com/{number}", depth=1)
+    progress.mark_done("a.com/0")
+    progress.mark_failed("a.com/1")
+    progress.mark_failed("a.com/2")
+    progress.mark_failed("a.com/2")
+    checkpoint.close()
+
+    checkpoint = CrawlCheckpoint(path, interval=60, max_failures=2)
+    state = checkpoint.for_crawl("https://a.com/", tmp_path).load()
+
+    assert state.seen == {"a.com/0", "a.com/1", "a.com/2", "a.com/3"}
+    assert state.frontier == [("https://a.com/1", 1), ("https://a.com/3", 1)]
+    assert (state.done, state.failed) == (1, 1)
+    assert checkpoint.for_crawl("https://a.com/", tmp_path / "other").load() is None
+    checkpoint.close()
+
+
+class InterruptedParser(FakeParser):
+    """Заглушка парсера, сообщающая об обработке заданного количества страниц."""
+
+    def __init__(self, graph: dict[str, list[str]], interrupt_after: int) -> None:
+        """Инициализация заглушки."""
+        super().__init__(graph)
+        self.interrupt_after = interrupt_after
+        self.interrupted = asyncio.Event()
+
+    async def process_page(self, page_link: str, collect_links: bool = False) -> list[tuple[str, str]]:
+        """Имитирует обработку страницы."""
+        links = await super().process_page(page_link, collect_links)
+        if len(self.processed) >= self.interrupt_after:
+            self.interrupted.set()
+        return links
+
+
+@pytest.mark.asyncio
+async def test_crawl_resumes_from_checkpoint(tmp_path: Path) -> None:
+    """Тестирование продолжения прерванного обхода без повторной обработки завершённых страниц."""
+    links = [f"https://a.com/{number}" for number in range(20)]
+    checkpoint = CrawlCheckpoint(tmp_path / "checkpoint.sqlite", interval=0, max_failures=3)
+    first_parser = InterruptedParser({"https://a.com/": links}, interrupt_after=5)
+    crawl_task = asyncio.create_task(Crawler(first_parser, HostLimiter(2, 2),
+                                             progress=checkpoint.for_crawl("https://a.com/", tmp_path)).crawl())
+    await first_parser.interrupted.wait()
+    crawl_task.cancel()
+    await asyncio.gather(crawl_task, return_exceptions=True)
+
+    second_parser = FakeParser({"https://a.com/": links})
+    progress = checkpoint.for_crawl("https://a.com/", tmp_path)
+    await Crawler(second_parser, HostLimiter(2, 2), progress=progress).crawl()
+
+    assert not set(first_parser.processed) & set(second_parser.processed)
+    assert sorted(first_parser.processed + second_parser.processed) == sorted(links)
+    assert progress.load() is None  # состояние завершённого обхода удалено
+    checkpoint.close()
+
+
+def committed_done(path: Path) -> set[str]:
+    """Страницы, отмеченные обработанными в зафиксированном состоянии базы."""
+    connection = sqlite3.connect(path)
+    try:
+        return {key for (key,) in connection.execute("SELECT key FROM pages WHERE state = 'done'")}
+    finally:
+        connection.close()
+
+
+@pytest.mark.asyncio
+async def test_done_pages_committed_after_outputs_saved(tmp_path: Path) -> None:
+    """Тестирование фиксации обработанных страниц только после сохранения их файлов и манифестов."""
+    path = tmp_path / "checkpoint.sqlite"
+    checkpoint = CrawlCheckpoint(path, interval=0, max_failures=3)
+    progress = checkpoint.for_crawl("https://a.com/", tmp_path)
+    progress.start()
+    for number in range(2):
+        progress.add_pending(f"a.com/{number}", f"https://a.com/{number}", depth=1)
+    progress.commit()
+    committed_before_save = []
+
+    async def save_outputs() -> None:
+        committed_before_save.append(committed_done(path))
+        progress.mark_done("a.com/1")  # страница обработана во время записи файлов
+
+    checkpoint.before_commit = save_outputs
+    progress.mark_done("a.com/0")
+    assert committed_done(path) == set()
+
+    await progress.maybe_save()
+
+    assert committed_before_save == [set()]
+    assert committed_done(path) == {"a.com/0"}
+    checkpoint.close()
+    assert committed_done(path) == {"a.com/0", "a.com/1"}
@@ -0,0 +1,110 @@
+"""Тесты crawl_job.py и cli.py."""
+import json
+
+from pathlib import Path
+
+import pytest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from cli import main, build_job, parse_args
+from crawl_job import CrawlJob, run_job, load_job_spec, read_urls_file, with_job_checkpoint
+from app_exceptions import JobSpecError
+from parser.parser_config import CrawlSettings
+
+PAGES = {
+    "/": '<html><head><title>Start</title></head><body><a href="/a">A</a><a href="/b">B</a></body></html>',
+    "/a": "<html><head><title>Page A</title></head><body><p>Content A</p></body></html>",
+    "/b": "<html><head><title>Page B</title></head><body><p>Content B</p></body></html>",
+}
+
+
+def test_load_job_spec_toml(tmp_path: Path) -> None:
+    """Тестирование загрузки задания из TOML."""
+    job_path = tmp_path / "job.toml"
+    job_path.write_text(
+        'start_urls = ["https://example.com"]\n'
+        'output_directory = "out"\n'
+        'allowed_domains = ["example.com"]\n'
+        "[settings]\n"
+        "max_depth = 2\n"
+        'cache_path = "cache/http.sqlite"\n',
+        encoding="utf-8",
+    )
+
+    job = load_job_spec(job_path)
+
+    assert job.start_urls == ("https://example.com",)
+    assert job.output_directory == Path("out")
+    assert job.allowed_domains == ("example.com",)
+    assert job.settings.max_depth == 2  # noqa: PLR2004
+    assert job.settings.cache_path == Path("cache/http.sqlite")
+
+
+def test_load_job_spec_unknown_keys(tmp_path: Path) -> None:
+    """Тестирование ошибки при неизвестных параметрах задания."""
+    job_path = tmp_path / "job.json"
+    job_path.write_text(json.dumps({"start_url": "https://example.com", "settings": {"depth": 2}}), encoding="utf-8")
+
+    with pytest.raises(JobSpecError, match=r"settings\.depth, start_url"):
+        load_job_spec(job_path)
+
+
+def test_build_job_from_urls_file(tmp_path: Path) -> None:
+    """Тестирование сборки задания из файла url и аргументов командной строки."""
+    urls_path = tmp_path / "urls.txt"
+    urls_path.write_text("https://example.com/1\n\n# комментарий\nhttps://example.com/2\n", encoding="utf-8")
+
+    job = build_job(parse_args(["--urls-file", str(urls_path), "--output-dir", str(tmp_path), "--max-depth", "3"]))
+
+    assert read_urls_file(urls_path) == ("https://example.com/1", "https://example.com/2")
+    assert job.start_urls == ("https://example.com/1", "https://example.com/2")
+    assert job.output_directory == tmp_path
+    assert job.settings.max_depth == 3  # noqa: PLR2004
+
+
+def test_cli_without_urls() -> None:
+    """Тестирование кода возврата при отсутствии стартовых url."""
+    assert main([]) == 2  # noqa: PLR2004
+
+
+def test_with_job_checkpoint(tmp_path: Path) -> None:
+    """Тестирование базы контрольных точек, отдельной для каждого задания."""
+    settings = CrawlSettings(checkpoint_path=tmp_path / "checkpoint.sqlite")
+    job = CrawlJob(start_urls=("https://example.com",), output_directory=tmp_path, settings=settings)
+    path = with_job_checkpoint(job).settings.checkpoint_path
+
+    assert path.parent == tmp_path
+    assert path.name.startswith("checkpoint-")
+    assert path.suffix == ".sqlite"
+    assert with_job_checkpoint(job).settings.checkpoint_path == path
+    assert with_job_checkpoint(CrawlJob(start_urls=("https://example.com/other",), output_directory=tmp_path,
+                                        settings=settings)).settings.checkpoint_path != path
+    other_settings = CrawlSettings(checkpoint_path=tmp_path / "checkpoint.sqlite", max_depth=5)
+    assert with_job_checkpoint(CrawlJob(start_urls=("https://example.com",), output_directory=tmp_path,
+                                        settings=other_settings)).settings.checkpoint_path != path
+    without_checkpoint = CrawlJob(start_urls=("https://example.com",), output_directory=tmp_path)
+    assert with_job_checkpoint(without_checkpoint) is without_checkpoint
+
+
+@pytest.mark.asyncio
+async def test_run_job(tmp_path: Path) -> None:
+    """Тестирование обработки нескольких стартовых страниц в одном задании."""
+    async def handle_page(request: web.Request) -> web.Response:
+        return web.Response(text=PAGES[request.path], content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handle_page)
+    async with TestServer(app) as server:
+        base_url = str(server.make_url("/"))
+        job = CrawlJob(start_urls=(base_url, f"{base_url}a"),
+                       output_directory=tmp_path,
+                       excluded_domains=(),
+                       settings=CrawlSettings(conversion_workers=0))
+        await run_job(job)
+
+    assert "Content A" in (tmp_path / "Page A.md").read_text(encoding="utf-8")
+    assert (tmp_path / "Page B.md").exists()
+    assert not (tmp_path / "Start.md").exists()
+    assert "[[Page A.md]]" in (tmp_path / "INDEX.md").read_text(encoding="utf-8")
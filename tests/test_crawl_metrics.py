@@ -0,0 +1,88 @@
+"""Тесты crawl_metrics.py."""
+import json
+
+from pathlib import Path
+
+import pytest
+import aiohttp
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from logger_config import log
+from utils.common_utils import FetchStats, fetch_html
+from utils.crawl_metrics import Histogram, CrawlMetrics, create_trace_config, start_metrics_server
+
+
+def test_histogram_quantiles() -> None:
+    """Тестирование оценки квантилей по интервалам гистограммы."""
+    histogram = Histogram(bounds=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.quantile(0.5) == 0.1  # noqa: PLR2004
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == 2.0  # noqa: PLR2004
+    assert histogram.summary()["count"] == 4  # noqa: PLR2004
+
+
+def test_metrics_summary_and_prometheus(tmp_path: Path) -> None:
+    """Тестирование сводки метрик в JSON и текстовом формате Prometheus."""
+    metrics = CrawlMetrics(FetchStats(pages_fetched=1, bytes_downloaded=2048))
+    metrics.pages_processed = 1
+    with metrics.measure("convert"):
+        pass
+    summary_path = tmp_path / "metrics" / "summary.json"
+
+    metrics.write_summary(summary_path)
+
+    summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    assert summary["pages_processed"] == 1
+    assert summary["fetch"]["bytes_downloaded"] == 2048  # noqa: PLR2004
+    assert list(summary["stages"]) == ["convert"]
+    prometheus = metrics.to_prometheus()
+    assert 'crawl_stage_seconds_count{stage="convert"} 1' in prometheus
+    assert 'crawl_stage_seconds_bucket{stage="convert",le="+Inf"} 1' in prometheus
+    assert "crawl_bytes_downloaded_total 2048" in prometheus
+
+
+def test_page_processed_logs_progress_every_n_pages() -> None:
+    """Тестирование строки прогресса в логе раз в log_every_pages страниц."""
+    messages = []
+    handler_id = log.add(messages.append, level="INFO", format="{message}")
+    metrics = CrawlMetrics(log_every_pages=2)
+    try:
+        for _ in range(5):
+            metrics.page_processed()
+    finally:
+        log.remove(handler_id)
+
+    assert metrics.pages_processed == 5  # noqa: PLR2004
+    assert [message.split(",")[0] for message in messages] == ["Обработано страниц: 2", "Обработано страниц: 4"]
+
+
+@pytest.mark.asyncio
+async def test_trace_config_and_metrics_server(unused_tcp_port: int) -> None:
+    """Тестирование записи времени сетевых этапов и публикации метрик по HTTP."""
+    async def handle(_: web.Request) -> web.Response:
+        return web.Response(text="<html><body>Page</body></html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/", handle)
+    metrics = CrawlMetrics()
+    runner = await start_metrics_server(metrics, "127.0.0.1", unused_tcp_port)
+    try:
+        async with TestServer(app) as server, aiohttp.ClientSession(
+                trace_configs=[create_trace_config(metrics)]) as session:
+            html = await fetch_html(session, str(server.make_url("/")), observe=metrics.observe)
+            async with session.get(f"http://127.0.0.1:{unused_tcp_port}/metrics") as response:
+                prometheus = await response.text()
+    finally:
+        await runner.cleanup()
+
+    assert html == "<html><body>Page</body></html>"
+    assert metrics.stages["ttfb"].count >= 1
+    assert metrics.stages["connect"].count >= 1
+    assert metrics.stages["download"].count == 1
+    assert 'crawl_stage_seconds_count{stage="download"} 1' in prometheus
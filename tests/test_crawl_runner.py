@@ -0,0 +1,173 @@
+"""Тесты crawl_runner.py."""
+import time
+import asyncio
+import threading
+
+from pathlib import Path
+from collections.abc import Iterator
+
+import pytest
+
+from aiohttp import web
+
+from crawl_job import CrawlJob
+from crawl_runner import RUNNING, FINISHED, CANCELLED, CrawlRunner
+from logger_config import log, configure_logging
+from parser.parser_config import CrawlSettings
+
+PAGE_COUNT = 5
+
+
+def render_page(number: int) -> str:
+    """Страница со ссылками на все страницы сайта."""
+    links = "".join(f'<a href="/page/{link}">{link}</a>' for link in range(PAGE_COUNT))
+    return f"<html><head><title>Page {number}</title></head><body><p>Content {number}</p>{links}</body></html>"
+
+
+class LocalSite:
+    """Локальный сайт в отдельном потоке со своим event loop; release открывает медленные страницы."""
+
+    def __init__(self, slow: bool) -> None:
+        """Инициализация сайта."""
+        self.slow = slow
+        self.release = asyncio.Event()
+        self.requests = 0
+        self.url = ""
+        self._loop = asyncio.new_event_loop()
+        self._runner: web.AppRunner | None = None
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    async def handle_page(self, request: web.Request) -> web.Response:
+        """Отдаёт страницу; медленные страницы, кроме стартовой, ждут release."""
+        self.requests += 1
+        number = int(request.match_info["number"])
+        if self.slow and number:
+            await self.release.wait()
+        return web.Response(text=render_page(number), content_type="text/html")
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/page/{number}", self.handle_page)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/page/0"
+
+    def start(self) -> None:
+        """Запускает сайт."""
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(timeout=10)
+
+    def release_pages(self) -> None:
+        """Открывает медленные страницы."""
+        self._loop.call_soon_threadsafe(self.release.set)
+
+    def stop(self) -> None:
+        """Открывает медленные страницы и останавливает сайт."""
+        self.release_pages()
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+
+
+@pytest.fixture
+def fast_site() -> Iterator[LocalSite]:
+    """Сайт, сразу отдающий страницы."""
+    site = LocalSite(slow=False)
+    site.start()
+    yield site
+    site.stop()
+
+
+@pytest.fixture
+def slow_site() -> Iterator[LocalSite]:
+    """Сайт, отдающий только стартовую страницу, пока не вызван stop."""
+    site = LocalSite(slow=True)
+    site.start()
+    yield site
+    site.stop()
+
+
+def make_job(site: LocalSite, output_directory: Path, checkpoint_path: Path | None = None) -> CrawlJob:
+    """Задание обхода локального сайта."""
+    return CrawlJob(start_urls=(site.url,), output_directory=output_directory, excluded_domains=(),
+                    settings=CrawlSettings(conversion_workers=0, requests_per_second=0,
+                                           checkpoint_path=checkpoint_path, checkpoint_interval=0))
+
+
+def test_runner_finishes_in_background(fast_site: LocalSite, tmp_path: Path) -> None:
+    """Тестирование выполнения задания в фоновом потоке с отслеживанием прогресса."""
+    runner = CrawlRunner(make_job(fast_site, tmp_path))
+    runner.start()
+    runner.join(timeout=30)
+
+    progress = runner.progress()
+    assert progress.status == FINISHED
+    assert not runner.running
+    # стартовая страница не сохраняется и не учитывается
+    assert progress.pages_processed == PAGE_COUNT - 1
+    assert len(progress.recent_pages) == PAGE_COUNT - 1
+    assert not progress.resumable
+    assert (tmp_path / "Page 1.md").exists()
+    assert (tmp_path / "INDEX.md").exists()
+
+
+def test_runner_collects_errors(tmp_path: Path) -> None:
+    """Тестирование сбора ошибок задания для отображения."""
+    job = CrawlJob(start_urls=("http://127.0.0.1:1/",), output_directory=tmp_path, excluded_domains=(),
+                   settings=CrawlSettings(conversion_workers=0, max_retries=0))
+    runner = CrawlRunner(job)
+    runner.start()
+    runner.join(timeout=30)
+
+    progress = runner.progress()
+    assert progress.status == FINISHED
+    assert progress.errors
+    assert any("WARNING" in error or "ERROR" in error for error in progress.errors)
+
+
+def test_runner_cancel_and_resume(slow_site: LocalSite, tmp_path: Path) -> None:
+    """Тестирование остановки задания и его продолжения с контрольной точки."""
+    runner = CrawlRunner(make_job(slow_site, tmp_path / "out", tmp_path / "checkpoint.sqlite"))
+    runner.start()
+    deadline = time.monotonic() + 10
+    while slow_site.requests < PAGE_COUNT and time.monotonic() < deadline:
+        time.sleep(0.01)
+    runner.cancel()
+    runner.join(timeout=30)
+
+    progress = runner.progress()
+    assert progress.status == CANCELLED
+    assert progress.resumable
+    assert not (tmp_path / "out" / "Page 1.md").exists()
+
+    slow_site.release_pages()
+    resumed = runner.resume()
+    resumed.join(timeout=30)
+
+    assert resumed.progress().status == FINISHED
+    assert (tmp_path / "out" / "Page 1.md").exists()
+    with pytest.raises(RuntimeError):
+        resumed.start()
+
+
+def test_runner_survives_logging_reconfiguration(slow_site: LocalSite, tmp_path: Path,
+                                                 monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тестирование завершения задания, обработчик логов которого удалён повторной настройкой логов."""
+    thread_errors: list[threading.ExceptHookArgs] = []
+    monkeypatch.setattr(threading, "excepthook", thread_errors.append)
+    runner = CrawlRunner(make_job(slow_site, tmp_path))
+    runner.start()
+    deadline = time.monotonic() + 10
+    while runner.status != RUNNING and time.monotonic() < deadline:
+        time.sleep(0.01)
+    configure_logging(json_log_file=None, console=False)
+    slow_site.release_pages()
+    runner.join(timeout=30)
+    log.remove()
+
+    assert runner.progress().status == FINISHED
+    assert not thread_errors
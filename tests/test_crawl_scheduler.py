@@ -0,0 +1,152 @@
+"""Тесты crawl_scheduler.py и robots_cache.py."""
+import time
+import asyncio
+
+from functools import partial
+from collections.abc import AsyncIterator
+
+import pytest
+import aiohttp
+import pytest_asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from utils.common_utils import FetchStats, fetch_html
+from utils.robots_cache import RobotsCache
+from utils.crawl_scheduler import TokenBucket, CrawlScheduler
+
+ROBOTS_TXT = "User-agent: *\nDisallow: /private\nCrawl-delay: 2\n"
+PAGE = "<html><body><p>Page</p></body></html>"
+
+
+@pytest_asyncio.fixture
+async def server() -> AsyncIterator[tuple[TestServer, dict[str, int]]]:
+    """Тестовый сайт с robots.txt, временно перегруженной и недоступной страницами."""
+    requests: dict[str, int] = {}
+
+    async def handle(request: web.Request) -> web.Response:
+        path = request.path
+        requests[path] = requests.get(path, 0) + 1
+        if path == "/robots.txt":
+            return web.Response(text=ROBOTS_TXT)
+        if path == "/flaky" and requests[path] == 1:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        if path == "/down":
+            return web.Response(status=503)
+        if path == "/slow" and requests[path] == 1:
+            await asyncio.sleep(1)
+        return web.Response(text=PAGE, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    async with TestServer(app) as test_server:
+        yield test_server, requests
+
+
+def make_scheduler(stats: FetchStats, robots: RobotsCache | None = None) -> CrawlScheduler:
+    """Планировщик с короткими задержками повторов."""
+    return CrawlScheduler(fetch=partial(fetch_html, stats=stats), requests_per_second=0, burst=1, max_retries=2,
+                          backoff_base=0.01, backoff_max=0.05, robots=robots, stats=stats)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_rate() -> None:
+    """Тестирование выдачи токенов не чаще заданной скорости после исчерпания всплеска."""
+    bucket = TokenBucket(rate=20, capacity=2)
+    started = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    # два токена из всплеска сразу, ещё два с интервалом 0.05 с
+    assert time.monotonic() - started >= 0.09  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_pause_and_slow_down() -> None:
+    """Тестирование паузы корзины и снижения скорости."""
+    bucket = TokenBucket(rate=8, capacity=4)
+    bucket.slow_down()
+    assert bucket.rate == 4  # noqa: PLR2004
+    assert bucket.capacity == 1
+
+    bucket.pause(0.05)
+    started = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - started >= 0.04  # noqa: PLR2004
+
+
+def test_token_bucket_recovers_rate() -> None:
+    """Тестирование постепенного восстановления скорости после снижения."""
+    bucket = TokenBucket(rate=8, capacity=4)
+    bucket.slow_down()
+    bucket.speed_up()
+    assert bucket.rate == pytest.approx(4.4)
+    assert bucket.capacity == 1
+
+    for _ in range(20):
+        bucket.speed_up()
+    assert bucket.rate == 8  # noqa: PLR2004
+    assert bucket.capacity == 4  # noqa: PLR2004
+
+    slow_bucket = TokenBucket(rate=0.05, capacity=1)
+    slow_bucket.slow_down()
+    assert slow_bucket.rate <= 0.05  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_timeout(server: tuple[TestServer, dict[str, int]]) -> None:
+    """Тестирование повтора запроса после таймаута чтения ответа."""
+    test_server, requests = server
+    stats = FetchStats()
+    scheduler = make_scheduler(stats)
+    scheduler.fetch = partial(fetch_html, stats=stats, client_timeout=aiohttp.ClientTimeout(sock_read=0.1))
+    async with aiohttp.ClientSession() as session:
+        html = await scheduler.fetch_html(session, str(test_server.make_url("/slow")))
+
+    assert html == PAGE
+    assert requests["/slow"] == 2  # noqa: PLR2004
+    assert stats.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_retry_after(server: tuple[TestServer, dict[str, int]]) -> None:
+    """Тестирование повтора ответа 429 по заголовку Retry-After."""
+    test_server, requests = server
+    stats = FetchStats()
+    async with aiohttp.ClientSession() as session:
+        html = await make_scheduler(stats).fetch_html(session, str(test_server.make_url("/flaky")))
+
+    assert html == PAGE
+    assert requests["/flaky"] == 2  # noqa: PLR2004
+    assert stats.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_gives_up(server: tuple[TestServer, dict[str, int]]) -> None:
+    """Тестирование отказа после исчерпания повторов."""
+    test_server, requests = server
+    stats = FetchStats()
+    async with aiohttp.ClientSession() as session:
+        html = await make_scheduler(stats).fetch_html(session, str(test_server.make_url("/down")))
+
+    assert html is None
+    assert requests["/down"] == 3  # noqa: PLR2004
+    assert stats.retries == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_scheduler_respects_robots(server: tuple[TestServer, dict[str, int]]) -> None:
+    """Тестирование запрета robots.txt, Crawl-delay и однократной загрузки robots.txt."""
+    test_server, requests = server
+    stats = FetchStats()
+    scheduler = make_scheduler(stats, RobotsCache(user_agent="test", ttl=60))
+    async with aiohttp.ClientSession() as session:
+        assert await scheduler.fetch_html(session, str(test_server.make_url("/private/page"))) is None
+        assert await scheduler.fetch_html(session, str(test_server.make_url("/a"))) == PAGE
+        bucket = await scheduler.host_bucket(session, str(test_server.make_url("/b")))
+
+    assert "/private/page" not in requests
+    assert requests["/robots.txt"] == 1
+    assert stats.robots_disallowed == 1
+    assert bucket.rate == 0.5  # не чаще одного запроса в Crawl-delay  # noqa: PLR2004
+    assert bucket.capacity == 1
@@ -0,0 +1,80 @@
+"""Тесты crawl_state.py."""
+from pathlib import Path
+
+import pytest
+
+from parser.crawler import Crawler
+from utils.crawl_state import SeenUrls, HostTable, BloomSeenUrls, create_seen_urls
+from tests.test_crawler import FakeParser
+from utils.host_limiter import HostLimiter
+
+
+@pytest.mark.parametrize("url", [
+    "https://a.com/docs/page?x=1#top",
+    "https://a.com",
+    "http://user@a.com:8080/",
+    "https://b.com/path//with//slashes",
+])
+def test_host_table_round_trip(url: str) -> None:
+    """Тестирование восстановления url из записи очереди."""
+    hosts = HostTable()
+    link = hosts.link(url, 2)
+    assert hosts.url(link) == url
+    assert link.depth == 2  # noqa: PLR2004
+
+
+def test_host_table_interns_origins() -> None:
+    """Тестирование хранения одного начала url для всех ссылок хоста."""
+    hosts = HostTable()
+    links = [hosts.link(f"https://a.com/{index}", 1) for index in range(100)]
+    links.append(hosts.link("https://b.com/", 1))
+    assert len(hosts) == 2  # noqa: PLR2004
+    assert {link.origin_id for link in links} == {0, 1}
+    assert links[5].path == "/5"
+
+
+@pytest.mark.parametrize("on_disk", [False, True], ids=["hashed", "bloom"])
+def test_seen_urls_are_exact(on_disk: bool, tmp_path: Path) -> None:
+    """Тестирование точности множества запланированных страниц, в том числе после переполнения фильтра."""
+    seen = BloomSeenUrls(tmp_path, capacity=10) if on_disk else SeenUrls()
+    keys = [f"https://a.com/{index}" for index in range(1000)]
+
+    assert all(seen.add(key) for key in keys)
+    assert not any(seen.add(key) for key in keys)
+    assert all(key in seen for key in keys)
+    assert "https://a.com/new" not in seen
+    assert len(seen) == len(keys)
+    seen.close()
+
+
+def is_empty_directory(directory: Path) -> bool:
+    """Пуста ли директория."""
+    return not any(directory.iterdir())
+
+
+def test_bloom_seen_urls_removes_database(tmp_path: Path) -> None:
+    """Тестирование удаления временной базы при закрытии."""
+    seen = create_seen_urls(tmp_path / "seen")
+    assert isinstance(seen, BloomSeenUrls)
+    seen.add("https://a.com/")
+    assert seen.path.exists()
+
+    seen.close()
+
+    assert is_empty_directory(tmp_path / "seen")
+    assert isinstance(create_seen_urls(), SeenUrls)
+
+
+@pytest.mark.asyncio
+async def test_crawl_with_bloom_seen_urls(tmp_path: Path) -> None:
+    """Тестирование обхода с множеством запланированных страниц на диске."""
+    graph = {
+        "https://a.com/": ["https://a.com/1", "https://a.com/2"],
+        "https://a.com/1": ["https://a.com/2/", "https://a.com/", "https://b.com/3"],
+    }
+    parser = FakeParser(graph)
+
+    await Crawler(parser, HostLimiter(2, 2), max_depth=2, seen=BloomSeenUrls(tmp_path, capacity=2)).crawl()
+
+    assert sorted(parser.processed) == ["https://a.com/1", "https://a.com/2", "https://b.com/3"]
+    assert is_empty_directory(tmp_path)
@@ -0,0 +1,97 @@
+"""Тесты crawler.py."""
+import asyncio
+
+import pytest
+
+from parser.crawler import Crawler
+from utils.host_limiter import HostLimiter
+
+
+class FakeParser:
+    """Заглушка парсера с заданным графом ссылок, запоминающая параллельность обработки страниц."""
+
+    def __init__(self, graph: dict[str, list[str]], start_page_url: str = "https://a.com/",
+                 fail_on: str | None = None) -> None:
+        """Инициализация заглушки."""
+        self.graph = graph
+        self.start_page_url = start_page_url
+        self.fail_on = fail_on
+        self.active: dict[str, int] = {}
+        self.max_active = 0
+        self.max_active_per_host: dict[str, int] = {}
+        self.processed: list[str] = []
+
+    async def filter_links(self) -> list[tuple[str, str]]:
+        """Возвращает ссылки стартовой страницы."""
+        return [(link, "") for link in self.graph.get(self.start_page_url, [])]
+
+    async def process_page(self, page_link: str, collect_links: bool = False) -> list[tuple[str, str]]:
+        """Имитирует обработку страницы."""
+        host = page_link.split("/")[2]
+        self.active[host] = self.active.get(host, 0) + 1
+        self.max_active = max(self.max_active, sum(self.active.values()))
+        self.max_active_per_host[host] = max(self.max_active_per_host.get(host, 0), self.active[host])
+        await asyncio.sleep(0.01)
+        self.active[host] -= 1
+        if page_link == self.fail_on:
+            msg = "Ошибка обработки"
+            raise RuntimeError(msg)
+        self.processed.append(page_link)
+        return [(link, "") for link in self.graph.get(page_link, [])] if collect_links else []
+
+
+@pytest.mark.asyncio
+async def test_crawl_respects_limits() -> None:
+    """Тестирование соблюдения общего лимита и лимита на хост."""
+    links = [f"https://a.com/{i}" for i in range(10)] + [f"https://b.com/{i}" for i in range(10)]
+    max_concurrency, per_host_concurrency = 3, 2
+    parser = FakeParser({"https://a.com/": links})
+
+    await Crawler(parser, HostLimiter(max_concurrency, per_host_concurrency)).crawl()
+
+    assert sorted(parser.processed) == sorted(links)
+    assert parser.max_active == max_concurrency
+    assert parser.max_active_per_host == {"a.com": per_host_concurrency, "b.com": per_host_concurrency}
+
+
+@pytest.mark.asyncio
+async def test_crawl_continues_after_error() -> None:
+    """Тестирование продолжения обхода после ошибки на одной из страниц."""
+    links = [f"https://a.com/{i}" for i in range(5)]
+    parser = FakeParser({"https://a.com/": links}, fail_on="https://a.com/2")
+
+    await Crawler(parser, HostLimiter(5, 5)).crawl()
+
+    assert sorted(parser.processed) == sorted(set(links) - {"https://a.com/2"})
+
+
+@pytest.mark.asyncio
+async def test_crawl_depth_and_deduplication() -> None:
+    """Тестирование ограничения глубины и однократной загрузки страниц."""
+    graph = {
+        "https://a.com/": ["https://a.com/1", "https://a.com/2#top", "mailto:me@a.com"],
+        "https://a.com/1": ["https://a.com/2/", "https://a.com/", "https://a.com/3"],
+        "https://a.com/3": ["https://a.com/4"],
+    }
+    parser = FakeParser(graph)
+
+    await Crawler(parser, HostLimiter(2, 2), max_depth=2).crawl()
+
+    assert sorted(parser.processed) == ["https://a.com/1", "https://a.com/2#top", "https://a.com/3"]
+
+
+@pytest.mark.asyncio
+async def test_crawl_max_pages() -> None:
+    """Тестирование ограничения количества страниц."""
+    max_pages = 3
+    parser = FakeParser({"https://a.com/": [f"https://a.com/{i}" for i in range(10)]})
+
+    await Crawler(parser, HostLimiter(2, 2), max_pages=max_pages).crawl()
+
+    assert len(parser.processed) == max_pages
+
+
+def test_host_limiter_invalid_limits() -> None:
+    """Тестирование запрета неположительных лимитов."""
+    with pytest.raises(ValueError, match="положительными"):
+        HostLimiter(max_concurrency=0, per_host_concurrency=1)
@@ -0,0 +1,35 @@
+"""Тесты domain_matcher.py."""
+import pytest
+
+from utils.domain_matcher import DomainMatcher
+
+
+@pytest.mark.parametrize(("rules", "url", "expected"),
+                         [
+                             (("example.com",), "https://example.com/page", True),
+                             (("example.com",), "https://docs.example.com/page", True),
+                             (("example.com",), "https://notexample.com/page", False),
+                             (("t.me",), "https://chat.meta.com/", False),
+                             (("t.me",), "https://t.me/channel", True),
+                             (("*.example.com",), "https://example.com/", False),
+                             (("*.example.com",), "https://www.example.com/", True),
+                             (("=example.com",), "https://example.com/", True),
+                             (("=example.com",), "https://www.example.com/", False),
+                             (("example.com/docs",), "https://example.com/docs/intro", True),
+                             (("example.com/docs/",), "https://example.com/docs", True),
+                             (("example.com/docs",), "https://example.com/docsearch", False),
+                             (("example.com/docs",), "https://example.com/blog", False),
+                             (("https://Example.COM",), "https://EXAMPLE.com:8080/", True),
+                             (("other.org", "example.com"), "https://a.b.example.com/", True),
+                         ])
+def test_domain_matcher(rules: tuple[str, ...], url: str, expected: bool) -> None:
+    """Тестирование правил доменов."""
+    assert DomainMatcher(rules).matches(url) is expected
+
+
+def test_domain_matcher_empty() -> None:
+    """Тестирование пустого набора правил."""
+    matcher = DomainMatcher(None)
+
+    assert not matcher
+    assert not matcher.matches("https://example.com/")
@@ -0,0 +1,70 @@
+"""Тесты filename_allocator.py."""
+from pathlib import Path
+
+import pytest
+
+from utils.manifest import Manifest, ManifestEntry
+from utils.filename_allocator import FilenameAllocator, truncate_name
+
+
+def test_allocate_collision() -> None:
+    """Тестирование имени с хэшем url для второй страницы с тем же заголовком без учёта регистра."""
+    allocator = FilenameAllocator()
+
+    first = allocator.allocate("https://example.com/a", "Docs")
+    second = allocator.allocate("https://example.com/b", "DOCS")
+
+    assert first == "Docs"
+    assert second.startswith("DOCS (")
+    assert allocator.allocate("https://example.com/b", "DOCS") == second
+    assert allocator.allocate("https://example.com/a", "Docs") == first
+
+
+def test_allocate_deterministic_suffix() -> None:
+    """Тестирование независимости имени с хэшем от экземпляра."""
+    names = []
+    for _ in range(2):
+        allocator = FilenameAllocator()
+        allocator.allocate("https://example.com/a", "Docs")
+        names.append(allocator.allocate("https://example.com/b", "Docs"))
+
+    assert names[0] == names[1]
+
+
+@pytest.mark.parametrize("title", ["INDEX", "index-a"])
+def test_allocate_reserved(title: str) -> None:
+    """Тестирование запрета имён индексных файлов."""
+    assert FilenameAllocator().allocate("https://example.com", title) != title
+
+
+def test_allocate_stable_from_manifest(tmp_path: Path) -> None:
+    """Тестирование сохранения имён из манифеста при другом порядке обработки страниц."""
+    manifest = Manifest(tmp_path)
+    manifest.set("https://example.com/b", ManifestEntry(source_hash="s", markdown_hash="m", filename="Docs"))
+    manifest.set("https://example.com/a", ManifestEntry(source_hash="s", markdown_hash="m", filename="Docs (1)"))
+
+    allocator = FilenameAllocator(manifest)
+
+    assert allocator.allocate("https://example.com/b", "Docs") == "Docs"
+    assert allocator.allocate("https://example.com/a", "Docs") != "Docs"
+
+
+def test_truncate_name() -> None:
+    """Тестирование обрезки имени по байтам без разрыва символов."""
+    max_bytes = 7
+    name = truncate_name("Привет мир", max_bytes)
+
+    assert name == "При"
+    assert len(name.encode("utf-8")) <= max_bytes
+
+
+def test_allocate_long_title() -> None:
+    """Тестирование ограничения длины имени с хэшем url."""
+    max_bytes = 50
+    allocator = FilenameAllocator(max_name_bytes=max_bytes)
+    allocator.allocate("https://example.com/a", "Заголовок " * 20)
+
+    name = allocator.allocate("https://example.com/b", "Заголовок " * 20)
+
+    assert len(name.encode("utf-8")) <= max_bytes
+    assert name.endswith(")")
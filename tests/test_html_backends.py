@@ -0,0 +1,44 @@
+"""Тесты html_backends.py."""
+import pytest
+
+from parser.converter import convert_html_to_markdown
+from parser.strip_rules import StripRules
+from parser.html_backends import extract_html_links, available_html_parsers, available_link_extractors
+
+HTML_CONTENT = """
+<html>
+    <head><title>Links</title><script>var a = "<a href='/fake'>fake</a>";</script></head>
+    <body>
+        <a href="/page1">Page <b>1</b></a>
+        <a name="anchor">No href</a>
+        <a href="https://anotherdomain.com/page2?x=1&amp;y=2"> Page 2 </a>
+    </body>
+</html>
+"""
+
+EXPECTED_LINKS = [
+    ("https://example.com/page1", "Page1"),
+    ("https://anotherdomain.com/page2?x=1&y=2", "Page 2"),
+]
+
+
+@pytest.mark.parametrize("link_extractor", available_link_extractors())
+def test_extract_html_links(link_extractor: str) -> None:
+    """Тестирование одинакового результата всех способов извлечения ссылок."""
+    assert extract_html_links(HTML_CONTENT, "https://example.com/", link_extractor) == EXPECTED_LINKS
+
+
+def test_extract_html_links_unknown_extractor() -> None:
+    """Тестирование ошибки при неизвестном способе извлечения ссылок."""
+    with pytest.raises(ValueError, match="Неизвестный способ"):
+        extract_html_links(HTML_CONTENT, "https://example.com/", "regex")
+
+
+@pytest.mark.parametrize("html_parser", available_html_parsers())
+def test_convert_with_html_parser(html_parser: str) -> None:
+    """Тестирование конвертации с разными построителями дерева."""
+    converted_page = convert_html_to_markdown(HTML_CONTENT, StripRules(), "https://example.com/", html_parser)
+
+    assert converted_page.name == "Links"
+    assert "Page 2" in converted_page.markdown
+    assert list(converted_page.links) == EXPECTED_LINKS
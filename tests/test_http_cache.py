@@ -0,0 +1,118 @@
+"""Тесты http_cache.py."""
+import zlib
+import sqlite3
+
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+from collections.abc import Callable, Iterator
+
+import pytest
+import aiohttp
+
+from utils.http_cache import HttpCache
+from utils.common_utils import fetch_html
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[HttpCache]:
+    """Фикстура кэша HTTP-ответов."""
+    http_cache = HttpCache(tmp_path / "cache.sqlite", ttl=3600, max_size_bytes=1024 * 1024)
+    yield http_cache
+    http_cache.close()
+
+
+def test_cache_put_get(cache: HttpCache) -> None:
+    """Тестирование сохранения и получения ответа."""
+    cache.put("http://test.com", "<html>Test</html>", '"v1"', "Wed, 21 Oct 2015 07:28:00 GMT")
+
+    cached_response = cache.get("http://test.com")
+
+    assert cached_response.body == "<html>Test</html>"
+    assert cached_response.conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+    assert cache.get("http://other.com") is None
+
+
+def test_cache_eviction(tmp_path: Path) -> None:
+    """Тестирование удаления давно не использованных ответов при превышении размера кэша."""
+    body_size = len(zlib.compress(b"page", level=1))
+    cache = HttpCache(tmp_path / "cache.sqlite", ttl=3600, max_size_bytes=body_size * 2)
+    cache.put("http://test.com/1", "page", None, None)
+    cache.put("http://test.com/2", "page", None, None)
+    cache.get("http://test.com/1")
+    cache.put("http://test.com/3", "page", None, None)
+
+    assert cache.get("http://test.com/2") is None
+    assert cache.get("http://test.com/1") is not None
+    assert cache.get("http://test.com/3") is not None
+    cache.close()
+
+
+def committed_urls(path: Path) -> dict[str, float]:
+    """Время использования ответов в зафиксированном состоянии базы кэша."""
+    connection = sqlite3.connect(path)
+    try:
+        return dict(connection.execute("SELECT url, accessed_at FROM responses"))
+    finally:
+        connection.close()
+
+
+def test_cache_commits_periodically(tmp_path: Path) -> None:
+    """Тестирование фиксации изменений кэша не на каждый запрос, а раз в интервал и при закрытии."""
+    path = tmp_path / "cache.sqlite"
+    cache = HttpCache(path, ttl=3600, max_size_bytes=1024 * 1024, commit_interval=3600)
+    cache.put("http://test.com", "<html>Test</html>", None, None)
+    cache.get("http://test.com")
+
+    assert committed_urls(path) == {}
+    assert cache.get("http://test.com").body == "<html>Test</html>"
+
+    cache.close()
+
+    committed = committed_urls(path)
+    assert list(committed) == ["http://test.com"]
+    reopened = HttpCache(path, ttl=3600, max_size_bytes=1024 * 1024)
+    assert reopened.get("http://test.com").body == "<html>Test</html>"
+    reopened.close()
+    assert committed_urls(path)["http://test.com"] > committed["http://test.com"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_html_fresh_cache(cache: HttpCache) -> None:
+    """Тестирование получения свежего ответа из кэша без запроса."""
+    cache.put("http://test.com", "<html>Cached</html>", None, None)
+
+    with patch("aiohttp.ClientSession.get") as get:
+        async with aiohttp.ClientSession() as session:
+            result = await fetch_html(session, "http://test.com", cache=cache)
+
+    assert result == "<html>Cached</html>"
+    get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_html_not_modified(cache: HttpCache, response_context: Callable[..., AsyncMock]) -> None:
+    """Тестирование условного запроса и использования кэша при ответе 304."""
+    cache.put("http://test.com", "<html>Cached</html>", '"v1"', None)
+    cache.ttl = 0
+
+    with patch("aiohttp.ClientSession.get", return_value=response_context(304)) as get:
+        async with aiohttp.ClientSession() as session:
+            result = await fetch_html(session, "http://test.com", cache=cache)
+
+    assert result == "<html>Cached</html>"
+    assert get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+
+@pytest.mark.asyncio
+async def test_fetch_html_stores_response(cache: HttpCache, response_context: Callable[..., AsyncMock]) -> None:
+    """Тестирование сохранения полученного ответа в кэш."""
+    context = response_context(200, b"<html>New</html>", {"Content-Type": "text/html", "ETag": '"v2"'})
+    with patch("aiohttp.ClientSession.get", return_value=context):
+        async with aiohttp.ClientSession() as session:
+            result = await fetch_html(session, "http://test.com", cache=cache)
+
+    assert result == "<html>New</html>"
+    assert cache.get("http://test.com").etag == '"v2"'
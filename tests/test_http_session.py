@@ -0,0 +1,47 @@
+"""Тесты http_session.py."""
+from unittest.mock import patch
+
+import pytest
+import aiohttp
+
+from start_parser import open_crawl_context
+from utils.http_session import accept_encoding, create_client_session
+from parser.parser_config import CrawlSettings
+
+
+def test_accept_encoding() -> None:
+    """Тестирование запроса brotli только при наличии распаковщика."""
+    with patch("utils.http_session.HAS_BROTLI", new=True):
+        assert accept_encoding() == "gzip, deflate, br"
+    with patch("utils.http_session.HAS_BROTLI", new=False):
+        assert accept_encoding() == "gzip, deflate"
+
+
+@pytest.mark.asyncio
+async def test_create_client_session() -> None:
+    """Тестирование настроек пула соединений сессии."""
+    connection_limit, connection_limit_per_host = 50, 5
+    async with create_client_session(connection_limit=connection_limit,
+                                     connection_limit_per_host=connection_limit_per_host,
+                                     dns_cache_ttl=120, keepalive_timeout=15.0) as session:
+        connector = session.connector
+        assert isinstance(connector, aiohttp.TCPConnector)
+        assert connector.limit == connection_limit
+        assert connector.limit_per_host == connection_limit_per_host
+        assert connector.use_dns_cache is True
+        assert session.headers["Accept-Encoding"] == accept_encoding()
+
+
+@pytest.mark.asyncio
+async def test_open_crawl_context_session() -> None:
+    """Тестирование создания собственной сессии и переиспользования переданной."""
+    settings = CrawlSettings(conversion_workers=0, connection_limit=7)
+    async with open_crawl_context(settings) as context:
+        own_session = context.session
+        assert own_session.connector.limit == settings.connection_limit
+    assert own_session.closed
+
+    async with aiohttp.ClientSession() as session:
+        async with open_crawl_context(settings, session=session) as context:
+            assert context.session is session
+        assert not session.closed
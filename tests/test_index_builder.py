@@ -0,0 +1,95 @@
+"""Тесты index_builder.py."""
+from pathlib import Path
+
+import pytest
+
+from utils.manifest import Manifest, ManifestEntry
+from utils.common_utils import create_index_md_file
+from utils.index_builder import IndexBuilder
+
+
+def add_page(manifest: Manifest, url: str, title: str, filename: str | None = None) -> None:
+    """Добавляет страницу в манифест."""
+    manifest.set(url, ManifestEntry(source_hash="s", markdown_hash="m", filename=filename or title, title=title,
+                                    url=url))
+
+
+@pytest.fixture
+def manifest(tmp_path: Path) -> Manifest:
+    """Манифест с тремя страницами двух доменов."""
+    pages_manifest = Manifest(tmp_path)
+    add_page(pages_manifest, "https://example.com/b", "Beta")
+    add_page(pages_manifest, "https://docs.example.org/a", "Alpha: intro", filename="Alpha_ intro")
+    add_page(pages_manifest, "https://example.com/g", "Gamma")
+    return pages_manifest
+
+
+def test_index_crawl_order(tmp_path: Path, manifest: Manifest) -> None:
+    """Тестирование индекса в порядке обхода с заголовками, отличающимися от имени файла."""
+    IndexBuilder(tmp_path).write(manifest)
+
+    assert (tmp_path / "INDEX.md").read_text(encoding="utf-8") == (
+        f"# Files in {tmp_path.name}\n"
+        "1. [[Beta.md]]\n"
+        "2. [[Alpha_ intro.md|Alpha: intro]]\n"
+        "3. [[Gamma.md]]\n"
+    )
+
+
+def test_index_title_order(tmp_path: Path, manifest: Manifest) -> None:
+    """Тестирование индекса, упорядоченного по заголовку."""
+    IndexBuilder(tmp_path, order="title").write(manifest)
+
+    lines = (tmp_path / "INDEX.md").read_text(encoding="utf-8").splitlines()
+    assert lines[1:] == ["1. [[Alpha_ intro.md|Alpha: intro]]", "2. [[Beta.md]]", "3. [[Gamma.md]]"]
+
+
+def test_index_append_and_patch(tmp_path: Path, manifest: Manifest) -> None:
+    """Тестирование дописывания новых страниц и перезаписи изменённого индекса."""
+    builder = IndexBuilder(tmp_path)
+    index_path = tmp_path / "INDEX.md"
+    builder.write(manifest)
+    inode = index_path.stat().st_ino
+
+    add_page(manifest, "https://example.com/d", "Delta")
+    builder.write(manifest)
+    assert index_path.read_text(encoding="utf-8").endswith("3. [[Gamma.md]]\n4. [[Delta.md]]\n")
+    assert index_path.stat().st_ino == inode  # файл дописан, а не заменён
+
+    add_page(manifest, "https://example.com/b", "Beta 2")
+    builder.write(manifest)
+    assert "1. [[Beta 2.md]]\n" in index_path.read_text(encoding="utf-8")
+
+
+def test_index_domain_shards(tmp_path: Path, manifest: Manifest) -> None:
+    """Тестирование разделения индекса по доменам и удаления пустых дочерних индексов."""
+    IndexBuilder(tmp_path, shard="domain").write(manifest)
+
+    assert (tmp_path / "INDEX.md").read_text(encoding="utf-8").splitlines()[1:] == [
+        "1. [[INDEX-docs.example.org.md]]",
+        "2. [[INDEX-example.com.md]]",
+    ]
+    assert (tmp_path / "INDEX-example.com.md").read_text(encoding="utf-8") == (
+        "# example.com\n1. [[Beta.md]]\n2. [[Gamma.md]]\n"
+    )
+
+    del manifest.entries["https://docs.example.org/a"]
+    IndexBuilder(tmp_path, shard="domain").write(manifest)
+    assert not (tmp_path / "INDEX-docs.example.org.md").exists()
+
+
+def test_create_index_md_file_from_manifest(tmp_path: Path, manifest: Manifest) -> None:
+    """Тестирование построения индекса по манифесту вместо списка файлов директории."""
+    manifest.save()
+    (tmp_path / "unrelated.txt").write_text("text", encoding="utf-8")
+
+    create_index_md_file(tmp_path, order="title", shard="alpha")
+
+    assert "unrelated" not in (tmp_path / "INDEX.md").read_text(encoding="utf-8")
+    assert (tmp_path / "INDEX-G.md").read_text(encoding="utf-8") == "# G\n1. [[Gamma.md]]\n"
+
+
+def test_index_invalid_order(tmp_path: Path) -> None:
+    """Тестирование ошибки при неизвестном порядке индекса."""
+    with pytest.raises(ValueError, match="порядок"):
+        IndexBuilder(tmp_path, order="random")
@@ -0,0 +1,36 @@
+"""Тесты logger_config.py."""
+import json
+
+from pathlib import Path
+from collections.abc import Iterator
+
+import pytest
+
+from logger_config import log, configure_logging
+
+
+@pytest.fixture(autouse=True)
+def restore_logging() -> Iterator[None]:
+    """Убирает обработчики, добавленные тестом."""
+    yield
+    log.remove()
+
+
+def test_configure_logging_production_filters_level(tmp_path: Path) -> None:
+    """Тестирование рабочего режима: сообщения ниже INFO отбрасываются, файл пишется в фоне."""
+    json_log_file = tmp_path / "logs" / "log.json"
+
+    configure_logging(mode="production", json_log_file=json_log_file, console=False)
+    log.debug("Отладка {url}", url="https://example.com")
+    log.info("Прогресс {pages}", pages=10)
+    log.complete()
+    log.remove()
+
+    records = [json.loads(line)["record"] for line in json_log_file.read_text(encoding="utf-8").splitlines()]
+    assert [record["message"] for record in records] == ["Прогресс 10"]
+
+
+def test_configure_logging_unknown_mode() -> None:
+    """Тестирование ошибки при неизвестном режиме логов."""
+    with pytest.raises(ValueError, match="режим"):
+        configure_logging(mode="verbose", json_log_file=None)
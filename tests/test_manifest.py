@@ -0,0 +1,48 @@
+"""Тесты manifest.py."""
+from pathlib import Path
+
+from utils.manifest import Manifest, ManifestEntry, content_hash
+
+
+def test_manifest_save_and_load(tmp_path: Path) -> None:
+    """Тестирование сохранения и загрузки манифеста."""
+    manifest = Manifest(tmp_path)
+    entry = ManifestEntry(source_hash=content_hash("<html>"), markdown_hash=content_hash("md"), filename="Page")
+    manifest.set("https://example.com/page", entry)
+    manifest.save()
+
+    assert Manifest(tmp_path).get("https://example.com/page") == entry
+
+
+def test_manifest_save_unchanged(tmp_path: Path) -> None:
+    """Тестирование отсутствия перезаписи неизменённого манифеста."""
+    manifest = Manifest(tmp_path)
+    manifest.save()
+
+    assert not manifest.path.exists()
+
+
+def test_manifest_corrupted(tmp_path: Path) -> None:
+    """Тестирование загрузки повреждённого манифеста."""
+    (tmp_path / Manifest.file_name).write_text("{not json", encoding="utf-8")
+
+    assert Manifest(tmp_path).entries == {}
+
+
+def test_content_hash_parts() -> None:
+    """Тестирование различия хэшей при разном разбиении содержимого на части."""
+    assert content_hash("ab", "c") != content_hash("a", "bc")
+
+
+def test_manifest_keeps_crawl_order(tmp_path: Path) -> None:
+    """Тестирование сохранения порядкового номера страницы при обновлении и после перезагрузки."""
+    manifest = Manifest(tmp_path)
+    for url in ("https://example.com/a", "https://example.com/b"):
+        manifest.set(url, ManifestEntry(source_hash="s", markdown_hash="m", filename=url[-1]))
+    manifest.set("https://example.com/a", ManifestEntry(source_hash="s2", markdown_hash="m2", filename="a"))
+    manifest.save()
+
+    reloaded = Manifest(tmp_path)
+    reloaded.set("https://example.com/c", ManifestEntry(source_hash="s", markdown_hash="m", filename="c"))
+
+    assert [entry.order for entry in reloaded.entries.values()] == [0, 1, 2]
@@ -0,0 +1,87 @@
+"""Тесты markdown_writer.py."""
+import asyncio
+
+from pathlib import Path
+
+import pytest
+
+from utils.markdown_writer import MarkdownWriter, write_text_atomic
+
+
+def test_write_text_atomic(tmp_path: Path) -> None:
+    """Тестирование атомарной записи без оставшихся временных файлов."""
+    path = tmp_path / "note.md"
+    path.write_text("old", encoding="utf-8")
+
+    size = write_text_atomic(path, "новый", fsync=True)
+
+    assert path.read_text(encoding="utf-8") == "новый"
+    assert size == len("новый".encode())
+    assert [file.name for file in tmp_path.iterdir()] == ["note.md"]
+
+
+@pytest.mark.asyncio
+async def test_writer_writes_batches(tmp_path: Path) -> None:
+    """Тестирование пакетной записи и ожидания места в заполненной очереди."""
+    async with MarkdownWriter(queue_size=1, batch_size=4, threads=2) as writer:
+        for index in range(10):
+            await writer.write(tmp_path, f"page{index}", f"# Page {index}")
+
+    for index in range(10):
+        assert (tmp_path / f"page{index}.md").read_text(encoding="utf-8") == f"# Page {index}"
+    assert writer.stats.files_written == 10  # noqa: PLR2004
+    assert writer.stats.failed == 0
+    assert writer.stats.backpressure_waits > 0
+    assert writer.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_writer_last_version_and_errors(tmp_path: Path) -> None:
+    """Тестирование записи последней версии файла и продолжения работы после ошибки записи."""
+    writer = MarkdownWriter(queue_size=10, batch_size=10, threads=1, fsync=False)
+    await writer.write(tmp_path, "note", "first")
+    await writer.write(tmp_path, "note", "second")
+    await writer.write(tmp_path / "missing", "note", "lost")
+    await writer.close()
+
+    assert (tmp_path / "note.md").read_text(encoding="utf-8") == "second"
+    assert writer.stats.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_writer_removes_files_in_order(tmp_path: Path) -> None:
+    """Тестирование удаления файлов по порядку с записями."""
+    writer = MarkdownWriter(queue_size=10, batch_size=1, threads=1, fsync=False)
+    await writer.write(tmp_path, "old", "text")
+    await writer.remove(tmp_path, "old")
+    await writer.remove(tmp_path, "kept")
+    await writer.write(tmp_path, "kept", "text")
+    await writer.close()
+
+    assert not (tmp_path / "old.md").exists()
+    assert (tmp_path / "kept.md").exists()
+    assert writer.stats.files_written == 2  # noqa: PLR2004
+    assert writer.stats.files_removed == 2  # noqa: PLR2004
+    assert writer.stats.failed == 0
+
+
+@pytest.mark.asyncio
+async def test_writer_survives_unexpected_errors(tmp_path: Path) -> None:
+    """Тестирование завершения close после ошибок, отличных от OSError, при записи и в метриках."""
+    def failing_observe(stage: str, _seconds: float) -> None:
+        raise RuntimeError(stage)
+
+    writer = MarkdownWriter(queue_size=10, batch_size=1, threads=1, fsync=False, observe=failing_observe)
+    await writer.write(tmp_path, "broken", "\ud800")  # одиночный суррогат не кодируется в UTF-8
+    await writer.write(tmp_path, "note", "text")
+    await asyncio.wait_for(writer.close(), timeout=5)
+
+    assert (tmp_path / "note.md").read_text(encoding="utf-8") == "text"
+    assert not (tmp_path / "broken.md").exists()
+    assert writer.stats.failed == 2  # noqa: PLR2004
+
+
+def test_writer_invalid_settings() -> None:
+    """Тестирование ошибки при неположительных размерах очереди и пакета."""
+    with pytest.raises(ValueError, match="положительными"):
+        MarkdownWriter(queue_size=0, batch_size=1, threads=1)
@@ -0,0 +1,164 @@
+"""Тесты utils/local_pages.py и offline_ingest.py."""
+import gzip
+
+from pathlib import Path
+
+import pytest
+
+from cli import main
+from crawl_job import CrawlJob
+from offline_ingest import run_offline_ingest
+from utils.manifest import Manifest
+from utils.local_pages import read_html_file, iter_warc_pages, iter_directory_pages
+from parser.parser_config import CrawlSettings
+
+
+def page(title: str) -> str:
+    """HTML страницы с заголовком."""
+    return f"<html><head><title>{title}</title></head><body><p>Содержимое {title}</p></body></html>"
+
+
+def warc_record(warc_type: str, url: str, block: bytes, content_type: str) -> bytes:
+    """Запись WARC с блоком block."""
+    headers = (f"WARC/1.0\r\nWARC-Type: {warc_type}\r\nWARC-Target-URI: {url}\r\n"
+               f"Content-Type: {content_type}\r\nContent-Length: {len(block)}\r\n\r\n")
+    return headers.encode() + block + b"\r\n\r\n"
+
+
+def http_response(body: bytes, status: str = "200 OK", content_type: str = "text/html; charset=utf-8",
+                  extra_headers: str = "") -> bytes:
+    """Ответ HTTP для записи response."""
+    return f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n{extra_headers}\r\n".encode() + body
+
+
+def build_warc(path: Path) -> Path:
+    """Записывает архив WARC со страницами разных видов, сжатый gzip, если имя оканчивается на .gz."""
+    chunked = b"".join(f"{len(part):x}\r\n".encode() + part + b"\r\n"
+                       for part in (page("Chunked").encode()[:20], page("Chunked").encode()[20:])) + b"0\r\n\r\n"
+    records = [
+        warc_record("warcinfo", "", b"software: test\r\n", "application/warc-fields"),
+        warc_record("request", "https://a.com/", b"GET / HTTP/1.1\r\n\r\n", "application/http; msgtype=request"),
+        warc_record("response", "https://a.com/", http_response(page("Главная").encode("cp1251"),
+                                                                 content_type="text/html; charset=windows-1251"),
+                    "application/http; msgtype=response"),
+        warc_record("response", "https://a.com/chunked",
+                    http_response(chunked, extra_headers="Transfer-Encoding: chunked\r\n"),
+                    "application/http; msgtype=response"),
+        warc_record("response", "https://a.com/gzip",
+                    http_response(gzip.compress(page("Gzip").encode()), extra_headers="Content-Encoding: gzip\r\n"),
+                    "application/http; msgtype=response"),
+        warc_record("response", "https://a.com/missing", http_response(page("Missing").encode(), "404 Not Found"),
+                    "application/http; msgtype=response"),
+        warc_record("response", "https://a.com/image.png", http_response(b"\x89PNG", content_type="image/png"),
+                    "application/http; msgtype=response"),
+        warc_record("resource", "https://a.com/resource", page("Resource").encode(), "text/html"),
+    ]
+    data = b"".join(records)
+    path.write_bytes(gzip.compress(data) if path.suffix == ".gz" else data)
+    return path
+
+
+@pytest.mark.parametrize("name", ["site.warc", "site.warc.gz"])
+def test_iter_warc_pages(tmp_path: Path, name: str) -> None:
+    """Тестирование чтения HTML страниц из записей response и resource архива WARC."""
+    pages = dict(iter_warc_pages(build_warc(tmp_path / name)))
+
+    assert list(pages) == ["https://a.com/", "https://a.com/chunked", "https://a.com/gzip", "https://a.com/resource"]
+    assert "Главная" in pages["https://a.com/"]
+    assert pages["https://a.com/chunked"] == page("Chunked")
+    assert pages["https://a.com/gzip"] == page("Gzip")
+
+
+def test_iter_warc_pages_skips_large_records(tmp_path: Path) -> None:
+    """Тестирование пропуска записей больше ограничения."""
+    pages = dict(iter_warc_pages(build_warc(tmp_path / "site.warc"), max_bytes=150))
+    assert list(pages) == ["https://a.com/resource"]
+
+
+def test_iter_warc_pages_skips_corrupt_chunked_record(tmp_path: Path) -> None:
+    """Тестирование пропуска записи с повреждённым размером части посреди архива."""
+    data = b"".join([
+        warc_record("resource", "https://a.com/first", page("First").encode(), "text/html"),
+        warc_record("response", "https://a.com/corrupt",
+                    http_response(b"zz\r\nbroken\r\n0\r\n\r\n", extra_headers="Transfer-Encoding: chunked\r\n"),
+                    "application/http; msgtype=response"),
+        warc_record("resource", "https://a.com/last", page("Last").encode(), "text/html"),
+    ])
+    path = tmp_path / "corrupt.warc"
+    path.write_bytes(data)
+
+    assert [url for url, _ in iter_warc_pages(path)] == ["https://a.com/first", "https://a.com/last"]
+
+
+@pytest.mark.asyncio
+async def test_run_offline_ingest_warc_uses_max_body_bytes(tmp_path: Path) -> None:
+    """Тестирование ограничения размера записей WARC настройкой задания."""
+    output_directory = tmp_path / "out"
+    job = CrawlJob(start_urls=(), output_directory=output_directory,
+                   settings=CrawlSettings(conversion_workers=0, max_body_bytes=150))
+
+    assert await run_offline_ingest(job, build_warc(tmp_path / "site.warc")) == 1
+
+    assert {path.name for path in output_directory.glob("*.md")} == {"Resource.md", "INDEX.md"}
+
+
+def write_site(root: Path) -> Path:
+    """Записывает дерево сохранённых страниц."""
+    (root / "docs" / "guide").mkdir(parents=True)
+    (root / "index.html").write_text(page("Главная"), encoding="utf-8")
+    (root / "docs" / "intro page.htm").write_text(page("Intro"), encoding="utf-8")
+    cp1251_page = page("Старт").replace("<head>", '<head><meta charset="windows-1251">')
+    (root / "docs" / "guide" / "start.html").write_bytes(cp1251_page.encode("cp1251"))
+    (root / "docs" / "empty.html").write_text("", encoding="utf-8")
+    (root / "style.css").write_text("body {}", encoding="utf-8")
+    return root
+
+
+def test_iter_directory_pages(tmp_path: Path) -> None:
+    """Тестирование обхода HTML файлов директории с url относительно base_url."""
+    root = write_site(tmp_path / "site")
+
+    pages = list(iter_directory_pages(root, "https://a.com/mirror"))
+
+    assert [url for url, _ in pages] == [
+        "https://a.com/mirror/index.html",
+        "https://a.com/mirror/docs/empty.html",
+        "https://a.com/mirror/docs/intro%20page.htm",
+        "https://a.com/mirror/docs/guide/start.html",
+    ]
+    assert next(iter_directory_pages(root))[0] == (root / "index.html").resolve().as_uri()
+    assert "Старт" in read_html_file(root / "docs" / "guide" / "start.html")
+    assert read_html_file(root / "docs" / "empty.html") == ""
+    assert read_html_file(root / "index.html", max_bytes=10) is None
+    assert read_html_file(root / "missing.html") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("conversion_workers", [0, 2])
+async def test_run_offline_ingest_directory(tmp_path: Path, conversion_workers: int) -> None:
+    """Тестирование конвертации дерева файлов с созданием индекса и пропуском неизменённых страниц."""
+    root = write_site(tmp_path / "site")
+    output_directory = tmp_path / "out"
+    job = CrawlJob(start_urls=(), output_directory=output_directory,
+                   settings=CrawlSettings(conversion_workers=conversion_workers, max_concurrency=2))
+
+    assert await run_offline_ingest(job, root, "https://a.com/") == 3  # noqa: PLR2004
+
+    assert {path.name for path in output_directory.glob("*.md")} == {"Главная.md", "Intro.md", "Старт.md", "INDEX.md"}
+    assert "Содержимое" in (output_directory / "Старт.md").read_text(encoding="utf-8")
+    assert Manifest(output_directory).get("https://a.com/docs/intro%20page.htm").title == "Intro"
+
+    # повторная обработка не меняет файлы неизменённых страниц
+    modified = (output_directory / "Intro.md").stat().st_mtime_ns
+    assert await run_offline_ingest(job, root, "https://a.com/") == 3  # noqa: PLR2004
+    assert (output_directory / "Intro.md").stat().st_mtime_ns == modified
+
+
+def test_cli_offline_input(tmp_path: Path) -> None:
+    """Тестирование конвертации архива WARC из командной строки и ошибки для неподходящего источника."""
+    warc_path = build_warc(tmp_path / "site.warc.gz")
+    output_directory = tmp_path / "out"
+
+    assert main(["--offline-input", str(warc_path), "--output-dir", str(output_directory)]) == 0
+    assert {path.stem for path in output_directory.glob("*.md")} == {"Главная", "Chunked", "Gzip", "Resource", "INDEX"}
+    assert main(["--offline-input", str(tmp_path / "site.txt"), "--output-dir", str(output_directory)]) == 2  # noqa: PLR2004
@@ -1,10 +1,13 @@
 """Тесты parser_class.py."""
 from pathlib import Path
 from unittest.mock import AsyncMock, patch
+from concurrent.futures import ProcessPoolExecutor
 
 import pytest
 import aiohttp
 
+from utils.simhash import SimHashIndex
+from utils.manifest import Manifest
 from parser.parser_class import Parser
 
 
@@ -119,3 +122,119 @@ async def test_process_page_empty_content(parser: Parser, tmp_path: Path) -> Non
 
     file_path = tmp_path / "Unnamed_Page.md"
     assert not file_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_process_page_in_process_pool(parser: Parser, tmp_path: Path) -> None:
+    """Тестирование конвертации страницы в пуле процессов."""
+    html_content = """
+    <html>
+        <head><title>Pool Page</title></head>
+        <body>
+            <p class="remove-me">This will be removed</p>
+            <p>This is some content</p>
+        </body>
+    </html>
+    """
+    parser.fetch_html.return_value = html_content
+    parser.css_classes = ("remove-me",)
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        parser.executor = executor
+        await parser.process_page("https://example.com/page1")
+
+    content = (tmp_path / "Pool Page.md").read_text(encoding="utf-8")
+    assert "This is some content" in content
+    assert "This will be removed" not in content
+
+
+@pytest.mark.asyncio
+async def test_process_page_collect_links(parser: Parser) -> None:
+    """Тестирование получения отфильтрованных ссылок обработанной страницы."""
+    html_content = """
+    <html>
+        <head><title>Links Page</title></head>
+        <body>
+            <p>Content</p>
+            <a href="/page2">Page 2</a>
+            <a href="https://anotherdomain.com/page3">Page 3</a>
+        </body>
+    </html>
+    """
+    parser.fetch_html.return_value = html_content
+
+    links = await parser.process_page("https://example.com/page1", collect_links=True)
+
+    assert links == [("https://example.com/page2", "Page 2")]
+
+
+@pytest.mark.asyncio
+async def test_process_page_incremental(parser: Parser, tmp_path: Path) -> None:
+    """Тестирование пропуска конвертации и перезаписи неизменённых страниц."""
+    html_content = "<html><head><title>Same Page</title></head><body><p>Content</p></body></html>"
+    parser.fetch_html.return_value = html_content
+    parser.manifest = Manifest(tmp_path)
+    page_link = "https://example.com/page1"
+
+    await parser.process_page(page_link)
+    file_path = tmp_path / "Same Page.md"
+    first_mtime = file_path.stat().st_mtime_ns
+
+    with patch.object(parser, "convert_html", wraps=parser.convert_html) as convert_html:
+        await parser.process_page(page_link)
+        convert_html.assert_not_called()
+
+        # изменение настроек конвертации требует повторной конвертации, но тот же markdown не перезаписывается
+        parser.tags_names = ("img",)
+        await parser.process_page(page_link)
+        convert_html.assert_called_once()
+
+    assert file_path.stat().st_mtime_ns == first_mtime
+
+
+@pytest.mark.asyncio
+async def test_process_page_same_title(parser: Parser, tmp_path: Path) -> None:
+    """Тестирование сохранения страниц с одинаковым заголовком в разные файлы."""
+    names = []
+    for index in range(2):
+        parser.fetch_html.return_value = f"<html><head><title>Docs</title></head><body><p>Text {index}</p></html>"
+        await parser.process_page(f"https://example.com/page{index}")
+        names.append(parser.filename_allocator.allocate(f"https://example.com/page{index}", "Docs"))
+
+    assert names[0] == "Docs"
+    assert names[1] != names[0]
+    for index, name in enumerate(names):
+        assert f"Text {index}" in (tmp_path / f"{name}.md").read_text(encoding="utf-8")
+
+
+@pytest.mark.asyncio
+async def test_process_page_title_change_removes_old_file(parser: Parser, tmp_path: Path) -> None:
+    """Тестирование удаления файла с прежним именем после изменения заголовка страницы."""
+    parser.manifest = Manifest(tmp_path)
+    page_link = "https://example.com/page1"
+    parser.fetch_html.return_value = "<html><head><title>Old Title</title></head><body><p>Text</p></body></html>"
+    await parser.process_page(page_link)
+    parser.fetch_html.return_value = "<html><head><title>New Title</title></head><body><p>Text</p></body></html>"
+    await parser.process_page(page_link)
+
+    assert not (tmp_path / "Old Title.md").exists()
+    assert (tmp_path / "New Title.md").exists()
+    assert parser.manifest.get(page_link).filename == "New Title"
+
+
+@pytest.mark.asyncio
+async def test_process_page_skips_near_duplicates(parser: Parser, tmp_path: Path) -> None:
+    """Тестирование пропуска записи страницы, содержимое которой почти совпадает с уже сохранённой."""
+    text = " ".join(f"word{index % 50} text{index % 7}" for index in range(400))
+    parser.manifest = Manifest(tmp_path)
+    parser.near_duplicates = SimHashIndex(parser.manifest)
+    parser.fetch_html.return_value = f"<html><head><title>Original</title></head><body><p>{text}</p></body></html>"
+    await parser.process_page("https://example.com/original")
+
+    parser.fetch_html.return_value = (f"<html><head><title>Mirror</title><script>track()</script></head>"
+                                      f"<body><nav>Другое меню зеркала</nav><div><p>{text}</p></div></body></html>")
+    await parser.process_page("https://mirror.example.com/original")
+
+    assert (tmp_path / "Original.md").exists()
+    assert not (tmp_path / "Mirror.md").exists()
+    assert parser.manifest.get("https://example.com/original").simhash
@@ -0,0 +1,59 @@
+"""Тесты simhash.py."""
+import random
+
+from pathlib import Path
+
+from utils.simhash import SimHashIndex, hamming_distance, text_fingerprint
+from utils.manifest import Manifest, ManifestEntry
+from parser.converter import convert_html_to_markdown
+from parser.strip_rules import StripRules
+
+WORDS = ("alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "iota", "kappa", "lambda", "mu")
+
+
+def random_text(seed: int, length: int = 600) -> str:
+    """Текст из случайных слов."""
+    rng = random.Random(seed)  # noqa: S311
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def test_fingerprint_distances() -> None:
+    """Тестирование близости отпечатков почти одинаковых текстов и удалённости разных."""
+    text = random_text(1)
+    near_duplicate = text.replace("alpha beta", "alpha changed", 1)
+
+    assert text_fingerprint(text) == text_fingerprint(text.upper())
+    assert hamming_distance(text_fingerprint(text), text_fingerprint(near_duplicate)) <= 3  # noqa: PLR2004
+    assert hamming_distance(text_fingerprint(text), text_fingerprint(random_text(2))) > 10  # noqa: PLR2004
+    assert text_fingerprint("too short") == 0
+
+
+def test_converted_fingerprint_ignores_stripped_navigation() -> None:
+    """Тестирование отпечатка по содержимому после удаления элементов, а не по общему меню сайта."""
+    strip_rules = StripRules.compile(None, ("nav", "script"), None)
+    menu = "".join(f'<li><a href="/section{index}">Section {index} overview</a></li>' for index in range(300))
+    fingerprints = []
+    for seed in range(20):
+        html = (f"<html><head><script>var build = 12345;</script></head><body><nav><ul>{menu}</ul></nav>"
+                f"<p>{random_text(seed, 50)}</p></body></html>")
+        fingerprints.append(convert_html_to_markdown(html, strip_rules, fingerprint=True).simhash)
+
+    assert all(fingerprints)
+    assert all(hamming_distance(fingerprints[0], other) > 3 for other in fingerprints[1:])  # noqa: PLR2004
+    assert convert_html_to_markdown("<p>" + random_text(3) + "</p>", strip_rules).simhash == 0
+
+
+def test_index_finds_near_duplicates_and_loads_manifest(tmp_path: Path) -> None:
+    """Тестирование поиска почти одинаковых страниц и загрузки отпечатков из манифеста."""
+    fingerprint = text_fingerprint(random_text(4))
+    manifest = Manifest(tmp_path)
+    manifest.set("a.com/original", ManifestEntry(source_hash="s", markdown_hash="m", filename="Original",
+                                                 simhash=f"{fingerprint:016x}"))
+    index = SimHashIndex(manifest, max_distance=3)
+
+    assert index.find_duplicate("a.com/mirror", fingerprint ^ 0b101) == "a.com/original"
+    assert index.find_duplicate("a.com/original", fingerprint) is None
+    assert index.find_duplicate("a.com/other", fingerprint ^ 0b1111) is None
+
+    index.add("a.com/original", ~fingerprint & (2**64 - 1))
+    assert index.find_duplicate("a.com/mirror", fingerprint) is None
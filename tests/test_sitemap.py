@@ -0,0 +1,155 @@
+"""Тесты parser/sitemap.py."""
+import gzip
+
+from pathlib import Path
+
+import pytest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from crawl_job import CrawlJob, run_job
+from app_exceptions import SitemapError
+from parser.sitemap import SitemapEntry, SitemapParser
+from utils.manifest import Manifest
+from parser.parser_config import CrawlSettings
+
+URLSET = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url><loc>https://example.com/a</loc><lastmod>2024-01-01</lastmod></url>
+  <url>
+    <loc> https://example.com/b </loc>
+    <image:image><image:loc>https://example.com/b.png</image:loc></image:image>
+  </url>
+  <url><lastmod>2024-01-01</lastmod></url>
+</urlset>
+"""
+
+SITEMAP_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>/sitemap-pages.xml</loc><lastmod>2024-02-01</lastmod></sitemap>
+</sitemapindex>
+"""
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <title>Blog</title><link>https://example.com/</link>
+  <item><title>Post</title><link>https://example.com/post</link><pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate></item>
+</channel></rss>
+"""
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <link href="https://example.com/feed.atom" rel="self"/>
+  <entry>
+    <link rel="edit" href="https://example.com/edit/1"/>
+    <link href="https://example.com/entry"/>
+    <published>2024-01-01T00:00:00Z</published>
+    <updated>2024-01-02T00:00:00Z</updated>
+  </entry>
+</feed>
+"""
+
+
+def parse(document: bytes, base_url: str = "https://example.com/sitemap.xml", chunk_size: int = 7,
+          ) -> list[SitemapEntry]:
+    """Разбирает документ частями по chunk_size байт."""
+    sitemap_parser = SitemapParser(base_url)
+    entries = []
+    for start in range(0, len(document), chunk_size):
+        entries.extend(sitemap_parser.feed(document[start:start + chunk_size]))
+    return entries + sitemap_parser.close()
+
+
+def test_parse_urlset() -> None:
+    """Тестирование потокового разбора sitemap с расширениями и записью без адреса."""
+    assert parse(URLSET.encode()) == [
+        SitemapEntry("https://example.com/a", "2024-01-01"),
+        SitemapEntry("https://example.com/b"),
+    ]
+
+
+def test_parse_gzip_sitemap_index() -> None:
+    """Тестирование разбора сжатого индекса sitemap с относительными адресами."""
+    assert parse(gzip.compress(SITEMAP_INDEX.encode()), chunk_size=1) == [
+        SitemapEntry("https://example.com/sitemap-pages.xml", "2024-02-01", is_sitemap=True),
+    ]
+
+
+def test_parse_feeds() -> None:
+    """Тестирование разбора лент RSS и Atom."""
+    assert parse(RSS.encode()) == [SitemapEntry("https://example.com/post", "Mon, 01 Jan 2024 00:00:00 GMT")]
+    assert parse(ATOM.encode()) == [SitemapEntry("https://example.com/entry", "2024-01-02T00:00:00Z")]
+
+
+@pytest.mark.parametrize("document", [
+    b"<!DOCTYPE html><html><body><p>not a sitemap</p></body></html>",
+    b"<html><body></body></html>",
+    b"<urlset><url>",
+    b"",
+    b"\x1f\x8bnot gzip",
+])
+def test_parse_invalid_documents(document: bytes) -> None:
+    """Тестирование отказа от документов, не являющихся sitemap или лентой."""
+    with pytest.raises(SitemapError):
+        parse(document)
+
+
+def test_parse_limits_decompressed_size() -> None:
+    """Тестирование прерывания разбора документа больше ограничения после распаковки."""
+    document = gzip.compress(b"<urlset>" + b" " * 1_000_000 + b"</urlset>")
+    sitemap_parser = SitemapParser("https://example.com/sitemap.xml.gz", max_bytes=100_000)
+    with pytest.raises(SitemapError):
+        sitemap_parser.feed(document)
+    assert sitemap_parser.size < 200_000  # noqa: PLR2004
+
+
+def page(title: str) -> str:
+    """HTML страницы с заголовком."""
+    return f"<html><head><title>{title}</title></head><body><p>Content of {title}</p></body></html>"
+
+
+@pytest.mark.asyncio
+async def test_sitemap_discovery_crawl(tmp_path: Path) -> None:
+    """Тестирование обхода по sitemap из robots.txt с пропуском страниц, не изменившихся по lastmod."""
+    requests: list[str] = []
+    lastmods = {"a": "2024-01-01", "b": "2024-01-01"}
+
+    async def handle(request: web.Request) -> web.Response:
+        requests.append(request.path)
+        base_url = f"{request.scheme}://{request.host}"
+        if request.path == "/robots.txt":
+            return web.Response(text=f"User-agent: *\nAllow: /\nSitemap: {base_url}/sitemap-index.xml.gz\n")
+        if request.path == "/sitemap-index.xml.gz":
+            index = f"<sitemapindex><sitemap><loc>{base_url}/pages.xml</loc></sitemap></sitemapindex>"
+            return web.Response(body=gzip.compress(index.encode()), content_type="application/gzip")
+        if request.path == "/pages.xml":
+            urls = "".join(f"<url><loc>{base_url}/{name}</loc><lastmod>{lastmod}</lastmod></url>"
+                           for name, lastmod in lastmods.items())
+            urls += f"<url><loc>https://other.example/{len(urls)}</loc></url>"
+            return web.Response(text=f"<urlset>{urls}</urlset>", content_type="application/xml")
+        if request.path in {"/a", "/b"}:
+            return web.Response(text=page(f"Page {request.path[1:].upper()}"), content_type="text/html")
+        return web.Response(text=page("Home"), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handle)
+    async with TestServer(app) as server:
+        job = CrawlJob(start_urls=(str(server.make_url("/")),), output_directory=tmp_path,
+                       allowed_domains=(server.host,), excluded_domains=(),
+                       settings=CrawlSettings(conversion_workers=0, requests_per_second=0, discovery="sitemap"))
+        await run_job(job)
+
+        assert (tmp_path / "Page A.md").exists()
+        assert (tmp_path / "Page B.md").exists()
+        manifest = Manifest(tmp_path)
+        assert {entry.lastmod for entry in manifest.entries.values()} == {"2024-01-01"}
+
+        requests.clear()
+        lastmods["b"] = "2024-03-01"
+        await run_job(job)
+
+    assert "/b" in requests
+    assert "/a" not in requests
+    assert Manifest(tmp_path).get(next(key for key in manifest.entries if key.endswith("/b"))).lastmod == "2024-03-01"
@@ -0,0 +1,42 @@
+"""Тесты strip_rules.py."""
+from bs4 import BeautifulSoup
+
+from parser.strip_rules import StripRules
+
+HTML_CONTENT = """
+<html>
+    <body>
+        <nav><a href="/">Menu</a></nav>
+        <div class="fs-2 me-2 nav-link">Full class string</div>
+        <div class="me-2 fs-2">Same classes in another order</div>
+        <p class="content btn">Button token</p>
+        <div id="cookie-banner"><p>Cookies</p></div>
+        <section class="sidebar"><ul><li>Sidebar item</li></ul></section>
+        <p>Main content</p>
+        <script>var a = 1;</script>
+    </body>
+</html>
+"""
+
+
+def test_strip_rules() -> None:
+    """Тестирование удаления элементов по тегам, классам и селекторам за один обход."""
+    strip_rules = StripRules.compile(css_classes=("fs-2 me-2 nav-link", "btn"),
+                                     tags_names=("nav", "script"),
+                                     css_selectors=("#cookie-banner", "section.sidebar > ul"))
+    page_soup = BeautifulSoup(HTML_CONTENT, "html.parser")
+
+    strip_rules.strip(page_soup)
+    text = page_soup.get_text()
+
+    assert "Main content" in text
+    assert "Same classes in another order" in text
+    for removed_text in ("Menu", "Full class string", "Button token", "Cookies", "Sidebar item", "var a"):
+        assert removed_text not in text
+
+
+def test_strip_rules_fingerprint() -> None:
+    """Тестирование независимости отпечатка правил от порядка настроек."""
+    assert (StripRules.compile(css_classes=("a", "b"), tags_names=("nav", "img")).fingerprint
+            == StripRules.compile(css_classes=("b", "a"), tags_names=("img", "nav")).fingerprint)
+    assert StripRules.compile(tags_names=("nav",)).fingerprint != StripRules.compile().fingerprint
@@ -1,14 +1,26 @@
 """Общие утилиты приложения."""
 import re
+import time
+import codecs
 
 from pathlib import Path
+from datetime import UTC, datetime
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, parse_qsl, urlencode, urlunsplit
+from collections.abc import Callable, Awaitable
 
 import aiohttp
 
-from aiohttp.web_exceptions import HTTPOk
+from bs4.dammit import UnicodeDammit
+from aiohttp.web_exceptions import HTTPOk, HTTPNotModified, HTTPInternalServerError
 
 from logger_config import log
-from app_exceptions import IndexFileNotExistsError
+from app_exceptions import RetryableFetchError, IndexFileNotExistsError
+from utils.manifest import Manifest
+from utils.http_cache import HttpCache
+from utils.index_builder import IndexBuilder
+from utils.markdown_writer import write_text_atomic
 
 
 def sanitize_filename(text: str) -> str:
@@ -16,32 +28,230 @@ def sanitize_filename(text: str) -> str:
     return re.sub(r'[<>:"/\\|?*]', "_", text)
 
 
-async def fetch_html(session: aiohttp.ClientSession, url: str) -> str | None:
-    """Получение HTML-контент страницы по URL."""
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+DEFAULT_MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+def normalize_url(url: str) -> str:
+    """Приводит url к каноническому виду для дедупликации.
+
+    Схема и хост приводятся к нижнему регистру, убираются порт по умолчанию, фрагмент и завершающий слэш пути,
+    параметры запроса сортируются.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    netloc = f"[{host}]" if ":" in host else host
+    try:
+        port = parts.port
+    except ValueError:  # некорректный порт оставляем как есть
+        port = None
+        netloc = parts.netloc.rpartition("@")[2].lower()
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+    if parts.username:
+        userinfo = f"{parts.username}:{parts.password}" if parts.password else parts.username
+        netloc = f"{userinfo}@{netloc}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+TOO_MANY_REQUESTS = 429
+
+# временные ошибки сети, после которых запрос можно повторить: подключение, разрыв соединения сервером, таймауты
+TRANSIENT_ERRORS = (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError, TimeoutError)
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(slots=True)
+class FetchStats:
+    """Статистика загрузки страниц."""
+
+    pages_fetched: int = 0  # страницы, полученные с сервера
+    bytes_downloaded: int = 0  # байты тел полученных ответов
+    cache_hits: int = 0  # страницы, взятые из кэша без запроса или по ответу 304
+    skipped_content_type: int = 0  # ответы с содержимым не HTML
+    aborted_too_large: int = 0  # ответы, превысившие ограничение размера
+    retries: int = 0  # повторные запросы после временных ошибок
+    robots_disallowed: int = 0  # страницы, запрещённые robots.txt
+
+
+def is_known_encoding(charset: str) -> bool:
+    """Проверяет, поддерживается ли кодировка."""
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        return False
+    return True
+
+
+def decode_html(body: bytes, charset: str | None) -> str:
+    """Декодирует тело HTML ответа по кодировке из заголовков или определённой по содержимому."""
+    if charset and is_known_encoding(charset):
+        return body.decode(charset, errors="replace")
     try:
-        async with session.get(url) as response:
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        return UnicodeDammit(body, is_html=True).unicode_markup or ""
+
+
+async def read_html_body(response: aiohttp.ClientResponse,
+                         url: str,
+                         max_body_bytes: int,
+                         stats: FetchStats | None = None,
+                         ) -> str | None:
+    """Потоково читает тело HTML ответа не больше max_body_bytes байт.
+
+    Ответы с содержимым не HTML и ответы больше ограничения прерываются без чтения остатка тела.
+    """
+    content_type = response.headers.get("Content-Type", "")
+    if content_type and content_type.split(";")[0].strip().lower() not in HTML_CONTENT_TYPES:
+        log.warning("Страница {url} не является HTML ({content_type}). Переход к следующей странице.",
+                    url=url, content_type=content_type)
+        if stats is not None:
+            stats.skipped_content_type += 1
+        return None
+
+    content_length = response.headers.get("Content-Length", "")
+    too_large = content_length.isdigit() and int(content_length) > max_body_bytes
+    chunks = []
+    body_size = 0
+    if not too_large:
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            body_size += len(chunk)
+            if body_size > max_body_bytes:
+                too_large = True
+                break
+            chunks.append(chunk)
+    if stats is not None:
+        stats.bytes_downloaded += body_size
+    if too_large:
+        log.warning("Страница {url} больше {max_body_bytes} байт. Переход к следующей странице.",
+                    url=url, max_body_bytes=max_body_bytes)
+        if stats is not None:
+            stats.aborted_too_large += 1
+        return None
+
+    if stats is not None:
+        stats.pages_fetched += 1
+    return decode_html(b"".join(chunks), response.charset)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Задержка в секундах из заголовка Retry-After, заданного числом секунд или HTTP-датой."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        return None
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+def transient_error_reason(error: BaseException) -> str:
+    """Описание временной ошибки сети из TRANSIENT_ERRORS для лога и RetryableFetchError."""
+    if isinstance(error, aiohttp.ClientConnectorError):
+        return "ошибка подключения"
+    if isinstance(error, aiohttp.ServerDisconnectedError):
+        return "сервер разорвал соединение"
+    return "превышено время ожидания"
+
+
+def is_retryable_status(status: int) -> bool:
+    """Проверяет, является ли статус ответа временной ошибкой, после которой запрос можно повторить."""
+    return status == TOO_MANY_REQUESTS or status >= HTTPInternalServerError.status_code
+
+
+async def fetch_html(session: aiohttp.ClientSession,
+                     url: str,
+                     cache: HttpCache | None = None,
+                     stats: FetchStats | None = None,
+                     max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+                     client_timeout: aiohttp.ClientTimeout | None = None,
+                     throttle: Callable[[str], Awaitable[None]] | None = None,
+                     raise_retryable: bool = False,
+                     observe: Callable[[str, float], None] | None = None,
+                     ) -> str | None:
+    """Получение HTML-контент страницы по URL.
+
+    При переданном cache свежий ответ берётся из кэша без запроса, устаревший проверяется условным запросом.
+    Тело ответа читается потоково и не больше max_body_bytes байт, client_timeout задаёт таймауты запроса.
+    Перед обращением к серверу ожидается throttle(url). При raise_retryable ответы 429 и 5xx и временные
+    ошибки сети (TRANSIENT_ERRORS) выбрасываются как RetryableFetchError, чтобы вызывающий код мог повторить запрос.
+    observe(stage, seconds) получает время чтения тела ответа как этап "download".
+    """
+    cached_response = cache.get(url) if cache is not None else None
+    if cached_response is not None and cached_response.is_fresh(cache.ttl):
+        if stats is not None:
+            stats.cache_hits += 1
+        return cached_response.body
+    headers = cached_response.conditional_headers() if cached_response is not None else None
+    if throttle is not None:
+        await throttle(url)
+    try:
+        async with session.get(url, headers=headers, timeout=client_timeout) as response:
+            if response.status == HTTPNotModified.status_code and cached_response is not None:
+                cache.touch(url)
+                if stats is not None:
+                    stats.cache_hits += 1
+                return cached_response.body
+            if raise_retryable and is_retryable_status(response.status):
+                raise RetryableFetchError(url, f"статус {response.status}", status=response.status,
+                                          retry_after=parse_retry_after(response.headers.get("Retry-After")))
             if response.status != HTTPOk.status_code:
-                log.warning(f"Страница {url} вернула статус {response.status}. Переход к следующей странице.")
+                log.warning("Страница {url} вернула статус {status}. Переход к следующей странице.",
+                            url=url, status=response.status)
                 return None
-            return await response.text()
-    except aiohttp.ClientConnectorError:
-        log.error("Не удалось подключиться к {url}. Переход к следующей странице.", url=url)
+            download_started = time.perf_counter()
+            html = await read_html_body(response, url, max_body_bytes, stats)
+            if observe is not None:
+                observe("download", time.perf_counter() - download_started)
+            if html is not None and cache is not None:
+                cache.put(url, html, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return html
+    except TRANSIENT_ERRORS as e:
+        reason = transient_error_reason(e)
+        if raise_retryable:
+            raise RetryableFetchError(url, reason) from e
+        log.error("Не удалось загрузить {url} ({reason}). Переход к следующей странице.", url=url, reason=reason)
 
 
 def save_markdown_file(directory: Path, filename: str, content: str) -> None:
-    """Сохраняет содержимое в markdown файл."""
-    filepath: Path = directory / f"{filename}.md"
-    filepath.write_text(content, encoding="utf-8")
+    """Сохраняет содержимое в markdown файл через временный файл и переименование."""
+    write_text_atomic(directory / f"{filename}.md", content)
 
 
-def create_index_md_file(directory: Path, index_file_name: str = "INDEX.md") -> None:
-    """Создает файл INDEX.md в указанной директории с перечислением всех файлов в формате Obsidian-ссылок."""
+def create_index_md_file(directory: Path,
+                         index_file_name: str = "INDEX.md",
+                         order: str = "crawl",
+                         shard: str = "none",
+                         ) -> None:
+    """Создает файл INDEX.md в указанной директории с перечислением файлов в формате Obsidian-ссылок.
+
+    Если в директории есть манифест, индекс строится по сохранённым страницам (см. IndexBuilder),
+    иначе перечисляются все файлы директории.
+    """
     if not directory.exists() or not directory.is_dir():
         msg = f"Указанный путь не существует или не является директорией: {directory}"
         raise IndexFileNotExistsError(msg)
 
+    if (directory / Manifest.file_name).exists():
+        IndexBuilder(directory, index_file_name=index_file_name, order=order, shard=shard).write(Manifest(directory))
+        return
+
     files = list(directory.iterdir())
-    files = [file for file in files if file.is_file()]
+    # скрытые служебные файлы (например, манифест) в индекс не попадают
+    files = [file for file in files if file.is_file() and not file.name.startswith(".")]
 
     index_content_list = [f"# Files in {directory.name}\n"]
     for i, file in enumerate(files, start=1):
@@ -52,7 +262,11 @@ def create_index_md_file(directory: Path, index_file_name: str = "INDEX.md") ->
     index_content = "".join(index_content_list)
 
     index_file_path = directory / index_file_name
+    if index_file_path.exists() and index_file_path.read_text(encoding="utf-8") == index_content:
+        log.info("Файл {file_name} не изменился.", file_name=index_file_name)
+        return
     with index_file_path.open("w", encoding="utf-8") as index_file:
         index_file.write(index_content)
 
-    log.success(f"Файл {index_file_name} успешно создан в директории {directory}.")
+    log.success("Файл {file_name} успешно создан в директории {directory}.", file_name=index_file_name,
+                directory=directory)
@@ -0,0 +1,202 @@
+"""Контрольные точки обхода для продолжения прерванного задания."""
+import time
+import sqlite3
+
+from typing import TYPE_CHECKING
+from pathlib import Path
+from dataclasses import field, dataclass
+
+from logger_config import log
+from utils.common_utils import normalize_url
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Awaitable
+
+PENDING = "pending"  # запланирована, но ещё не обработана
+DONE = "done"  # обработана
+FAILED = "failed"  # не получена или обработана с ошибкой
+
+
+@dataclass(slots=True)
+class CrawlProgressState:
+    """Сохранённое состояние обхода одной стартовой страницы."""
+
+    seen: set[str] = field(default_factory=set)  # ключи всех запланированных страниц
+    frontier: list[tuple[str, int]] = field(default_factory=list)  # страницы для обработки и их глубина
+    done: int = 0
+    failed: int = 0  # страницы, исчерпавшие попытки
+
+
+class CrawlCheckpoint:
+    """Контрольные точки обхода в SQLite: очередь обхода, обработанные и неудавшиеся страницы.
+
+    Изменения накапливаются в открытой транзакции и фиксируются не чаще раза в interval секунд, поэтому после
+    сбоя повторно обрабатываются только страницы последнего интервала. Состояние каждого обхода хранится
+    по ключу стартовой страницы и выходной директории и удаляется после завершения обхода.
+
+    Обработанная страница может ещё ждать записи файла, поэтому отметки обработанных страниц попадают в базу
+    только при сохранении (save) после before_commit - записи файлов и манифестов, поставленных в очередь
+    до начала сохранения. Так после сбоя обработанными считаются только страницы с записанными файлами.
+    """
+
+    def __init__(self, path: Path, interval: float, max_failures: int) -> None:
+        """Инициализация контрольных точек."""
+        self.path = path
+        self.interval = interval  # минимальный интервал между фиксациями изменений в секундах
+        self.max_failures = max_failures  # количество неудачных попыток, после которого страница не повторяется
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS crawls (crawl TEXT PRIMARY KEY, started_at REAL NOT NULL)",
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "crawl TEXT NOT NULL, key TEXT NOT NULL, link TEXT NOT NULL, depth INTEGER NOT NULL, "
+            "state TEXT NOT NULL, failures INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (crawl, key))",
+        )
+        self._connection.commit()
+        self._committed_at = time.monotonic()
+        # сохранение результатов обработки страниц перед фиксацией отметок; None - результаты уже на диске
+        self.before_commit: Callable[[], Awaitable[None]] | None = None
+        self._done: list[tuple[str, str]] = []  # (обход, ключ) обработанных страниц, ещё не записанных в базу
+        self._saving = False
+
+    def for_crawl(self, start_url: str, directory: Path) -> "CrawlProgress":
+        """Состояние обхода стартовой страницы start_url с сохранением в directory."""
+        return CrawlProgress(self, f"{normalize_url(start_url)} {directory.resolve()}")
+
+    def load(self, crawl: str) -> CrawlProgressState | None:
+        """Загружает состояние обхода; None, если обход не начинался или был завершён."""
+        if self._connection.execute("SELECT 1 FROM crawls WHERE crawl = ?", (crawl,)).fetchone() is None:
+            return None
+        state = CrawlProgressState()
+        for key, link, depth, page_state, failures in self._connection.execute(
+                "SELECT key, link, depth, state, failures FROM pages WHERE crawl = ? ORDER BY depth, rowid",
+                (crawl,)):
+            state.seen.add(key)
+            if page_state == DONE:
+                state.done += 1
+            elif page_state == PENDING or failures < self.max_failures:
+                state.frontier.append((link, depth))
+            else:
+                state.failed += 1
+        return state
+
+    def start(self, crawl: str) -> None:
+        """Отмечает начало обхода."""
+        self._connection.execute("INSERT OR REPLACE INTO crawls (crawl, started_at) VALUES (?, ?)",
+                                 (crawl, time.time()))
+
+    def add_pending(self, crawl: str, key: str, link: str, depth: int) -> None:
+        """Добавляет страницу в очередь обхода."""
+        self._connection.execute(
+            "INSERT OR IGNORE INTO pages (crawl, key, link, depth, state) VALUES (?, ?, ?, ?, ?)",
+            (crawl, key, link, depth, PENDING),
+        )
+
+    def mark_done(self, crawl: str, key: str) -> None:
+        """Отмечает страницу обработанной; отметка записывается в базу при следующем сохранении."""
+        self._done.append((crawl, key))
+
+    def mark_failed(self, crawl: str, key: str) -> None:
+        """Отмечает неудачную попытку обработки страницы."""
+        self._connection.execute("UPDATE pages SET state = ?, failures = failures + 1 WHERE crawl = ? AND key = ?",
+                                 (FAILED, crawl, key))
+
+    def finish(self, crawl: str) -> None:
+        """Удаляет состояние завершённого обхода."""
+        self._done = [(done_crawl, key) for done_crawl, key in self._done if done_crawl != crawl]
+        self._connection.execute("DELETE FROM pages WHERE crawl = ?", (crawl,))
+        self._connection.execute("DELETE FROM crawls WHERE crawl = ?", (crawl,))
+        self.commit()
+
+    def _record_done(self, done: list[tuple[str, str]]) -> None:
+        """Записывает в базу отметки обработанных страниц."""
+        self._connection.executemany("UPDATE pages SET state = ? WHERE crawl = ? AND key = ?",
+                                     [(DONE, crawl, key) for crawl, key in done])
+
+    async def save(self) -> None:
+        """Сохраняет результаты обработанных страниц через before_commit и фиксирует их отметки.
+
+        Отметки страниц, обработанных во время before_commit, остаются до следующего сохранения.
+        """
+        self._saving = True
+        done, self._done = self._done, []
+        try:
+            if self.before_commit is not None:
+                await self.before_commit()
+        except BaseException:
+            self._done = done + self._done
+            raise
+        finally:
+            self._saving = False
+        self._record_done(done)
+        self.commit()
+
+    async def maybe_save(self) -> None:
+        """Сохраняет изменения, если с предыдущей фиксации прошло не меньше interval секунд."""
+        if not self._saving and time.monotonic() - self._committed_at >= self.interval:
+            await self.save()
+
+    def commit(self) -> None:
+        """Фиксирует изменения, кроме отметок обработанных страниц, ожидающих сохранения."""
+        self._connection.commit()
+        self._committed_at = time.monotonic()
+
+    def close(self) -> None:
+        """Фиксирует все изменения и закрывает соединение с базой.
+
+        Вызывается после записи всех файлов и манифестов, поэтому отметки обработанных страниц записываются
+        без before_commit.
+        """
+        self._record_done(self._done)
+        self._done = []
+        self.commit()
+        self._connection.close()
+
+
+class CrawlProgress:
+    """Контрольные точки одного обхода."""
+
+    def __init__(self, checkpoint: CrawlCheckpoint, crawl: str) -> None:
+        """Инициализация по общей базе контрольных точек и ключу обхода."""
+        self.checkpoint = checkpoint
+        self.crawl = crawl
+
+    def load(self) -> CrawlProgressState | None:
+        """Загружает состояние обхода; None, если обход нужно начать сначала."""
+        state = self.checkpoint.load(self.crawl)
+        if state is not None:
+            log.info("Продолжение обхода {crawl}: обработано {done}, в очереди {pending}, пропущено {failed}.",
+                     crawl=self.crawl, done=state.done, pending=len(state.frontier), failed=state.failed)
+        return state
+
+    def start(self) -> None:
+        """Отмечает начало обхода."""
+        self.checkpoint.start(self.crawl)
+
+    def add_pending(self, key: str, link: str, depth: int) -> None:
+        """Добавляет страницу в очередь обхода."""
+        self.checkpoint.add_pending(self.crawl, key, link, depth)
+
+    def mark_done(self, key: str) -> None:
+        """Отмечает страницу обработанной."""
+        self.checkpoint.mark_done(self.crawl, key)
+
+    def mark_failed(self, key: str) -> None:
+        """Отмечает неудачную попытку обработки страницы."""
+        self.checkpoint.mark_failed(self.crawl, key)
+
+    def commit(self) -> None:
+        """Фиксирует изменения."""
+        self.checkpoint.commit()
+
+    async def maybe_save(self) -> None:
+        """Сохраняет изменения, если подошло время очередной контрольной точки."""
+        await self.checkpoint.maybe_save()
+
+    def finish(self) -> None:
+        """Удаляет состояние завершённого обхода."""
+        self.checkpoint.finish(self.crawl)
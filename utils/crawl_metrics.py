@@ -0,0 +1,231 @@
+"""Метрики обхода: время этапов обработки страниц, скорость загрузки и их публикация."""
+import json
+import time
+import bisect
+
+from types import SimpleNamespace
+from pathlib import Path
+from contextlib import contextmanager
+from collections import deque
+from dataclasses import field, asdict, dataclass
+from collections.abc import Iterator
+
+import aiohttp
+
+from aiohttp import web
+
+from logger_config import log
+from utils.common_utils import FetchStats
+
+STAGES = (
+    "dns",  # разрешение имени хоста
+    "connect",  # установка соединения, включая DNS и TLS
+    "ttfb",  # от отправки запроса до получения заголовков ответа
+    "download",  # чтение тела ответа
+    "fingerprint",  # SimHash markdown страницы для поиска почти одинаковых страниц
+    "parse",  # построение дерева BeautifulSoup
+    "strip",  # удаление элементов по правилам
+    "convert",  # конвертация дерева в markdown
+    "write",  # запись файла
+)
+
+RECENT_PAGES = 20  # количество последних обработанных страниц для отображения прогресса
+
+# верхние границы интервалов гистограммы в секундах
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass(slots=True)
+class Histogram:
+    """Гистограмма длительностей с фиксированными границами интервалов."""
+
+    bounds: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)  # количество значений в каждом интервале и выше последнего
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def __post_init__(self) -> None:
+        """Создаёт счётчики интервалов."""
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        """Добавляет значение."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля по верхней границе интервала, в который он попадает."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds, self.counts, strict=False):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        """Сводка гистограммы."""
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 6),
+        }
+
+
+class CrawlMetrics:
+    """Метрики задания: гистограммы времени этапов и скорость обработки страниц и загрузки байт."""
+
+    def __init__(self, stats: FetchStats | None = None, log_every_pages: int = 0) -> None:
+        """Инициализация метрик; байты и страницы загрузки берутся из статистики stats.
+
+        log_every_pages - через сколько обработанных страниц писать в лог строку с прогрессом; 0 - не писать.
+        """
+        self.stats = stats or FetchStats()
+        self.stages: dict[str, Histogram] = {stage: Histogram() for stage in STAGES}
+        self.pages_processed = 0
+        self.near_duplicates = 0  # страницы, пропущенные как почти одинаковые с уже сохранёнными
+        self.recent_pages: deque[str] = deque(maxlen=RECENT_PAGES)  # url последних обработанных страниц
+        self.log_every_pages = log_every_pages
+        self.started_at = time.monotonic()
+
+    def page_processed(self, url: str = "") -> None:
+        """Учитывает обработанную страницу и раз в log_every_pages страниц пишет в лог прогресс задания."""
+        self.pages_processed += 1
+        if url:
+            self.recent_pages.append(url)
+        if self.log_every_pages and self.pages_processed % self.log_every_pages == 0:
+            log.info("Обработано страниц: {pages}, {pages_per_second:.1f} стр/с, {megabytes:.1f} МБ загружено.",
+                     pages=self.pages_processed, pages_per_second=self.pages_per_second,
+                     megabytes=self.stats.bytes_downloaded / 2**20)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Добавляет длительность этапа."""
+        self.stages.setdefault(stage, Histogram()).observe(seconds)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Измеряет длительность блока как этап stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    @property
+    def elapsed(self) -> float:
+        """Время с начала задания в секундах."""
+        return time.monotonic() - self.started_at
+
+    @property
+    def pages_per_second(self) -> float:
+        """Обработанные страницы в секунду."""
+        return self.pages_processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Загруженные байты в секунду."""
+        return self.stats.bytes_downloaded / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> dict:
+        """Сводка метрик задания."""
+        return {
+            "elapsed_seconds": round(self.elapsed, 3),
+            "pages_processed": self.pages_processed,
+            "near_duplicates": self.near_duplicates,
+            "pages_per_second": round(self.pages_per_second, 3),
+            "bytes_per_second": round(self.bytes_per_second, 1),
+            "fetch": asdict(self.stats),
+            "stages": {stage: histogram.summary() for stage, histogram in self.stages.items() if histogram.count},
+        }
+
+    def write_summary(self, path: Path) -> None:
+        """Записывает сводку метрик в JSON файл."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def to_prometheus(self) -> str:
+        """Метрики в текстовом формате Prometheus."""
+        lines = [
+            "# TYPE crawl_pages_processed_total counter",
+            f"crawl_pages_processed_total {self.pages_processed}",
+            "# TYPE crawl_near_duplicates_total counter",
+            f"crawl_near_duplicates_total {self.near_duplicates}",
+            "# TYPE crawl_pages_fetched_total counter",
+            f"crawl_pages_fetched_total {self.stats.pages_fetched}",
+            "# TYPE crawl_bytes_downloaded_total counter",
+            f"crawl_bytes_downloaded_total {self.stats.bytes_downloaded}",
+            "# TYPE crawl_pages_per_second gauge",
+            f"crawl_pages_per_second {self.pages_per_second:.3f}",
+            "# TYPE crawl_bytes_per_second gauge",
+            f"crawl_bytes_per_second {self.bytes_per_second:.1f}",
+            "# TYPE crawl_stage_seconds histogram",
+        ]
+        for stage, histogram in self.stages.items():
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.bounds, histogram.counts, strict=False):
+                cumulative += bucket_count
+                lines.append(f'crawl_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.extend([
+                f'crawl_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}',
+                f'crawl_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}',
+                f'crawl_stage_seconds_count{{stage="{stage}"}} {histogram.count}',
+            ])
+        return "\n".join(lines) + "\n"
+
+
+def create_trace_config(metrics: CrawlMetrics) -> aiohttp.TraceConfig:
+    """Трассировка запросов aiohttp, записывающая время DNS, соединения и получения заголовков ответа."""
+    clock = time.perf_counter
+
+    async def on_request_start(_: aiohttp.ClientSession, context: SimpleNamespace, __: object) -> None:
+        context.request_start = clock()
+
+    async def on_dns_resolvehost_start(_: aiohttp.ClientSession, context: SimpleNamespace, __: object) -> None:
+        context.dns_start = clock()
+
+    async def on_dns_resolvehost_end(_: aiohttp.ClientSession, context: SimpleNamespace, __: object) -> None:
+        metrics.observe("dns", clock() - context.dns_start)
+
+    async def on_connection_create_start(_: aiohttp.ClientSession, context: SimpleNamespace, __: object) -> None:
+        context.connect_start = clock()
+
+    async def on_connection_create_end(_: aiohttp.ClientSession, context: SimpleNamespace, __: object) -> None:
+        metrics.observe("connect", clock() - context.connect_start)
+
+    async def on_request_end(_: aiohttp.ClientSession, context: SimpleNamespace, __: object) -> None:
+        metrics.observe("ttfb", clock() - context.request_start)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+async def start_metrics_server(metrics: CrawlMetrics, host: str, port: int) -> web.AppRunner:
+    """Запускает HTTP-сервер с метриками в формате Prometheus по адресу /metrics."""
+    async def handle_metrics(_: web.Request) -> web.Response:
+        return web.Response(text=metrics.to_prometheus(), content_type="text/plain", charset="utf-8",
+                            headers={"Cache-Control": "no-store"})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    log.info("Метрики доступны по адресу http://{host}:{port}/metrics", host=host, port=port)
+    return runner
+
@@ -0,0 +1,188 @@
+"""Планировщик запросов: ограничение частоты по хостам, robots.txt и повтор временных ошибок."""
+import time
+import random
+import asyncio
+
+from typing import TypeVar
+from urllib.parse import urlsplit
+from collections.abc import Callable, Awaitable
+
+import aiohttp
+
+from aiohttp.web_exceptions import HTTPServiceUnavailable
+
+from logger_config import log
+from app_exceptions import RetryableFetchError
+from utils.common_utils import TOO_MANY_REQUESTS, FetchStats
+from utils.robots_cache import RobotsCache
+
+FetchResult = TypeVar("FetchResult")
+FetchFunction = Callable[..., Awaitable[str | None]]
+
+MIN_REQUESTS_PER_SECOND = 0.1  # нижняя граница скорости хоста при снижении после ответов 429 и 503
+# доля исходной скорости хоста, на которую сниженная скорость повышается после каждого успешного ответа
+RATE_RECOVERY_STEP = 0.05
+# ответы, после которых скорость запросов к хосту снижается: сервер сообщает о перегрузке
+SLOW_DOWN_STATUSES = (TOO_MANY_REQUESTS, HTTPServiceUnavailable.status_code)
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов к одному хосту.
+
+    Корзина вмещает capacity токенов и пополняется со скоростью rate токенов в секунду, каждый запрос
+    забирает один токен. Ожидающие запросы обслуживаются по очереди. Скорость снижается вдвое при перегрузке
+    сервера и линейно восстанавливается до исходной после успешных ответов.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Инициализация корзины."""
+        self.rate = rate  # токенов в секунду, 0 - без ограничения
+        self.max_rate = rate  # исходная скорость, до которой восстанавливается сниженная
+        self.capacity = max(capacity, 1.0)
+        self.max_capacity = self.capacity
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, delay: float) -> None:
+        """Приостанавливает выдачу токенов на delay секунд, после паузы корзина наполняется заново."""
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._tokens = 0.0
+        self._updated = max(self._updated, self._paused_until)
+
+    def slow_down(self) -> None:
+        """Вдвое снижает скорость выдачи токенов, но не ниже MIN_REQUESTS_PER_SECOND."""
+        if self.rate > 0:
+            self.rate = max(min(MIN_REQUESTS_PER_SECOND, self.rate), self.rate / 2)
+            self.capacity = 1.0
+
+    def speed_up(self) -> None:
+        """Повышает сниженную скорость на RATE_RECOVERY_STEP исходной, но не выше исходной."""
+        if 0 < self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY_STEP)
+            if self.rate == self.max_rate:
+                self.capacity = self.max_capacity
+
+    async def acquire(self) -> None:
+        """Ожидает и забирает токен."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self._tokens = min(self.capacity, self._tokens + max(0.0, now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CrawlScheduler:
+    """Загрузка страниц с максимальной частотой, которую выдерживает сайт, без потери страниц.
+
+    Запросы к каждому хосту проходят через TokenBucket, скорость которого снижается до Crawl-delay
+    из robots.txt, вдвое после каждого ответа 429 и 503 и постепенно восстанавливается после успешных ответов.
+    Ответы 429 и 5xx, ошибки подключения, разрывы соединения и таймауты повторяются с экспоненциальной задержкой
+    со случайным разбросом или с задержкой из Retry-After, на время которой приостанавливается весь хост.
+    """
+
+    def __init__(self,
+                 fetch: FetchFunction,
+                 requests_per_second: float,
+                 burst: int,
+                 max_retries: int,
+                 backoff_base: float,
+                 backoff_max: float,
+                 robots: RobotsCache | None = None,
+                 stats: FetchStats | None = None,
+                 ) -> None:
+        """Инициализация планировщика.
+
+        fetch вызывается как fetch(session, url, throttle=..., raise_retryable=True), см. fetch_html.
+        """
+        self.fetch = fetch
+        self.requests_per_second = requests_per_second  # на один хост, 0 - без ограничения
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.robots = robots  # None - robots.txt не учитывается
+        self.stats = stats
+        self._buckets: dict[str, TokenBucket] = {}
+
+    async def host_bucket(self, session: aiohttp.ClientSession, url: str) -> TokenBucket:
+        """Корзина хоста url, создаваемая при первом обращении с учётом Crawl-delay."""
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, capacity = self.requests_per_second, self.burst
+            crawl_delay = await self.robots.crawl_delay(session, url) if self.robots is not None else None
+            if crawl_delay:
+                rate = min(rate, 1 / crawl_delay) if rate > 0 else 1 / crawl_delay
+                capacity = 1
+                log.info("Хост {host} просит не чаще одного запроса в {delay} с.", host=host, delay=crawl_delay)
+            # за время ожидания robots.txt корзину мог создать другой запрос
+            bucket = self._buckets.setdefault(host, TokenBucket(rate, capacity))
+        return bucket
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Задержка перед повтором номер attempt (с нуля): экспонента со случайным разбросом в её половину."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return random.uniform(delay / 2, delay)  # noqa: S311
+
+    async def fetch_html(self, session: aiohttp.ClientSession, url: str) -> str | None:
+        """Загружает страницу с соблюдением robots.txt и ограничений частоты, повторяя временные ошибки."""
+        return await self.fetch_with(self.fetch, session, url)
+
+    async def fetch_with(self,
+                         fetch: Callable[..., Awaitable[FetchResult | None]],
+                         session: aiohttp.ClientSession,
+                         url: str,
+                         ) -> FetchResult | None:
+        """Загружает url функцией fetch с соблюдением robots.txt и ограничений частоты, повторяя временные ошибки.
+
+        fetch вызывается так же, как функция загрузки страниц планировщика, и может возвращать не только HTML,
+        например записи sitemap.
+        """
+        if self.robots is not None and not await self.robots.can_fetch(session, url):
+            log.info("Страница {url} запрещена robots.txt. Переход к следующей странице.", url=url)
+            if self.stats is not None:
+                self.stats.robots_disallowed += 1
+            return None
+        bucket = await self.host_bucket(session, url)
+        requested = False  # был ли запрос к серверу, а не ответ из кэша
+
+        async def throttle(_: str) -> None:
+            nonlocal requested
+            await bucket.acquire()
+            requested = True
+
+        for attempt in range(self.max_retries + 1):
+            requested = False
+            try:
+                result = await fetch(session, url, throttle=throttle, raise_retryable=True)
+            except RetryableFetchError as e:
+                if attempt == self.max_retries:
+                    log.error("Страница {url} недоступна после {count} попыток ({reason}). "
+                              "Переход к следующей странице.", url=url, count=attempt + 1, reason=e.reason)
+                    return None
+                if e.status in SLOW_DOWN_STATUSES:
+                    bucket.slow_down()
+                if e.retry_after is not None:
+                    # Retry-After относится ко всему хосту, поэтому приостанавливаются все запросы к нему
+                    bucket.pause(min(e.retry_after, self.backoff_max))
+                else:
+                    await asyncio.sleep(self.backoff_delay(attempt))
+                if self.stats is not None:
+                    self.stats.retries += 1
+                log.warning("Повтор запроса {url} ({reason}), попытка {attempt}.", url=url, reason=e.reason,
+                            attempt=attempt + 2)
+            else:
+                if requested:
+                    bucket.speed_up()
+                return result
@@ -0,0 +1,170 @@
+"""Компактное состояние обхода: очередь ссылок и множество запланированных страниц.
+
+На обходах в сотни тысяч страниц основную память занимают полные url в очереди и в множестве запланированных
+страниц. Хосты ссылок очереди хранятся один раз в таблице, запланированные страницы - 64-битными хэшами
+или фильтром Блума фиксированного размера с точной проверкой по базе на диске.
+"""
+import os
+import math
+import hashlib
+import sqlite3
+import tempfile
+
+from pathlib import Path
+
+DEFAULT_SEEN_CAPACITY = 1_000_000  # количество страниц, на которое рассчитан размер фильтра Блума
+DEFAULT_SEEN_ERROR_RATE = 0.01  # доля проверок по базе на диске для новых страниц при заполнении до capacity
+
+
+def url_digest(key: str) -> bytes:
+    """128-битный хэш ключа страницы."""
+    return hashlib.blake2b(key.encode("utf-8", errors="surrogatepass"), digest_size=16).digest()
+
+
+class HostTable:
+    """Таблица начал url (схема и хост): каждое хранится один раз, ссылки очереди хранят его номер."""
+
+    __slots__ = ("_ids", "_origins")
+
+    def __init__(self) -> None:
+        """Инициализация пустой таблицы."""
+        self._ids: dict[str, int] = {}
+        self._origins: list[str] = []
+
+    def __len__(self) -> int:
+        """Количество различных начал url."""
+        return len(self._origins)
+
+    def link(self, url: str, depth: int) -> "FrontierLink":
+        """Запись очереди для url на глубине depth."""
+        path_start = url.find("/", url.find("//") + 2)
+        if path_start == -1:
+            path_start = len(url)
+        origin = url[:path_start]
+        origin_id = self._ids.get(origin)
+        if origin_id is None:
+            origin_id = self._ids[origin] = len(self._origins)
+            self._origins.append(origin)
+        return FrontierLink(origin_id, url[path_start:], depth)
+
+    def url(self, link: "FrontierLink") -> str:
+        """Исходный url записи очереди."""
+        return self._origins[link.origin_id] + link.path
+
+
+class FrontierLink:
+    """Ссылка в очереди обхода: номер начала url в HostTable, остаток url и глубина."""
+
+    __slots__ = ("depth", "origin_id", "path")
+
+    def __init__(self, origin_id: int, path: str, depth: int) -> None:
+        """Инициализация записи."""
+        self.origin_id = origin_id
+        self.path = path
+        self.depth = depth
+
+
+class SeenUrls:
+    """Множество ключей запланированных страниц в виде 64-битных хэшей.
+
+    Хэш занимает в несколько раз меньше памяти, чем ключ; вероятность совпадения хэшей разных страниц
+    на миллионах страниц пренебрежимо мала.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация пустого множества."""
+        self._hashes: set[int] = set()
+
+    def __len__(self) -> int:
+        """Количество страниц."""
+        return len(self._hashes)
+
+    def __contains__(self, key: str) -> bool:
+        """Запланирована ли страница."""
+        return int.from_bytes(url_digest(key)[:8]) in self._hashes
+
+    def add(self, key: str) -> bool:
+        """Добавляет страницу; False, если она уже была запланирована."""
+        key_hash = int.from_bytes(url_digest(key)[:8])
+        if key_hash in self._hashes:
+            return False
+        self._hashes.add(key_hash)
+        return True
+
+    def close(self) -> None:
+        """Освобождает память множества."""
+        self._hashes.clear()
+
+
+class BloomSeenUrls:
+    """Множество ключей запланированных страниц с памятью, не зависящей от размера обхода.
+
+    В памяти хранится фильтр Блума, рассчитанный на capacity страниц, а хэши страниц записываются во временную
+    базу SQLite в directory. База проверяется только при положительном ответе фильтра, то есть для уже
+    запланированных страниц и для доли error_rate новых. После превышения capacity доля проверок по базе растёт,
+    но ответы остаются точными. База удаляется при закрытии.
+    """
+
+    def __init__(self,
+                 directory: Path,
+                 capacity: int = DEFAULT_SEEN_CAPACITY,
+                 error_rate: float = DEFAULT_SEEN_ERROR_RATE,
+                 ) -> None:
+        """Инициализация фильтра и временной базы."""
+        self._bit_count = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hash_count = max(1, round(self._bit_count / capacity * math.log(2)))
+        self._bits = bytearray(-(-self._bit_count // 8))
+        self._count = 0
+        directory.mkdir(parents=True, exist_ok=True)
+        descriptor, path = tempfile.mkstemp(dir=directory, prefix="seen-", suffix=".sqlite")
+        os.close(descriptor)
+        self.path = Path(path)
+        self._connection = sqlite3.connect(self.path)
+        # база временная и после сбоя не нужна, поэтому журнал и сброс на диск не используются
+        self._connection.execute("PRAGMA journal_mode=OFF")
+        self._connection.execute("PRAGMA synchronous=OFF")
+        self._connection.execute("CREATE TABLE seen (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+
+    def __len__(self) -> int:
+        """Количество страниц."""
+        return self._count
+
+    def _positions(self, digest: bytes) -> list[int]:
+        """Номера битов фильтра для хэша страницы (двойное хэширование)."""
+        first, second = int.from_bytes(digest[:8]), int.from_bytes(digest[8:]) | 1
+        return [(first + index * second) % self._bit_count for index in range(self._hash_count)]
+
+    def _stored(self, digest: bytes) -> bool:
+        """Есть ли хэш страницы в базе."""
+        return self._connection.execute("SELECT 1 FROM seen WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def __contains__(self, key: str) -> bool:
+        """Запланирована ли страница."""
+        digest = url_digest(key)
+        if not all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest)):
+            return False
+        return self._stored(digest)
+
+    def add(self, key: str) -> bool:
+        """Добавляет страницу; False, если она уже была запланирована."""
+        digest = url_digest(key)
+        positions = self._positions(digest)
+        if all(self._bits[position >> 3] & (1 << (position & 7)) for position in positions) and self._stored(digest):
+            return False
+        for position in positions:
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._connection.execute("INSERT INTO seen (digest) VALUES (?)", (digest,))
+        self._count += 1
+        return True
+
+    def close(self) -> None:
+        """Закрывает и удаляет временную базу."""
+        self._connection.close()
+        self.path.unlink(missing_ok=True)
+
+
+def create_seen_urls(directory: Path | None = None, capacity: int = DEFAULT_SEEN_CAPACITY) -> SeenUrls | BloomSeenUrls:
+    """Множество запланированных страниц: хэши в памяти или, если задана directory, фильтр Блума с базой на диске."""
+    if directory is None:
+        return SeenUrls()
+    return BloomSeenUrls(directory, capacity)
@@ -0,0 +1,82 @@
+"""Сопоставление url со списками доменов."""
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+from collections.abc import Iterable
+
+# виды правил
+HOST_AND_SUBDOMAINS = "host_and_subdomains"  # example.com - хост и все его поддомены
+SUBDOMAINS = "subdomains"  # *.example.com - только поддомены
+EXACT_HOST = "exact_host"  # =example.com - только сам хост
+
+
+@dataclass(frozen=True, slots=True)
+class DomainRule:
+    """Скомпилированное правило домена."""
+
+    kind: str
+    path_prefix: str | None  # None - любой путь
+
+    def matches_path(self, path: str) -> bool:
+        """Проверяет, попадает ли путь под префикс правила с учётом границы сегмента."""
+        if self.path_prefix is None:
+            return True
+        return path == self.path_prefix or path.startswith(f"{self.path_prefix}/")
+
+
+class DomainMatcher:
+    """Набор правил доменов, скомпилированный в словарь суффиксов хостов.
+
+    Правила записываются как "example.com" (хост и его поддомены), "*.example.com" (только поддомены),
+    "=example.com" (только сам хост), к любому из них можно добавить префикс пути: "example.com/docs".
+    Проверка url выполняется за количество меток в имени хоста независимо от количества правил.
+    """
+
+    def __init__(self, rules: Iterable[str] | None) -> None:
+        """Компилирует правила."""
+        self._rules_by_suffix: dict[str, list[DomainRule]] = {}
+        for raw_rule in rules or ():
+            self._add_rule(raw_rule)
+
+    def _add_rule(self, raw_rule: str) -> None:
+        """Разбирает правило и добавляет его в словарь суффиксов."""
+        rule = raw_rule.strip().lower()
+        if "://" in rule:
+            rule = rule.split("://", 1)[1]
+        kind = HOST_AND_SUBDOMAINS
+        if rule.startswith("="):
+            kind, rule = EXACT_HOST, rule[1:]
+        elif rule.startswith("*."):
+            kind, rule = SUBDOMAINS, rule[2:]
+        host, slash, path = rule.partition("/")
+        host = host.rstrip(".")
+        if not host:
+            return
+        path_prefix = f"/{path.rstrip('/')}" if slash and path.strip("/") else None
+        self._rules_by_suffix.setdefault(host, []).append(DomainRule(kind=kind, path_prefix=path_prefix))
+
+    def __bool__(self) -> bool:
+        """Есть ли в наборе правила."""
+        return bool(self._rules_by_suffix)
+
+    def matches_host(self, host: str, path: str = "/") -> bool:
+        """Проверяет, подходит ли хост с путём под одно из правил."""
+        host = host.lower().rstrip(".")
+        labels = host.split(".")
+        for index in range(len(labels)):
+            rules = self._rules_by_suffix.get(".".join(labels[index:]))
+            if not rules:
+                continue
+            is_subdomain = index > 0
+            for rule in rules:
+                if rule.kind == EXACT_HOST and is_subdomain:
+                    continue
+                if rule.kind == SUBDOMAINS and not is_subdomain:
+                    continue
+                if rule.matches_path(path):
+                    return True
+        return False
+
+    def matches(self, url: str) -> bool:
+        """Проверяет, подходит ли url под одно из правил."""
+        parts = urlsplit(url)
+        return self.matches_host(parts.hostname or "", parts.path or "/")
@@ -0,0 +1,86 @@
+"""Выбор уникальных имён файлов для страниц."""
+from utils.manifest import Manifest, content_hash
+
+DEFAULT_MAX_NAME_BYTES = 200  # с запасом на расширение и временный файл при ограничении в 255 байт
+FALLBACK_NAME = "Unnamed_Page"
+URL_HASH_LENGTH = 8
+
+
+def truncate_name(name: str, max_bytes: int) -> str:
+    """Обрезает имя до max_bytes байт в UTF-8, не разрывая символы, и убирает завершающие пробелы и точки."""
+    encoded = name.encode("utf-8")
+    if len(encoded) > max_bytes:
+        name = encoded[:max_bytes].decode("utf-8", errors="ignore")
+    return name.strip().rstrip(".").rstrip()
+
+
+class FilenameAllocator:
+    """Назначает страницам имена файлов без совпадений в одной выходной директории.
+
+    Имя строится по заголовку страницы. Если его уже занимает другая страница или служебный файл, к имени
+    добавляется короткий хэш url. Имя без хэша получает страница, обработанная первой, поэтому при первом обходе
+    страниц с одинаковыми заголовками оно зависит от порядка их обработки; имя с хэшем от порядка не зависит.
+    Имена сравниваются без учёта регистра, как в файловых системах Windows и macOS. Уже назначенные имена
+    берутся из манифеста, так что страница сохраняет имя файла между запусками.
+    """
+
+    def __init__(self,
+                 manifest: Manifest | None = None,
+                 max_name_bytes: int = DEFAULT_MAX_NAME_BYTES,
+                 reserved_names: tuple[str, ...] = ("INDEX",),
+                 ) -> None:
+        """Инициализация по именам, уже назначенным в манифесте."""
+        self.max_name_bytes = max_name_bytes
+        # зарезервированное имя занимает и имена дочерних файлов с ним в начале, например INDEX-A
+        self.reserved_names = tuple(name.casefold() for name in reserved_names)
+        self._names: dict[str, str] = {}  # url -> имя файла
+        self._owners: dict[str, str] = {}  # имя файла без учёта регистра -> url
+        if manifest is not None:
+            for url, entry in manifest.entries.items():
+                self._assign(url, entry.filename)
+
+    def _is_reserved(self, name: str) -> bool:
+        """Проверяет, совпадает ли имя со служебным файлом."""
+        folded = name.casefold()
+        # ключи дочерних индексов (домены и буквы) не содержат пробелов, в отличие от имён с хэшем url
+        return any(folded == reserved or (folded.startswith(f"{reserved}-") and " " not in folded)
+                   for reserved in self.reserved_names)
+
+    def _is_free(self, name: str, url: str) -> bool:
+        """Проверяет, может ли страница url занять имя."""
+        return not self._is_reserved(name) and self._owners.get(name.casefold(), url) == url
+
+    def _assign(self, url: str, name: str) -> None:
+        """Закрепляет имя за страницей, освобождая её прежнее имя."""
+        previous_name = self._names.get(url)
+        if previous_name is not None and self._owners.get(previous_name.casefold()) == url:
+            del self._owners[previous_name.casefold()]
+        self._names[url] = name
+        self._owners[name.casefold()] = url
+
+    def owner(self, name: str) -> str | None:
+        """Url страницы, которой назначено имя; None, если имя свободно."""
+        return self._owners.get(name.casefold())
+
+    def candidates(self, url: str, title_name: str) -> list[str]:
+        """Имена, которые может получить страница: по заголовку и по заголовку с хэшем url."""
+        name = truncate_name(title_name, self.max_name_bytes) or FALLBACK_NAME
+        url_hash = content_hash(url)
+        names = [name]
+        for hash_length in range(URL_HASH_LENGTH, len(url_hash) + 1, URL_HASH_LENGTH):
+            suffix = f" ({url_hash[:hash_length]})"
+            names.append(f"{truncate_name(name, self.max_name_bytes - len(suffix))}{suffix}")
+        return names
+
+    def allocate(self, url: str, title_name: str) -> str:
+        """Возвращает имя файла для страницы url с очищенным заголовком title_name."""
+        candidates = self.candidates(url, title_name)
+        current_name = self._names.get(url)
+        if current_name in candidates and self._is_free(current_name, url):
+            return current_name
+        for name in candidates:
+            if self._is_free(name, url):
+                self._assign(url, name)
+                return name
+        msg = f"Не удалось подобрать имя файла для {url}"
+        raise RuntimeError(msg)
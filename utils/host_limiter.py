@@ -0,0 +1,36 @@
+"""Ограничение параллельности запросов."""
+import asyncio
+
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+from collections.abc import AsyncIterator
+
+
+class HostLimiter:
+    """Ограничитель количества одновременных запросов: общий и для каждого хоста."""
+
+    def __init__(self, max_concurrency: int, per_host_concurrency: int) -> None:
+        """Инициализация ограничителя."""
+        if max_concurrency < 1 or per_host_concurrency < 1:
+            msg = "Лимиты параллельности должны быть положительными числами."
+            raise ValueError(msg)
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self._global_semaphore = asyncio.Semaphore(max_concurrency)
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Возвращает семафор хоста url, создавая его при первом обращении."""
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_concurrency)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        """Занимает слот хоста, затем общий слот, на время обработки url."""
+        # слот хоста берётся первым, чтобы ожидающие своего хоста задачи не занимали общие слоты
+        async with self._host_semaphore(url), self._global_semaphore:
+            yield
@@ -0,0 +1,140 @@
+"""Дисковый кэш HTTP-ответов."""
+import time
+import zlib
+import sqlite3
+
+from pathlib import Path
+from dataclasses import dataclass
+
+from logger_config import log
+
+DEFAULT_COMMIT_INTERVAL = 5.0  # минимальный интервал между фиксациями изменений кэша в секундах
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """Сохранённый ответ сервера."""
+
+    body: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        """Проверяет, можно ли использовать ответ без обращения к серверу."""
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Заголовки условного запроса для проверки актуальности ответа."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Кэш HTTP-ответов в SQLite с ключом по url.
+
+    Тела ответов хранятся сжатыми. При превышении max_size_bytes удаляются давно не использованные ответы.
+    Кэш работает в event loop, поэтому изменения не фиксируются на каждый запрос: время использования ответов
+    копится в памяти, а изменения фиксируются не чаще раза в commit_interval секунд и при закрытии.
+    После сбоя теряются только изменения последнего интервала.
+    """
+
+    def __init__(self, path: Path, ttl: float, max_size_bytes: int,
+                 commit_interval: float = DEFAULT_COMMIT_INTERVAL) -> None:
+        """Инициализация кэша."""
+        self.path = path
+        self.ttl = ttl  # время в секундах, в течение которого ответ используется без запроса к серверу
+        self.max_size_bytes = max_size_bytes
+        self.commit_interval = commit_interval
+        self._accessed: dict[str, float] = {}  # url -> время использования, ещё не записанное в базу
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT, "
+            "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)",
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._connection.commit()
+        self._size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._committed_at = time.monotonic()
+
+    def get(self, url: str) -> CachedResponse | None:
+        """Возвращает сохранённый ответ для url."""
+        row = self._connection.execute(
+            "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, fetched_at = row
+        self._accessed[url] = time.time()
+        self._maybe_commit()
+        return CachedResponse(body=zlib.decompress(body).decode("utf-8"), etag=etag,
+                              last_modified=last_modified, fetched_at=fetched_at)
+
+    def put(self, url: str, body: str, etag: str | None, last_modified: str | None) -> None:
+        """Сохраняет ответ для url и освобождает место при превышении размера кэша."""
+        compressed_body = zlib.compress(body.encode("utf-8"), level=1)
+        now = time.time()
+        previous = self._connection.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+        self._connection.execute(
+            "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, fetched_at, accessed_at, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, compressed_body, etag, last_modified, now, now, len(compressed_body)),
+        )
+        self._accessed.pop(url, None)
+        self._size += len(compressed_body) - (previous[0] if previous else 0)
+        self._evict()
+        self._maybe_commit()
+
+    def touch(self, url: str) -> None:
+        """Продлевает срок жизни ответа после подтверждения сервером (304 Not Modified)."""
+        now = time.time()
+        self._accessed.pop(url, None)
+        self._connection.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                                 (now, now, url))
+        self._maybe_commit()
+
+    def _record_accessed(self) -> None:
+        """Записывает в базу накопленное время использования ответов."""
+        if self._accessed:
+            self._connection.executemany("UPDATE responses SET accessed_at = ? WHERE url = ?",
+                                         [(accessed_at, url) for url, accessed_at in self._accessed.items()])
+            self._accessed.clear()
+
+    def _maybe_commit(self) -> None:
+        """Фиксирует изменения, если с предыдущей фиксации прошло не меньше commit_interval секунд."""
+        if time.monotonic() - self._committed_at >= self.commit_interval:
+            self.commit()
+
+    def commit(self) -> None:
+        """Записывает время использования ответов и фиксирует изменения."""
+        self._record_accessed()
+        self._connection.commit()
+        self._committed_at = time.monotonic()
+
+    def _evict(self) -> None:
+        """Удаляет давно не использованные ответы, пока размер кэша превышает max_size_bytes."""
+        if self._size <= self.max_size_bytes:
+            return
+        self._record_accessed()
+        rows = self._connection.execute("SELECT url, size FROM responses ORDER BY accessed_at")
+        evicted_urls = []
+        for url, size in rows:
+            if self._size <= self.max_size_bytes:
+                break
+            evicted_urls.append((url,))
+            self._size -= size
+        self._connection.executemany("DELETE FROM responses WHERE url = ?", evicted_urls)
+        log.debug("Из кэша удалено ответов: {count}.", count=len(evicted_urls))
+
+    def close(self) -> None:
+        """Фиксирует изменения и закрывает соединение с базой кэша."""
+        self.commit()
+        self._connection.close()
@@ -0,0 +1,33 @@
+"""Создание HTTP-сессии с настроенным пулом соединений."""
+import aiohttp
+
+from aiohttp.compression_utils import HAS_BROTLI
+
+
+def accept_encoding() -> str:
+    """Значение заголовка Accept-Encoding: br запрашивается, только если aiohttp сможет его распаковать."""
+    return "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+
+def create_client_session(connection_limit: int,
+                          connection_limit_per_host: int,
+                          dns_cache_ttl: int,
+                          keepalive_timeout: float,
+                          user_agent: str | None = None,
+                          trace_configs: list[aiohttp.TraceConfig] | None = None,
+                          ) -> aiohttp.ClientSession:
+    """Создаёт долгоживущую сессию с общим пулом соединений, кэшем DNS и сжатием ответов.
+
+    Сессия рассчитана на переиспользование всеми стартовыми страницами задания, чтобы не устанавливать
+    заново DNS, TCP и TLS соединения для каждой из них.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=connection_limit,
+        limit_per_host=connection_limit_per_host,
+        ttl_dns_cache=dns_cache_ttl,
+        keepalive_timeout=keepalive_timeout,
+    )
+    headers = {"Accept-Encoding": accept_encoding()}
+    if user_agent:
+        headers["User-Agent"] = user_agent
+    return aiohttp.ClientSession(connector=connector, headers=headers, trace_configs=trace_configs)
@@ -0,0 +1,153 @@
+"""Построение INDEX.md по манифесту выходной директории."""
+import json
+
+from pathlib import Path
+from dataclasses import asdict, dataclass
+from urllib.parse import urlsplit
+
+from logger_config import log
+from utils.manifest import Manifest, ManifestEntry, content_hash
+from utils.markdown_writer import write_text_atomic
+
+INDEX_ORDERS = (
+    "crawl",  # в порядке первого обхода страниц
+    "title",  # по заголовку страницы
+)
+
+INDEX_SHARDS = (
+    "none",  # один общий индекс
+    "domain",  # отдельный индекс для каждого домена
+    "alpha",  # отдельный индекс для каждой первой буквы заголовка
+)
+
+
+@dataclass(slots=True)
+class IndexFileState:
+    """Состояние записанного файла индекса для дописывания без перезаписи."""
+
+    length: int  # длина содержимого в символах
+    size: int  # размер файла в байтах для обнаружения изменений файла вне приложения
+    content_hash: str
+
+
+def shard_key(entry: ManifestEntry, shard: str) -> str:
+    """Ключ дочернего индекса, в который попадает страница."""
+    if shard == "domain":
+        return urlsplit(entry.url).hostname or "unknown"
+    if shard == "alpha":
+        first_char = (entry.title or entry.filename)[:1].upper()
+        return first_char if first_char.isalnum() else "_"
+    return ""
+
+
+def index_line(number: int, entry: ManifestEntry) -> str:
+    """Строка индекса со ссылкой Obsidian на файл страницы и заголовком, если он отличается от имени файла."""
+    if entry.title and entry.title != entry.filename:
+        return f"{number}. [[{entry.filename}.md|{entry.title}]]\n"
+    return f"{number}. [[{entry.filename}.md]]\n"
+
+
+def render_index(header: str, entries: list[ManifestEntry]) -> str:
+    """Содержимое файла индекса."""
+    return "".join([f"# {header}\n", *(index_line(number, entry) for number, entry in enumerate(entries, start=1))])
+
+
+class IndexBuilder:
+    """Индекс сохранённых страниц, построенный по манифесту без сканирования директории.
+
+    Страницы упорядочиваются по порядку обхода или по заголовку и могут делиться на дочерние индексы
+    по доменам или первой букве заголовка, на которые ссылается корневой индекс. Файл индекса, содержимое
+    которого только дополнилось новыми строками, дописывается, изменённый - перезаписывается целиком,
+    неизменённый не трогается. Состояние записанных файлов хранится в скрытом файле рядом с индексом.
+    """
+
+    state_file_name = ".index.json"
+
+    def __init__(self, directory: Path, index_file_name: str = "INDEX.md", order: str = "crawl",
+                 shard: str = "none") -> None:
+        """Инициализация индекса."""
+        if order not in INDEX_ORDERS:
+            msg = f"Неизвестный порядок индекса: {order}"
+            raise ValueError(msg)
+        if shard not in INDEX_SHARDS:
+            msg = f"Неизвестное разделение индекса: {shard}"
+            raise ValueError(msg)
+        self.directory = directory
+        self.index_file_name = index_file_name
+        self.order = order
+        self.shard = shard
+        self.state_path = directory / self.state_file_name
+
+    def shard_file_name(self, key: str) -> str:
+        """Имя файла дочернего индекса."""
+        index_path = Path(self.index_file_name)
+        return f"{index_path.stem}-{key}{index_path.suffix}"
+
+    def sorted_entries(self, manifest: Manifest) -> list[ManifestEntry]:
+        """Записи манифеста в порядке индекса."""
+        entries = list(manifest.entries.values())
+        if self.order == "title":
+            entries.sort(key=lambda entry: ((entry.title or entry.filename).casefold(), entry.order))
+        else:
+            entries.sort(key=lambda entry: entry.order)
+        return entries
+
+    def render(self, manifest: Manifest) -> dict[str, str]:
+        """Содержимое всех файлов индекса по именам файлов."""
+        entries = self.sorted_entries(manifest)
+        title = f"Files in {self.directory.name}"
+        if self.shard == "none":
+            return {self.index_file_name: render_index(title, entries)}
+
+        shards: dict[str, list[ManifestEntry]] = {}
+        for entry in entries:
+            shards.setdefault(shard_key(entry, self.shard), []).append(entry)
+        files = {self.shard_file_name(key): render_index(key, shard_entries)
+                 for key, shard_entries in sorted(shards.items())}
+        files[self.index_file_name] = "".join([
+            f"# {title}\n",
+            *(f"{number}. [[{file_name}]]\n" for number, file_name in enumerate(sorted(files), start=1)),
+        ])
+        return files
+
+    def write(self, manifest: Manifest) -> None:
+        """Обновляет файлы индекса: дописывает, перезаписывает или удаляет только изменившиеся."""
+        state = self._load_state()
+        files = self.render(manifest)
+        new_state = {}
+        for file_name, content in files.items():
+            path = self.directory / file_name
+            file_state = state.get(file_name)
+            new_state[file_name] = IndexFileState(length=len(content), size=len(content.encode("utf-8")),
+                                                  content_hash=content_hash(content))
+            if file_state is not None and path.exists() and path.stat().st_size == file_state.size:
+                if file_state.content_hash == new_state[file_name].content_hash:
+                    continue
+                if (file_state.length < len(content)
+                        and content_hash(content[:file_state.length]) == file_state.content_hash):
+                    with path.open("a", encoding="utf-8") as index_file:
+                        index_file.write(content[file_state.length:])
+                    continue
+            write_text_atomic(path, content)
+
+        # дочерние индексы, в которые больше не попадает ни одна страница
+        for file_name in state.keys() - files.keys():
+            (self.directory / file_name).unlink(missing_ok=True)
+
+        if new_state != state:
+            write_text_atomic(self.state_path, json.dumps({file_name: asdict(file_state)
+                                                           for file_name, file_state in new_state.items()}))
+        log.success("Индекс {file_name} обновлён в директории {directory}.", file_name=self.index_file_name,
+                    directory=self.directory)
+
+    def _load_state(self) -> dict[str, IndexFileState]:
+        """Загружает состояние записанных файлов индекса."""
+        if not self.state_path.exists():
+            return {}
+        try:
+            raw_state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            return {file_name: IndexFileState(**file_state) for file_name, file_state in raw_state.items()}
+        except (ValueError, TypeError) as e:
+            log.warning("Состояние индекса {path} повреждено, индекс будет перезаписан: {error}",
+                        path=self.state_path, error=e)
+            return {}
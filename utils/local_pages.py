@@ -0,0 +1,175 @@
+"""Чтение сохранённых HTML страниц: дерева файлов (например, зеркала wget) и архивов WARC."""
+import os
+import gzip
+import mmap
+import zlib
+
+from typing import BinaryIO
+from pathlib import Path
+from urllib.parse import quote, urljoin
+from collections.abc import Iterator
+
+from bs4.dammit import UnicodeDammit
+
+from logger_config import log
+from utils.common_utils import CHUNK_SIZE, HTML_CONTENT_TYPES, DEFAULT_MAX_BODY_BYTES, decode_html
+
+HTML_SUFFIXES = (".html", ".htm", ".xhtml")
+WARC_SUFFIXES = (".warc", ".warc.gz")
+WARC_PAGE_TYPES = ("response", "resource")  # записи WARC с содержимым страниц
+HTTP_OK = 200
+
+
+def decode_html_buffer(buffer: mmap.mmap | bytes) -> str:
+    """Декодирует HTML из отображённого в память файла без промежуточной копии для UTF-8."""
+    try:
+        return str(buffer, "utf-8")
+    except UnicodeDecodeError:
+        return UnicodeDammit(buffer[:], is_html=True).unicode_markup or ""
+
+
+def read_html_file(path: Path, max_bytes: int = DEFAULT_MAX_BODY_BYTES) -> str | None:
+    """Читает HTML файл через отображение в память; None, если файл не читается или больше max_bytes."""
+    try:
+        with path.open("rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size > max_bytes:
+                log.warning("Файл {path} больше {max_bytes} байт и пропущен.", path=path, max_bytes=max_bytes)
+                return None
+            if size == 0:
+                return ""
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return decode_html_buffer(mapped)
+    except OSError as e:
+        log.warning("Не удалось прочитать файл {path}: {error}", path=path, error=e)
+        return None
+
+
+def file_url(root: Path, path: Path, base_url: str | None) -> str:
+    """Url сохранённой страницы: base_url с путём файла относительно root или file:// url файла."""
+    if base_url is None:
+        return path.resolve().as_uri()
+    return urljoin(base_url.rstrip("/") + "/", quote(path.relative_to(root).as_posix()))
+
+
+def iter_directory_pages(root: Path, base_url: str | None = None) -> Iterator[tuple[str, Path]]:
+    """Url и пути HTML файлов дерева директорий в порядке обхода с сортировкой имён.
+
+    Дерево обходится лениво, поэтому список всех файлов не хранится в памяти.
+    """
+    for directory, directory_names, file_names in os.walk(root):
+        directory_names.sort()
+        for file_name in sorted(file_names):
+            if file_name.lower().endswith(HTML_SUFFIXES):
+                path = Path(directory) / file_name
+                yield file_url(root, path, base_url), path
+
+
+def is_warc_file(path: Path) -> bool:
+    """Является ли файл архивом WARC по расширению."""
+    return path.name.lower().endswith(WARC_SUFFIXES)
+
+
+def open_warc(path: Path) -> BinaryIO:
+    """Открывает WARC, распаковывая сжатый gzip архив потоково."""
+    with path.open("rb") as file:
+        compressed = file.read(2) == b"\x1f\x8b"
+    return gzip.open(path, "rb") if compressed else path.open("rb")
+
+
+def parse_headers(lines: list[bytes]) -> dict[str, str]:
+    """Заголовки записи WARC или ответа HTTP с именами в нижнем регистре."""
+    headers = {}
+    for line in lines:
+        name, separator, value = line.partition(b":")
+        if separator:
+            headers[name.strip().decode("latin-1").lower()] = value.strip().decode("latin-1")
+    return headers
+
+
+def decode_chunked(body: bytes) -> bytes:
+    """Собирает тело HTTP ответа с Transfer-Encoding: chunked."""
+    chunks = []
+    position = 0
+    while position < len(body):
+        line_end = body.find(b"\r\n", position)
+        if line_end == -1:
+            break
+        size = int(body[position:line_end].split(b";")[0].strip() or b"0", 16)
+        if size == 0:
+            break
+        chunks.append(body[line_end + 2:line_end + 2 + size])
+        position = line_end + 2 + size + 2
+    return b"".join(chunks)
+
+
+def http_response_html(block: bytes, url: str) -> str | None:
+    """HTML из ответа HTTP, сохранённого в записи response; None для ответов с ошибкой и не HTML."""
+    head, _, body = block.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.split(b"\r\n")
+    status = status_line.split(b" ", 2)
+    if len(status) < 2 or not status[1].isdigit() or int(status[1]) != HTTP_OK:  # noqa: PLR2004
+        return None
+    headers = parse_headers(header_lines)
+    content_type, _, parameters = headers.get("content-type", "").partition(";")
+    if content_type.strip().lower() not in HTML_CONTENT_TYPES:
+        return None
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        body = decode_chunked(body)
+    content_encoding = headers.get("content-encoding", "").lower()
+    if content_encoding in {"gzip", "deflate"}:
+        try:
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS if content_encoding == "gzip" else zlib.MAX_WBITS)
+        except zlib.error as e:
+            log.warning("Не удалось распаковать ответ {url} из WARC: {error}", url=url, error=e)
+            return None
+    charset = next((value.strip().strip('"') for name, _, value in
+                    (parameter.partition("=") for parameter in parameters.split(";"))
+                    if name.strip().lower() == "charset"), None)
+    return decode_html(body, charset)
+
+
+def skip_bytes(stream: BinaryIO, count: int) -> None:
+    """Пропускает count байт потока, не читая их в память целиком."""
+    while count > 0:
+        skipped = len(stream.read(min(count, CHUNK_SIZE)))
+        if not skipped:
+            return
+        count -= skipped
+
+
+def iter_warc_pages(path: Path, max_bytes: int = DEFAULT_MAX_BODY_BYTES) -> Iterator[tuple[str, str]]:
+    """Url и HTML страниц из записей response и resource архива WARC.
+
+    Архив читается потоково по записям, в том числе сжатый gzip; записи больше max_bytes пропускаются
+    без чтения в память, а повреждённые записи пропускаются с предупреждением.
+    """
+    with open_warc(path) as stream:
+        while True:
+            line = stream.readline()
+            if not line:
+                return
+            if not line.startswith(b"WARC/"):
+                continue
+            header_lines = []
+            while (line := stream.readline()) not in {b"\r\n", b"\n", b""}:
+                header_lines.append(line.rstrip(b"\r\n"))
+            headers = parse_headers(header_lines)
+            length = int(headers.get("content-length", "0") or 0)
+            url = headers.get("warc-target-uri", "").strip("<>")
+            if headers.get("warc-type") not in WARC_PAGE_TYPES or not url or length > max_bytes:
+                skip_bytes(stream, length)
+                continue
+            block = stream.read(length)
+            if headers.get("warc-type") == "response":
+                try:
+                    html = http_response_html(block, url)
+                except ValueError as e:
+                    log.warning("Повреждённый ответ {url} в WARC пропущен: {error}", url=url, error=e)
+                    continue
+            elif headers.get("content-type", "").split(";")[0].strip().lower() in HTML_CONTENT_TYPES:
+                html = decode_html(block, None)
+            else:
+                html = None
+            if html:
+                yield url, html
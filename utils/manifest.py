@@ -0,0 +1,81 @@
+"""Манифест выходной директории для инкрементальной синхронизации."""
+import json
+import hashlib
+
+from pathlib import Path
+from dataclasses import asdict, dataclass
+
+from logger_config import log
+
+
+def content_hash(*parts: str) -> str:
+    """Хэш содержимого для сравнения версий страниц."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8", errors="surrogatepass"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass(slots=True)
+class ManifestEntry:
+    """Запись манифеста об обработанной странице."""
+
+    source_hash: str  # хэш исходного HTML вместе с настройками конвертации
+    markdown_hash: str  # хэш сохранённого markdown
+    filename: str  # имя файла без расширения .md
+    title: str = ""  # заголовок страницы
+    url: str = ""  # исходный url страницы
+    order: int = 0  # порядковый номер страницы в порядке первого обхода
+    simhash: str = ""  # SimHash markdown страницы в шестнадцатеричном виде для поиска почти одинаковых страниц
+    lastmod: str = ""  # дата изменения страницы из sitemap или ленты при её последней обработке
+
+
+class Manifest:
+    """Соответствие url страниц исходному HTML и сохранённым markdown файлам.
+
+    Хранится в JSON файле в выходной директории и позволяет при повторной синхронизации пропускать
+    конвертацию неизменённых страниц и не перезаписывать неизменённые файлы.
+    """
+
+    file_name = ".manifest.json"
+
+    def __init__(self, directory: Path) -> None:
+        """Загружает манифест из директории, если он существует."""
+        self.path = directory / self.file_name
+        self.entries: dict[str, ManifestEntry] = {}
+        self._changed = False
+        self._next_order = 0
+        if self.path.exists():
+            try:
+                raw_entries = json.loads(self.path.read_text(encoding="utf-8"))
+                self.entries = {url: ManifestEntry(**entry) for url, entry in raw_entries.items()}
+            except (ValueError, TypeError) as e:
+                log.warning("Манифест {path} повреждён и будет создан заново: {error}", path=self.path, error=e)
+        self._next_order = max((entry.order for entry in self.entries.values()), default=-1) + 1
+
+    def get(self, url: str) -> ManifestEntry | None:
+        """Возвращает запись манифеста для url."""
+        return self.entries.get(url)
+
+    def set(self, url: str, entry: ManifestEntry) -> None:
+        """Сохраняет запись манифеста для url, сохраняя порядковый номер первого обхода страницы."""
+        existing_entry = self.entries.get(url)
+        if existing_entry is not None:
+            entry.order = existing_entry.order
+        else:
+            entry.order = self._next_order
+            self._next_order += 1
+        if existing_entry != entry:
+            self.entries[url] = entry
+            self._changed = True
+
+    def save(self) -> None:
+        """Записывает манифест на диск, если он изменился."""
+        if not self._changed:
+            return
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps({url: asdict(entry) for url, entry in self.entries.items()},
+                                        ensure_ascii=False), encoding="utf-8")
+        temp_path.replace(self.path)
+        self._changed = False
@@ -0,0 +1,208 @@
+"""Асинхронная пакетная запись markdown файлов."""
+import os
+import time
+import asyncio
+
+from types import TracebackType
+from pathlib import Path
+from dataclasses import dataclass
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from logger_config import log
+
+
+def write_text_atomic(path: Path, content: str, fsync: bool = False) -> int:
+    """Записывает файл через временный файл и переименование, чтобы читатели не видели его частично записанным.
+
+    Возвращает количество записанных байт.
+    """
+    data = content.encode("utf-8")
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with temp_path.open("wb") as temp_file:
+        temp_file.write(data)
+        if fsync:
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+    temp_path.replace(path)
+    return len(data)
+
+
+def fsync_directory(directory: Path) -> None:
+    """Сбрасывает на диск записи директории о переименованных файлах (только POSIX)."""
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@dataclass(slots=True)
+class WriteRequest:
+    """Файл, ожидающий записи."""
+
+    path: Path
+    content: str | None  # None - удалить файл
+
+
+@dataclass(slots=True)
+class WriterStats:
+    """Статистика записи файлов."""
+
+    files_written: int = 0
+    files_removed: int = 0
+    bytes_written: int = 0
+    batches: int = 0
+    failed: int = 0  # файлы, которые не удалось записать
+    backpressure_waits: int = 0  # запросы записи, ожидавшие места в заполненной очереди
+    backpressure_seconds: float = 0.0  # суммарное время этого ожидания
+
+
+class MarkdownWriter:
+    """Стадия записи результатов с ограниченной очередью.
+
+    Файлы записываются пакетами в пуле потоков атомарно: через временный файл и переименование. При fsync
+    содержимое файлов пакета сбрасывается на диск перед переименованием, а каждая директория пакета -
+    один раз после него. Удаление файлов проходит через ту же очередь, поэтому выполняется по порядку с записями.
+    Когда очередь заполнена, write ожидает места, и это время учитывается в статистике.
+    """
+
+    def __init__(self,
+                 queue_size: int,
+                 batch_size: int,
+                 threads: int,
+                 fsync: bool = True,
+                 observe: Callable[[str, float], None] | None = None,
+                 ) -> None:
+        """Инициализация записи; observe(stage, seconds) получает время записи каждого файла как этап "write"."""
+        if queue_size < 1 or batch_size < 1 or threads < 1:
+            msg = "Размеры очереди, пакета и пула потоков записи должны быть положительными числами."
+            raise ValueError(msg)
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.observe = observe
+        self.stats = WriterStats()
+        self._queue: asyncio.Queue[WriteRequest] = asyncio.Queue(maxsize=queue_size)
+        self._threads = threads
+        self._executor: ThreadPoolExecutor | None = None
+        self._consumer: asyncio.Task[None] | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество файлов, ожидающих записи."""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Запускает стадию записи в текущем event loop."""
+        if self._consumer is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._threads, thread_name_prefix="markdown-writer")
+            self._consumer = asyncio.create_task(self._consume())
+
+    async def write(self, directory: Path, filename: str, content: str) -> None:
+        """Ставит markdown файл в очередь записи, ожидая места, если очередь заполнена."""
+        await self._put(WriteRequest(path=directory / f"{filename}.md", content=content))
+
+    async def remove(self, directory: Path, filename: str) -> None:
+        """Ставит в очередь удаление markdown файла после записей, поставленных раньше."""
+        await self._put(WriteRequest(path=directory / f"{filename}.md", content=None))
+
+    async def _put(self, request: WriteRequest) -> None:
+        """Ставит запрос в очередь, ожидая места, если очередь заполнена."""
+        self.start()
+        if not self._queue.full():
+            self._queue.put_nowait(request)
+            return
+        started = time.monotonic()
+        await self._queue.put(request)
+        self.stats.backpressure_waits += 1
+        self.stats.backpressure_seconds += time.monotonic() - started
+
+    async def flush(self) -> None:
+        """Ожидает записи всех поставленных в очередь файлов."""
+        if self._consumer is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Записывает оставшиеся файлы и останавливает стадию записи."""
+        if self._consumer is None:
+            return
+        await self.flush()
+        self._consumer.cancel()
+        await asyncio.gather(self._consumer, return_exceptions=True)
+        self._executor.shutdown()
+        self._consumer = self._executor = None
+        log.info("Статистика записи: {stats}", stats=self.stats)
+
+    async def __aenter__(self) -> "MarkdownWriter":
+        """Запускает стадию записи."""
+        self.start()
+        return self
+
+    async def __aexit__(self,
+                        exc_type: type[BaseException] | None,
+                        exc: BaseException | None,
+                        traceback: TracebackType | None,
+                        ) -> None:
+        """Записывает оставшиеся файлы и останавливает стадию записи."""
+        await self.close()
+
+    async def _consume(self) -> None:
+        """Забирает файлы из очереди пакетами и записывает их."""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write_batch(batch)
+            except Exception as e:
+                # ошибка вне записи отдельных файлов (сброс директорий, метрики) не должна останавливать стадию,
+                # иначе flush и close будут ждать очередь бесконечно
+                log.opt(exception=e).error("Ошибка записи пакета из {count} файлов.", count=len(batch))
+                self.stats.failed += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_batch(self, batch: list[WriteRequest]) -> None:
+        """Записывает файлы пакета параллельно в пуле потоков, затем сбрасывает их директории на диск."""
+        # из нескольких запросов к одному файлу в пакете выполняется последний
+        batch = list({request.path: request for request in batch}.values())
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(loop.run_in_executor(self._executor, self._write_file, request)
+                                         for request in batch))
+        sizes = [size for size, _ in results]
+        if self.observe is not None:
+            for _, seconds in results:
+                self.observe("write", seconds)
+        directories = {request.path.parent for request, size in zip(batch, sizes, strict=True) if size is not None}
+        if self.fsync and directories:
+            await loop.run_in_executor(self._executor, self._fsync_directories, directories)
+        done = [(request, size) for request, size in zip(batch, sizes, strict=True) if size is not None]
+        written_sizes = [size for request, size in done if request.content is not None]
+        self.stats.files_written += len(written_sizes)
+        self.stats.files_removed += len(done) - len(written_sizes)
+        self.stats.bytes_written += sum(written_sizes)
+        self.stats.failed += len(batch) - len(done)
+        self.stats.batches += 1
+
+    @staticmethod
+    def _fsync_directories(directories: set[Path]) -> None:
+        """Сбрасывает на диск директории записанных файлов."""
+        for directory in directories:
+            fsync_directory(directory)
+
+    def _write_file(self, request: WriteRequest) -> tuple[int | None, float]:
+        """Записывает или удаляет один файл, возвращает размер записи (None при ошибке) и время записи."""
+        started = time.perf_counter()
+        try:
+            if request.content is None:
+                request.path.unlink(missing_ok=True)
+                size = 0
+            else:
+                size = write_text_atomic(request.path, request.content, fsync=self.fsync)
+        except Exception as e:
+            log.error("Не удалось записать файл {path}: {error}", path=request.path, error=e)
+            size = None
+        return size, time.perf_counter() - started
@@ -0,0 +1,92 @@
+"""Кэш правил robots.txt."""
+import time
+import asyncio
+
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+from aiohttp.web_exceptions import HTTPOk, HTTPForbidden, HTTPUnauthorized, HTTPInternalServerError
+
+from logger_config import log
+
+MAX_ROBOTS_BYTES = 512 * 1024  # robots.txt больше этого размера читается не полностью
+ROBOTS_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+
+@dataclass(slots=True)
+class RobotsRules:
+    """Правила robots.txt одного хоста и время их получения."""
+
+    parser: RobotFileParser
+    fetched_at: float
+
+
+class RobotsCache:
+    """Загружает robots.txt каждого хоста один раз за ttl секунд и проверяет по нему url.
+
+    Ответы 401 и 403 запрещают весь хост, остальные ошибки и отсутствие файла его разрешают.
+    """
+
+    def __init__(self, user_agent: str, ttl: float) -> None:
+        """Инициализация кэша."""
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self._rules: dict[str, RobotsRules] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def get(self, session: aiohttp.ClientSession, url: str) -> RobotFileParser:
+        """Правила robots.txt хоста url, загружаемые при первом обращении или по истечении ttl."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        # одновременные запросы к новому хосту ждут одну загрузку robots.txt
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            rules = self._rules.get(origin)
+            if rules is None or time.monotonic() - rules.fetched_at > self.ttl:
+                rules = RobotsRules(parser=await self._fetch(session, origin), fetched_at=time.monotonic())
+                self._rules[origin] = rules
+        return rules.parser
+
+    async def can_fetch(self, session: aiohttp.ClientSession, url: str) -> bool:
+        """Проверяет, разрешена ли загрузка url правилами robots.txt."""
+        return (await self.get(session, url)).can_fetch(self.user_agent, url)
+
+    async def crawl_delay(self, session: aiohttp.ClientSession, url: str) -> float | None:
+        """Минимальный интервал между запросами к хосту url по Crawl-delay и Request-rate, секунд."""
+        parser = await self.get(session, url)
+        delays = []
+        crawl_delay = parser.crawl_delay(self.user_agent)
+        if crawl_delay:
+            delays.append(float(crawl_delay))
+        request_rate = parser.request_rate(self.user_agent)
+        if request_rate and request_rate.requests > 0:
+            delays.append(request_rate.seconds / request_rate.requests)
+        return max(delays) if delays else None
+
+    async def _fetch(self, session: aiohttp.ClientSession, origin: str) -> RobotFileParser:
+        """Загружает и разбирает robots.txt хоста."""
+        robots_url = f"{origin}/robots.txt"
+        parser = RobotFileParser(robots_url)
+        try:
+            async with session.get(robots_url, timeout=ROBOTS_TIMEOUT) as response:
+                if response.status in {HTTPUnauthorized.status_code, HTTPForbidden.status_code}:
+                    parser.disallow_all = True
+                elif response.status != HTTPOk.status_code:
+                    parser.allow_all = True
+                    if response.status >= HTTPInternalServerError.status_code:
+                        log.warning("robots.txt {url} вернул статус {status}, ограничения не применяются.",
+                                    url=robots_url, status=response.status)
+                else:
+                    body = bytearray()
+                    async for chunk in response.content.iter_chunked(MAX_ROBOTS_BYTES):
+                        body += chunk
+                        if len(body) >= MAX_ROBOTS_BYTES:
+                            break
+                    parser.parse(bytes(body[:MAX_ROBOTS_BYTES]).decode("utf-8", errors="replace").splitlines())
+        except (aiohttp.ClientError, TimeoutError) as e:
+            log.warning("Не удалось загрузить {url}: {error}. Ограничения не применяются.", url=robots_url, error=e)
+            parser.allow_all = True
+        return parser
@@ -0,0 +1,104 @@
+"""Поиск почти одинаковых страниц по SimHash текста."""
+import zlib
+import array
+
+from utils.manifest import Manifest
+
+SIMHASH_BITS = 64
+DEFAULT_MAX_DISTANCE = 3  # максимальное расстояние Хэмминга между отпечатками почти одинаковых страниц
+SAMPLE_MIN_WORDS = 256  # в более длинных текстах для отпечатка берётся каждый четвёртый шингл
+
+# нечётные 64-битные множители для смешивания хэшей слов шингла
+SHINGLE_MULTIPLIERS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9)
+MASK_64 = (1 << SIMHASH_BITS) - 1
+
+# для каждого бита байта: таблица перевода значения байта в значение этого бита
+BIT_TABLES = tuple(bytes((value >> bit) & 1 for value in range(256)) for bit in range(8))
+
+
+def simhash(features: bytes) -> int:
+    """SimHash набора 64-битных хэшей признаков, записанных подряд по 8 байт.
+
+    Бит отпечатка равен 1, если он установлен в большинстве хэшей. Биты считаются по столбцам байтов через
+    bytes.translate и bytes.count, без цикла Python по признакам.
+    """
+    count = len(features) // 8
+    value = 0
+    for byte_index in range(8):
+        column = features[byte_index::8]
+        for bit, table in enumerate(BIT_TABLES):
+            if column.translate(table).count(1) * 2 > count:
+                value |= 1 << (byte_index * 8 + bit)
+    return value
+
+
+def text_fingerprint(text: str) -> int:
+    """SimHash текста по шинглам из четырёх слов; 0 для текста короче шингла.
+
+    Хэш шингла смешивается из crc32 его слов. Отпечаток не зависит от процесса, в котором вычислен,
+    в отличие от встроенной hash().
+    """
+    words = text.lower().split()
+    # слова в тексте повторяются, поэтому каждое различное слово хэшируется один раз
+    vocabulary = {word: zlib.crc32(word.encode("utf-8", errors="surrogatepass")) for word in set(words)}
+    word_hashes = [vocabulary[word] for word in words]
+    first, second, third = SHINGLE_MULTIPLIERS
+    # выборка шинглов по хэшу первого слова одинакова для одинаковых текстов
+    sample_mask = 3 if len(word_hashes) > SAMPLE_MIN_WORDS else 0
+    shingles = array.array("Q", [
+        (a * first ^ b * second ^ c * third ^ d) & MASK_64
+        for a, b, c, d in zip(word_hashes, word_hashes[1:], word_hashes[2:], word_hashes[3:], strict=False)
+        if not a & sample_mask
+    ])
+    return simhash(shingles.tobytes()) if shingles else 0
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Количество различающихся битов отпечатков."""
+    return (first ^ second).bit_count()
+
+
+class SimHashIndex:
+    """Отпечатки сохранённых страниц с поиском почти одинаковых.
+
+    Отпечаток делится на max_distance + 1 полос: у отпечатков с расстоянием не больше max_distance хотя бы
+    одна полоса совпадает, поэтому сравниваются только страницы с общей полосой. Отпечатки ранее сохранённых
+    страниц загружаются из манифеста, так что копия страницы не сохраняется и при следующих запусках.
+    """
+
+    def __init__(self, manifest: Manifest | None = None, max_distance: int = DEFAULT_MAX_DISTANCE) -> None:
+        """Инициализация по отпечаткам страниц манифеста."""
+        self.max_distance = max_distance
+        band_count = max_distance + 1
+        band_width = -(-SIMHASH_BITS // band_count)
+        self._bands = tuple((start, min(band_width, SIMHASH_BITS - start))
+                            for start in range(0, SIMHASH_BITS, band_width))
+        self._fingerprints: dict[str, int] = {}  # url -> отпечаток
+        self._buckets: dict[tuple[int, int], list[str]] = {}  # (номер полосы, значение полосы) -> url
+        if manifest is not None:
+            for url, entry in manifest.entries.items():
+                if entry.simhash:
+                    self.add(url, int(entry.simhash, 16))
+
+    def _band_keys(self, fingerprint: int) -> list[tuple[int, int]]:
+        """Ключи полос отпечатка."""
+        return [(number, (fingerprint >> start) & ((1 << width) - 1))
+                for number, (start, width) in enumerate(self._bands)]
+
+    def add(self, url: str, fingerprint: int) -> None:
+        """Добавляет или обновляет отпечаток страницы."""
+        if self._fingerprints.get(url) == fingerprint:
+            return
+        self._fingerprints[url] = fingerprint
+        for band_key in self._band_keys(fingerprint):
+            self._buckets.setdefault(band_key, []).append(url)
+
+    def find_duplicate(self, url: str, fingerprint: int) -> str | None:
+        """Возвращает url другой страницы с почти таким же отпечатком."""
+        for band_key in self._band_keys(fingerprint):
+            for candidate in self._buckets.get(band_key, ()):
+                # в полосах остаются и прежние отпечатки изменившихся страниц, поэтому сравнивается текущий
+                if (candidate != url
+                        and hamming_distance(self._fingerprints[candidate], fingerprint) <= self.max_distance):
+                    return candidate
+        return None